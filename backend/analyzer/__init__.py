@@ -2,5 +2,18 @@
 GPT Vision API를 활용한 이미지 접근성 분석 모듈
 """
 
-__all__ = []
+from .gpt_vision import (
+    AnalysisMetrics,
+    analyze_batch,
+    analyze_image_with_gpt,
+    analyze_images_packed,
+    create_client,
+)
 
+__all__ = [
+    "AnalysisMetrics",
+    "analyze_batch",
+    "analyze_image_with_gpt",
+    "analyze_images_packed",
+    "create_client",
+]
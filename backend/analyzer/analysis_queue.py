@@ -0,0 +1,131 @@
+"""
+비동기 분석 작업 큐
+
+모든 분석 경로(일괄 분석, 스트리밍 분석, 업로드 후 분석)가 이 큐를 공유합니다.
+작업은 클라이언트별 대기열에 들어가고 워커는 클라이언트를 돌아가며 하나씩
+꺼내므로, 한 사용자가 폴더 전체를 제출해도 다른 사용자의 작업이 뒤로 밀리지
+않습니다. 대기 작업 수가 한도를 넘으면 QueueFull 로 즉시 거절합니다.
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class QueueFull(Exception):
+    """대기 작업 수 한도 초과"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("분석 대기열이 가득 찼습니다")
+        self.retry_after = retry_after
+
+
+class AnalysisQueue:
+    """동시 실행 수가 제한된 클라이언트별 공정 분석 작업 큐"""
+
+    def __init__(self, concurrency: int = 4, max_pending: int = 0, max_pending_per_client: int = 0):
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max_pending
+        self.max_pending_per_client = max_pending_per_client
+        self._clients: Dict[str, Deque[tuple]] = {}
+        self._pending = 0
+        self._available: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 작업 하나의 평균 처리 시간 (Retry-After 추정용)
+        self._avg_job_seconds = 5.0
+
+    def _ensure_workers(self):
+        """실행 중인 이벤트 루프에서 워커를 최초 1회 시작"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이벤트 루프가 바뀌면 (테스트 클라이언트 등) 새로 시작
+            self._loop = loop
+            self._clients = {}
+            self._pending = 0
+            self._available = asyncio.Semaphore(0)
+            self._workers = []
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(i)) for i in range(self.concurrency)
+            ]
+
+    def retry_after(self) -> int:
+        """대기 작업이 모두 처리될 때까지의 예상 시간(초)"""
+        return max(1, math.ceil(self._pending * self._avg_job_seconds / self.concurrency))
+
+    def admit(self, count: int, client: str = "default"):
+        """count 개 작업을 받을 수 있는지 확인 (요청 단위로 전부 받거나 전부 거절)"""
+        queued = len(self._clients.get(client, ()))
+        if (
+            (self.max_pending and self._pending + count > self.max_pending)
+            or (self.max_pending_per_client and queued + count > self.max_pending_per_client)
+        ):
+            raise QueueFull(self.retry_after())
+
+    def submit(self, func: Callable[..., Any], *args, client: str = "default") -> asyncio.Future:
+        """작업 추가, 결과를 받을 Future 반환"""
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        self._clients.setdefault(client, deque()).append((func, args, future))
+        self._pending += 1
+        self._available.release()
+        return future
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _next_job(self) -> tuple:
+        """가장 오래 차례를 기다린 클라이언트의 다음 작업"""
+        client = next(iter(self._clients))
+        jobs = self._clients.pop(client)
+        job = jobs.popleft()
+        if jobs:
+            # 남은 작업이 있으면 맨 뒤로 보내 차례를 돌림
+            self._clients[client] = jobs
+        self._pending -= 1
+        return job
+
+    async def _worker(self, worker_id: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._available.acquire()
+            func, args, future = self._next_job()
+            try:
+                if not future.cancelled():
+                    started = loop.time()
+                    result = await asyncio.to_thread(func, *args)
+                    self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * (loop.time() - started)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except Exception as e:
+                logger.error(f"Analysis worker {worker_id} job failed: {e}")
+                if not future.cancelled():
+                    future.set_exception(e)
+
+    async def shutdown(self):
+        """워커 종료"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._clients = {}
+        self._pending = 0
+        self._available = None
+        self._loop = None
+
+
+async def gather_jobs(jobs: List[Tuple[Any, asyncio.Future]]) -> List[Tuple[Any, Any, Optional[str]]]:
+    """(키, Future) 목록을 (키, 결과, 오류) 목록으로 변환"""
+    outcomes = []
+    for key, future in jobs:
+        try:
+            outcomes.append((key, await future, None))
+        except Exception as e:
+            outcomes.append((key, None, str(e)))
+    return outcomes
@@ -0,0 +1,197 @@
+"""
+일괄 분석 작업의 다중 노드 분할
+
+이미지 경로(file_path)의 안정 해시로 작업을 n개 샤드로 나누고, 샤드마다
+별도 결과 파일에 기록합니다. 공유 파일시스템의 임대(lease) 파일로 샤드를
+한 노드만 처리하도록 하며, 보유 노드는 주기적으로 하트비트(mtime 갱신)를
+남깁니다. 하트비트가 끊긴 샤드는 다른 노드가 넘겨받아 결과 파일에 없는
+이미지만 이어서 분석하므로 같은 이미지를 두 번 과금하지 않습니다.
+완료된 샤드는 .done 표시 파일을 남기고, merge_shard_outputs() 가 샤드
+결과를 file_path 별 최신 결과 하나로 합칩니다.
+"""
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.processor.jsonl_reader import read_jsonl
+from backend.processor.jsonl_writer import file_lock, log_files
+from backend.processor.prediction_store import merge_latest
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'i/n' (0 <= i < n) 파싱"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"샤드 형식이 잘못되었습니다: {spec} (예: 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"샤드 번호는 0 이상 {count} 미만이어야 합니다: {spec}")
+    return index, count
+
+
+def shard_of(file_path: str, count: int) -> int:
+    """file_path 의 샤드 번호 (프로세스·노드와 무관하게 같은 값)"""
+    digest = hashlib.blake2b(file_path.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def shard_output_path(output: Path, index: int, count: int) -> Path:
+    """샤드 결과 파일 (예: gpt_analysis_results.shard-0-of-4.jsonl)"""
+    output = Path(output)
+    return output.with_name(f"{output.stem}.shard-{index}-of-{count}{output.suffix}")
+
+
+def completed_paths(path: Path) -> Set[str]:
+    """결과 파일(교체된 세그먼트 포함)에 이미 기록된 file_path"""
+    done: Set[str] = set()
+    for segment in log_files(path):
+        records, _, _ = read_jsonl(segment, complete_lines=True)
+        done.update(record['file_path'] for record in records if record.get('file_path'))
+    return done
+
+
+class ShardLease:
+    """샤드 하나의 임대 파일 (O_EXCL 생성, mtime 하트비트, 만료 시 넘겨받기)"""
+
+    def __init__(self, directory: Path, index: int, count: int, timeout: float = 120.0, heartbeat: float = 15.0):
+        self.directory = Path(directory)
+        self.index = index
+        self.count = count
+        self.timeout = timeout
+        self.heartbeat = heartbeat
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.path = self.directory / f"shard-{index}-of-{count}.lease"
+        self.done_path = self.directory / f"shard-{index}-of-{count}.done"
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def done(self) -> bool:
+        return self.done_path.exists()
+
+    def acquire(self) -> bool:
+        """임대 획득 (완료된 샤드이거나 다른 노드가 하트비트 중이면 False)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for _ in range(3):
+            if self.done:
+                return False
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                if not self._break_stale():
+                    return False
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"owner": self.owner, "acquired_at": time.time()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            self.lost = False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._beat, name=f"shard-lease:{self.index}", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Acquired lease for shard {self.index}/{self.count} ({self.owner})")
+            return True
+        return False
+
+    def _break_stale(self) -> bool:
+        """만료된 임대 제거 (제거했거나 이미 없으면 True)"""
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return True
+        if age < self.timeout:
+            return False
+        # 이름 바꾸기는 한 노드만 성공
+        grave = self.path.with_name(f"{self.path.name}.{self.owner}.stale")
+        try:
+            os.rename(self.path, grave)
+        except FileNotFoundError:
+            return True
+        try:
+            if time.time() - os.stat(grave).st_mtime < self.timeout:
+                # 확인 직후 다른 노드가 새로 만든 임대였으면 되돌림 (이미 있으면 그대로 둠)
+                try:
+                    os.link(grave, self.path)
+                except FileExistsError:
+                    pass
+                return False
+            logger.warning(f"Taking over stale lease for shard {self.index}/{self.count} ({age:.0f}s old)")
+            return True
+        finally:
+            os.unlink(grave)
+
+    def holds(self) -> bool:
+        """임대 파일이 아직 이 노드 것인지 확인"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("owner") == self.owner
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def _beat(self):
+        while not self._stop.wait(self.heartbeat):
+            if not self.holds():
+                logger.error(f"Lost lease for shard {self.index}/{self.count}")
+                self.lost = True
+                return
+            os.utime(self.path)
+
+    def release(self, done: bool = False, summary: Optional[Dict] = None):
+        """임대 반납 (done 이면 완료 표시를 남겨 다른 노드가 다시 처리하지 않음)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if not self.holds():
+            return
+        if done:
+            with open(self.done_path, 'w', encoding='utf-8') as f:
+                json.dump({"owner": self.owner, "finished_at": time.time(), **(summary or {})}, f)
+        os.unlink(self.path)
+
+
+def merge_shard_outputs(output: Path, count: int, shard_paths: Optional[Iterable[Path]] = None) -> Dict:
+    """기존 결과와 샤드 결과를 file_path 별 최신 결과 하나로 합쳐 output 에 기록
+
+    작성기와 같은 파일 잠금을 잡은 채 병합하고 output 을 교체하므로 병합 중
+    추가된 결과가 사라지지 않으며, 교체된 이전 세그먼트는 병합 후 삭제합니다.
+    같은 file_path 는 샤드 결과가 기존 결과보다 우선합니다.
+    """
+    output = Path(output)
+    if shard_paths is None:
+        shard_paths = [shard_output_path(output, index, count) for index in range(count)]
+    shard_segments = [segment for shard_path in shard_paths for segment in log_files(shard_path)]
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(output):
+        segments = log_files(output)
+        records: List[Dict] = []
+        for segment in segments + shard_segments:
+            records.extend(read_jsonl(segment, complete_lines=True)[0])
+        merged = merge_latest(records)
+
+        tmp_path = output.with_name(f".{output.name}.merge.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in merged:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output)
+        for segment in segments:
+            if segment != output:
+                segment.unlink(missing_ok=True)
+
+    logger.info(f"Merged {len(shard_segments)} shard files into {output.name}: {len(records)} -> {len(merged)} lines")
+    return {"path": str(output), "lines_before": len(records), "merged": len(merged)}
@@ -0,0 +1,409 @@
+"""
+GPT Vision 이미지 접근성 분석
+
+openai 패키지는 무겁기 때문에 분석 요청이 처음 들어올 때 임포트합니다.
+"""
+import base64
+import json
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from backend.analyzer.rate_limit import (
+    CostReservation, estimate_cost, estimate_tokens, get_cost_budget, get_rate_limiter
+)
+from backend.utils.config import settings
+from backend.utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = setup_logger(__name__)
+
+# 접근성 분석 기준
+ANALYSIS_CRITERIA = """1. **단차/계단/턱 (has_step)**: 
+   - 휠체어 사용자가 진입하기 어려운 단차, 계단, 문턱이 있는지 확인
+   - boolean 값으로 반환 (true: 있음, false: 없음)
+
+2. **통로 너비 (width_class)**:
+   - wide: 휠체어가 여유롭게 통과 가능 (약 90cm 이상)
+   - normal: 휠체어가 통과 가능하나 좁음 (약 70-90cm)
+   - narrow: 휠체어 통과가 매우 어려움 (약 50-70cm)
+   - not_passable: 휠체어 통과 불가능 (50cm 미만)
+   - 배열로 반환 (여러 구간이 있으면 모두 포함)
+
+3. **의자 타입 (chair)**:
+   - has_movable_chair: 일반적인 이동 가능한 의자 (의자, 스툴 등)
+   - has_high_movable_chair: 팔걸이가 있거나 높이 조절 가능한 의자
+   - has_fixed_chair: 고정된 의자 (벤치, 부스 좌석 등)
+   - has_floor_chair: 바닥 좌석 (좌식 테이블)
+   - 각각 boolean 값으로 반환"""
+
+# 접근성 분석 프롬프트
+ANALYSIS_PROMPT = """이 이미지는 음식점의 실내 공간 사진입니다. 이동약자 접근성 관점에서 다음 항목들을 분석해주세요:
+
+""" + ANALYSIS_CRITERIA + """
+
+응답은 반드시 다음 JSON 형식으로만 제공해주세요:
+{
+  "has_step": boolean,
+  "width_class": ["wide" 또는 "normal" 또는 "narrow" 또는 "not_passable"],
+  "chair": {
+    "has_movable_chair": boolean,
+    "has_high_movable_chair": boolean,
+    "has_fixed_chair": boolean,
+    "has_floor_chair": boolean
+  },
+  "confidence": float (0.0-1.0, 전체 예측의 신뢰도)
+}"""
+
+# 묶음 모드 프롬프트 (이미지마다 [이미지 N] 슬롯이 뒤따름)
+PACKED_PROMPT = """다음 {count}장의 이미지는 음식점의 실내 공간 사진이며, 각 이미지 앞에 [이미지 N] 번호가 붙어 있습니다.
+각 이미지를 독립적으로 이동약자 접근성 관점에서 분석해주세요:
+
+""" + ANALYSIS_CRITERIA + """
+
+응답은 반드시 이미지마다 하나의 객체를 담은 JSON 배열로만 제공해주세요:
+[
+  {{
+    "index": int (이미지 번호),
+    "has_step": boolean,
+    "width_class": ["wide" 또는 "normal" 또는 "narrow" 또는 "not_passable"],
+    "chair": {{
+      "has_movable_chair": boolean,
+      "has_high_movable_chair": boolean,
+      "has_fixed_chair": boolean,
+      "has_floor_chair": boolean
+    }},
+    "confidence": float (0.0-1.0)
+  }}
+]"""
+
+WIDTH_CLASSES = {"wide", "normal", "narrow", "not_passable"}
+CHAIR_KEYS = ("has_movable_chair", "has_high_movable_chair", "has_fixed_chair", "has_floor_chair")
+
+
+def create_client() -> "OpenAI":
+    """OpenAI 클라이언트 생성 (지연 임포트)"""
+    from openai import OpenAI
+    
+    return OpenAI(api_key=load_openai_api_key())
+
+
+def load_openai_api_key() -> str:
+    """OpenAI API 키 로드"""
+    api_key_file = settings.BASE_DIR / "api.txt"
+    if not api_key_file.exists():
+        raise FileNotFoundError("API 키 파일을 찾을 수 없습니다: api.txt")
+    
+    with open(api_key_file, 'r') as f:
+        api_key = f.read().strip()
+    
+    if not api_key:
+        raise ValueError("API 키가 비어있습니다")
+    
+    return api_key
+
+
+def encode_image(image_path: Path) -> str:
+    """이미지를 base64로 인코딩"""
+    with open(image_path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode('utf-8')
+
+
+def _strip_code_fence(content: str) -> str:
+    """마크다운 코드 블록 제거"""
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content.strip()
+
+
+def _image_part(base64_image: str) -> dict:
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:image/webp;base64,{base64_image}"
+        }
+    }
+
+
+def _fallback_result(file_path: str, batch_name: str) -> dict:
+    """파싱 실패 시 기본값"""
+    return {
+        "file_path": file_path,
+        "batch": batch_name,
+        "has_step": False,
+        "width_class": ["normal"],
+        "chair": {
+            "has_movable_chair": True,
+            "has_high_movable_chair": False,
+            "has_fixed_chair": False,
+            "has_floor_chair": False
+        },
+        "confidence": 0.5
+    }
+
+
+class AnalysisMetrics:
+    """분석 호출 비용·처리량 측정 (단건/묶음 모드 비교용, 분석 큐 워커 스레드가 공유)"""
+    
+    def __init__(self):
+        self.api_calls = 0
+        self.images = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.fallbacks = 0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def record(self, response, images: int):
+        """응답의 토큰 사용량 기록"""
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            self.api_calls += 1
+            self.images += images
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+    
+    def count(self, images: int = 0, fallbacks: int = 0):
+        """묶음 응답으로 분석된 이미지·단건 재시도 수 기록"""
+        with self._lock:
+            self.images += images
+            self.fallbacks += fallbacks
+    
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started_at
+        with self._lock:
+            cost = estimate_cost(self.prompt_tokens, self.completion_tokens)
+            return {
+                "api_calls": self.api_calls,
+                "images": self.images,
+                "fallbacks": self.fallbacks,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "estimated_cost_usd": round(cost, 6),
+                "cost_per_image_usd": round(cost / self.images, 6) if self.images else 0.0,
+                "elapsed_seconds": round(elapsed, 3),
+                "images_per_minute": round(self.images / elapsed * 60, 2) if elapsed > 0 else 0.0
+            }
+
+
+def _create_completion(
+    client: "OpenAI",
+    content: list,
+    max_tokens: int,
+    images: int,
+    reservation: Optional[CostReservation] = None
+):
+    """속도 제한·비용 한도를 거쳐 GPT 요청 (모든 분석 경로 공통)
+    
+    추정 비용을 요청 전에 예약(reservation 이 있으면 거기서 꺼냄)하고
+    응답의 실제 사용량으로 정산합니다. 요청이 실패하면 예약만 해제됩니다.
+    """
+    estimated = estimate_tokens(images, max_tokens)
+    budget = get_cost_budget()
+    estimated_usd = estimate_cost(estimated - max_tokens, max_tokens)
+    if reservation is not None:
+        reservation.take(estimated_usd)
+    else:
+        budget.reserve(estimated_usd)
+    
+    actual_usd = 0.0
+    try:
+        limiter = get_rate_limiter()
+        limiter.acquire(estimated)
+        response = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": content}],
+            max_tokens=max_tokens,
+            temperature=0.1
+        )
+        
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            limiter.settle(estimated, usage.total_tokens)
+            actual_usd = estimate_cost(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+        return response
+    finally:
+        budget.settle(estimated_usd, actual_usd)
+
+
+def analyze_image_with_gpt(
+    client: "OpenAI",
+    image_path: Path,
+    batch_name: str,
+    metrics: Optional[AnalysisMetrics] = None,
+    reservation: Optional[CostReservation] = None
+) -> dict:
+    """GPT Vision API를 사용하여 이미지 분석"""
+    
+    # 이미지 base64 인코딩
+    base64_image = encode_image(image_path)
+    
+    try:
+        response = _create_completion(
+            client,
+            [
+                {
+                    "type": "text",
+                    "text": ANALYSIS_PROMPT
+                },
+                _image_part(base64_image)
+            ],
+            max_tokens=500,
+            images=1,
+            reservation=reservation
+        )
+        if metrics is not None:
+            metrics.record(response, 1)
+        
+        # 응답에서 JSON 추출
+        content = _strip_code_fence(response.choices[0].message.content)
+        result = json.loads(content)
+        
+        # file_path 추가
+        result["file_path"] = f"{batch_name}/{image_path.name}"
+        result["batch"] = batch_name
+        
+        # confidence가 없으면 기본값 설정
+        if "confidence" not in result:
+            result["confidence"] = 0.85
+        
+        return result
+        
+    except json.JSONDecodeError as e:
+        logger.warning(f"JSON 파싱 오류 ({image_path.name}): {e}")
+        # 기본값 반환
+        return _fallback_result(f"{batch_name}/{image_path.name}", batch_name)
+    except Exception as e:
+        logger.error(f"API 호출 오류 ({image_path.name}): {e}")
+        raise
+
+
+def _validate_result(entry) -> Optional[dict]:
+    """묶음 응답의 개별 결과 검증 (형식이 맞지 않으면 None)"""
+    if not isinstance(entry, dict):
+        return None
+    if not isinstance(entry.get("has_step"), bool):
+        return None
+    
+    width_class = entry.get("width_class")
+    if not isinstance(width_class, list) or not width_class:
+        return None
+    if any(w not in WIDTH_CLASSES for w in width_class):
+        return None
+    
+    chair = entry.get("chair")
+    if not isinstance(chair, dict) or any(not isinstance(chair.get(k), bool) for k in CHAIR_KEYS):
+        return None
+    
+    confidence = entry.get("confidence", 0.85)
+    if not isinstance(confidence, (int, float)) or isinstance(confidence, bool) or not 0.0 <= confidence <= 1.0:
+        return None
+    
+    return {
+        "has_step": entry["has_step"],
+        "width_class": width_class,
+        "chair": {k: chair[k] for k in CHAIR_KEYS},
+        "confidence": float(confidence)
+    }
+
+
+def analyze_images_packed(
+    client: "OpenAI",
+    images: List[Tuple[Path, str]],
+    metrics: Optional[AnalysisMetrics] = None,
+    reservation: Optional[CostReservation] = None
+) -> List[Optional[dict]]:
+    """여러 이미지를 한 번의 요청으로 분석
+    
+    이미지마다 번호가 붙은 슬롯으로 보내고 JSON 배열로 결과를 받습니다.
+    누락되었거나 형식이 잘못된 슬롯은 None으로 반환됩니다.
+    """
+    content = [{"type": "text", "text": PACKED_PROMPT.format(count=len(images))}]
+    for index, (image_path, _) in enumerate(images, 1):
+        content.append({"type": "text", "text": f"[이미지 {index}]"})
+        content.append(_image_part(encode_image(image_path)))
+    
+    response = _create_completion(
+        client, content, max_tokens=200 * len(images) + 100, images=len(images), reservation=reservation
+    )
+    if metrics is not None:
+        metrics.record(response, 0)
+    
+    results: List[Optional[dict]] = [None] * len(images)
+    try:
+        entries = json.loads(_strip_code_fence(response.choices[0].message.content))
+    except json.JSONDecodeError as e:
+        logger.warning(f"묶음 응답 JSON 파싱 오류 ({len(images)}개 이미지): {e}")
+        return results
+    
+    if isinstance(entries, dict):
+        entries = entries.get("results", [])
+    if not isinstance(entries, list):
+        return results
+    
+    for entry in entries:
+        index = entry.get("index") if isinstance(entry, dict) else None
+        # bool 은 int 의 하위 클래스이므로 따로 제외
+        if not isinstance(index, int) or isinstance(index, bool) or not 1 <= index <= len(images) or results[index - 1] is not None:
+            continue
+        validated = _validate_result(entry)
+        if validated is None:
+            continue
+        image_path, batch_name = images[index - 1]
+        validated["file_path"] = f"{batch_name}/{image_path.name}"
+        validated["batch"] = batch_name
+        results[index - 1] = validated
+    
+    return results
+
+
+def analyze_batch(
+    client: "OpenAI",
+    images: List[Tuple[Path, str]],
+    pack_size: int = 1,
+    metrics: Optional[AnalysisMetrics] = None,
+    reservation: Optional[CostReservation] = None
+) -> List[Tuple[Path, str, Optional[dict], Optional[str]]]:
+    """이미지 목록 분석 (pack_size > 1 이면 묶음 모드)
+    
+    입력 순서대로 (이미지 경로, 배치명, 결과, 오류) 목록을 반환합니다.
+    묶음에서 누락·오류가 난 슬롯은 단건 요청으로 다시 분석합니다.
+    reservation 이 있으면 입장 시 예약한 비용에서 GPT 요청 비용을 꺼내 씁니다.
+    """
+    metrics = metrics if metrics is not None else AnalysisMetrics()
+    outcomes = []
+    
+    for start in range(0, len(images), max(1, pack_size)):
+        chunk = images[start:start + max(1, pack_size)]
+        packed: List[Optional[dict]] = [None] * len(chunk)
+        
+        if len(chunk) > 1:
+            try:
+                packed = analyze_images_packed(client, chunk, metrics, reservation)
+            except Exception as e:
+                logger.warning(f"묶음 요청 실패, 단건으로 재시도 ({len(chunk)}개): {e}")
+        
+        for (image_path, batch_name), result in zip(chunk, packed):
+            if result is not None:
+                metrics.count(images=1)
+                outcomes.append((image_path, batch_name, result, None))
+                continue
+            
+            if len(chunk) > 1:
+                metrics.count(fallbacks=1)
+            try:
+                result = analyze_image_with_gpt(client, image_path, batch_name, metrics, reservation)
+                outcomes.append((image_path, batch_name, result, None))
+            except Exception as e:
+                outcomes.append((image_path, batch_name, None, str(e)))
+    
+    return outcomes
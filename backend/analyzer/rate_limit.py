@@ -0,0 +1,236 @@
+"""
+GPT 호출 속도 제한 및 일일 비용 한도
+
+프로세스 전체에서 하나의 제한기를 공유합니다. 분당 요청 수(RPM)와
+분당 토큰 수(TPM)를 각각 GCRA 방식 토큰 버킷으로 관리하여, 허용된
+버스트 이상으로 몰리지 않고 일정한 간격으로 요청이 나가도록 합니다.
+토큰 수는 요청 전에 추정해 예약하고, 응답을 받으면 실제 사용량으로 보정합니다.
+비용도 같은 방식으로 요청(또는 분석 요청 입장) 시점에 추정 비용을 예약하고
+실제 비용으로 정산하므로, 동시에 들어온 요청들이 함께 한도를 넘지 않습니다.
+"""
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from backend.utils.config import settings
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 분석 프롬프트(텍스트) 토큰 추정치
+PROMPT_TOKENS = 600
+
+
+class BudgetExceeded(Exception):
+    """일일 비용 한도 초과"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("일일 GPT 비용 한도를 초과했습니다")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """GCRA 토큰 버킷 (분당 rate, burst_seconds 만큼의 버스트 허용)"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 1.0):
+        self.rate_per_minute = rate_per_minute
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.tolerance = burst_seconds
+        self._tat = 0.0  # 이론적 다음 도착 시각
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float, now: Optional[float] = None) -> float:
+        """amount 만큼 예약하고 기다려야 할 시간(초) 반환"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            tat = max(self._tat, now)
+            wait = max(0.0, tat - self.tolerance - now)
+            self._tat = tat + amount * self.interval
+            return wait
+
+    def adjust(self, delta: float):
+        """예약량 보정 (실제 사용량 - 추정치)"""
+        if not self.interval:
+            return
+        with self._lock:
+            self._tat = max(time.monotonic(), self._tat + delta * self.interval)
+
+    def backlog(self, now: Optional[float] = None) -> float:
+        """이미 예약되어 기다리는 시간(초)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return max(0.0, self._tat - self.tolerance - now)
+
+
+class RateLimiter:
+    """RPM·TPM 동시 제한"""
+
+    def __init__(self, rpm: float, tpm: float, burst_seconds: float = 1.0):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.waited_seconds = 0.0
+
+    def acquire(self, estimated_tokens: int):
+        """요청 하나를 보낼 수 있을 때까지 대기 (스레드에서 호출)"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            self.waited_seconds += wait
+            time.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """응답의 실제 토큰 사용량으로 TPM 예약 보정"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def backlog(self) -> float:
+        return max(self.requests.backlog(), self.tokens.backlog())
+
+
+def estimate_tokens(images: int, max_tokens: int) -> int:
+    """요청 토큰 추정 (제공자는 max_tokens 까지 포함해 TPM 을 계산함)"""
+    return PROMPT_TOKENS + images * settings.GPT_TOKENS_PER_IMAGE + max_tokens
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (
+        prompt_tokens / 1000 * settings.GPT_INPUT_PRICE_PER_1K
+        + completion_tokens / 1000 * settings.GPT_OUTPUT_PRICE_PER_1K
+    )
+
+
+def estimate_analysis_cost(images: int) -> float:
+    """이미지 수 기준 비용 추정 (단건 요청, 최대 응답 길이 기준으로 보수적으로 계산)"""
+    return images * estimate_cost(PROMPT_TOKENS + settings.GPT_TOKENS_PER_IMAGE, 500)
+
+
+def _seconds_until_tomorrow() -> float:
+    now = datetime.now()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (tomorrow - now).total_seconds()
+
+
+class CostBudget:
+    """일일 비용 한도 (0 이면 제한 없음, 자정에 초기화)
+
+    사용 금액(spent)과 진행 중인 요청의 예약 금액(reserved)을 함께 한도와
+    비교합니다. 예약은 reserve() 로 잡고 settle() 로 실제 비용을 기록하며 해제합니다.
+    """
+
+    def __init__(self, daily_usd: float):
+        self.daily_usd = daily_usd
+        self._day = date.today()
+        self._spent = 0.0
+        self._reserved = 0.0
+        self._lock = threading.Lock()
+
+    def _rollover(self):
+        # 진행 중인 예약은 날짜가 바뀌어도 유지
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._spent = 0.0
+
+    @property
+    def spent(self) -> float:
+        with self._lock:
+            self._rollover()
+            return self._spent
+
+    @property
+    def reserved(self) -> float:
+        with self._lock:
+            return self._reserved
+
+    def remaining(self) -> Optional[float]:
+        if self.daily_usd <= 0:
+            return None
+        with self._lock:
+            self._rollover()
+            return max(0.0, self.daily_usd - self._spent - self._reserved)
+
+    def _ensure_room(self, estimated_usd: float):
+        if self.daily_usd > 0 and self._spent + self._reserved + estimated_usd > self.daily_usd:
+            raise BudgetExceeded(math.ceil(_seconds_until_tomorrow()))
+
+    def check(self, estimated_usd: float = 0.0):
+        """추정 비용을 더하면 한도를 넘는 경우 BudgetExceeded (예약하지 않음)"""
+        with self._lock:
+            self._rollover()
+            self._ensure_room(estimated_usd)
+
+    def reserve(self, estimated_usd: float) -> "CostReservation":
+        """추정 비용 예약 (한도를 넘으면 BudgetExceeded, 확인과 예약은 한 번에 수행)"""
+        with self._lock:
+            self._rollover()
+            self._ensure_room(estimated_usd)
+            self._reserved += estimated_usd
+        return CostReservation(self, estimated_usd)
+
+    def settle(self, reserved_usd: float, actual_usd: float):
+        """예약 해제 후 실제 비용 기록"""
+        with self._lock:
+            self._rollover()
+            self._reserved = max(0.0, self._reserved - reserved_usd)
+            self._spent += actual_usd
+
+    def charge(self, usd: float):
+        self.settle(0.0, usd)
+
+
+class CostReservation:
+    """분석 요청 입장 시 예약한 비용
+
+    GPT 요청마다 take() 로 필요한 만큼 꺼내 쓰고(모자라면 한도에서 추가 예약),
+    요청이 끝나면 release() 로 남은 예약을 돌려줍니다.
+    """
+
+    def __init__(self, budget: CostBudget, usd: float):
+        self.budget = budget
+        self.remaining = usd
+        self._lock = threading.Lock()
+
+    def take(self, estimated_usd: float):
+        """요청 하나의 추정 비용을 예약에서 꺼냄 (이후 budget.settle(estimated_usd, 실제 비용)으로 정산)"""
+        with self._lock:
+            taken = min(self.remaining, estimated_usd)
+            self.remaining -= taken
+        if estimated_usd > taken:
+            try:
+                self.budget.reserve(estimated_usd - taken)
+            except BudgetExceeded:
+                with self._lock:
+                    self.remaining += taken
+                raise
+
+    def release(self):
+        """쓰지 않은 예약 반환 (여러 번 호출해도 안전)"""
+        with self._lock:
+            unused, self.remaining = self.remaining, 0.0
+        self.budget.settle(unused, 0.0)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_cost_budget: Optional[CostBudget] = None
+_init_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 공용 속도 제한기"""
+    global _rate_limiter
+    with _init_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(settings.GPT_RPM, settings.GPT_TPM, settings.GPT_BURST_SECONDS)
+        return _rate_limiter
+
+
+def get_cost_budget() -> CostBudget:
+    """프로세스 공용 일일 비용 한도"""
+    global _cost_budget
+    with _init_lock:
+        if _cost_budget is None:
+            _cost_budget = CostBudget(settings.GPT_DAILY_BUDGET_USD)
+        return _cost_budget
@@ -0,0 +1,64 @@
+"""
+이벤트 루프 밖 블로킹 I/O 실행
+
+파일 파싱, 디렉터리 목록, 로그 기록처럼 이벤트 루프를 멈추게 하는 작업을
+크기가 정해진 스레드 풀에서 실행합니다. 요청 경로(분석 준비, 업로드 기록)와
+주기 작업(로그 압축)의 파일 I/O 도 모두 이 풀을 씁니다.
+기본 실행기(asyncio.to_thread)는 외부 API 를 기다리는 분석 큐 작업과 시작 시
+워밍업처럼 오래 붙잡는 작업만 써서, 분석이 몰려도 조회용 I/O 가 밀리지 않게 합니다.
+SingleFlight 로 같은 키의 동시 콜드 로드를 진행 중인 작업 하나로 합칩니다.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from backend.utils.config import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.BLOCKING_IO_WORKERS), thread_name_prefix="blocking-io"
+        )
+    return _executor
+
+
+async def run(func: Callable, *args, **kwargs):
+    """블로킹 함수를 I/O 스레드 풀에서 실행하고 결과를 기다림"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 진행 중인 작업 하나로 합침 (완료되면 키 해제)"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def run(self, key: Hashable, func: Callable, *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(run(func, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # 기다리던 요청 하나가 취소되어도 공유 작업은 계속
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -1,23 +1,52 @@
 """
 FastAPI 메인 애플리케이션
 """
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
+from datetime import date, datetime
+import asyncio
 import glob
 import json
-import base64
-from openai import OpenAI
+import re
+import time
+import uuid
+from concurrent.futures import Future
 
 from backend.utils.config import settings
-from backend.utils.logger import setup_logger
-from backend.processor.data_manager import DataManager
+from backend.utils.logger import configure_logging, setup_logger, request_id_var
+from backend.processor.change_log import ChangeLog
+from backend.processor.data_manager import DataManager, VersionConflict
+from backend.processor.data_cube import CHAIR_KEYS, DIMENSIONS as CUBE_DIMENSIONS, WIDTH_CLASSES
+from backend.processor.phash_index import PerceptualHashIndex
+from backend.processor.jsonl_writer import close_all_writers, get_writer
+from backend.processor.prediction_store import PredictionStore, compact_prediction_log, log_size
+from backend.processor.review_queue import FALLBACK_CONFIDENCE, ReviewQueue
+from backend.processor.store_index import StoreIndex
+from backend.analyzer.gpt_vision import AnalysisMetrics, analyze_batch, analyze_image_with_gpt, create_client
+from backend.analyzer.analysis_queue import AnalysisQueue, QueueFull, gather_jobs
+from backend.analyzer.rate_limit import (
+    BudgetExceeded, CostReservation, estimate_analysis_cost, get_cost_budget, get_rate_limiter
+)
+from backend.api.projection import (
+    DEFAULT_IMAGE_FIELDS, DEFAULT_REVIEW_FIELDS, IMAGE_FIELDS, REVIEW_FIELDS,
+    parse_fields, project_record, shape_rows
+)
+from backend.api import blocking
+from backend.api.blocking import SingleFlight
+from backend.api.query_cache import QueryCache, normalize_query
+from backend.api.recommendations import image_detail
+from backend.api.upload import StreamingImageUpload
+from backend.api.warmup import Warmup
 
 logger = setup_logger(__name__)
+access_logger = setup_logger("backend.api.access")
+# 이미지별 분석 로그 (LOG_SAMPLING으로 샘플링)
+analysis_logger = setup_logger("backend.api.analysis")
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -35,8 +64,205 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """요청 ID 부여 및 처리 시간 기록"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        response.headers["X-Request-ID"] = request_id
+        access_logger.info(
+            f"{request.method} {request.url.path} {response.status_code}",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": duration_ms
+            }
+        )
+        return response
+    finally:
+        request_id_var.reset(token)
+
+
+# 사진수집현황 경로 및 분석 결과 파일
+PHOTO_COLLECTION_PATH = settings.BASE_DIR / "data" / "사진수집현황"
+ANALYSIS_OUTPUT_FILE = PHOTO_COLLECTION_PATH / "gpt_analysis_results.jsonl"
+BATCH_NAME_PATTERN = re.compile(r'^[\w\-가-힣]+$')
+
+
 # Data Manager 초기화
-data_manager = DataManager(settings.GT_JSONL_PATH)
+data_manager = DataManager(
+    settings.GT_JSONL_PATH,
+    shared_dir=settings.SHARED_DATASET_DIR,
+    shard_dir=settings.GT_SHARD_DIR,
+    shard_workers=settings.GT_SHARD_WORKERS
+)
+# GT 변경 순번 (델타 동기화)
+change_log = ChangeLog(settings.GT_JSONL_PATH)
+
+# 유사 이미지 인덱스 (사진수집현황, 검수대상목록, spider)
+phash_index = PerceptualHashIndex(
+    {
+        "사진수집현황": settings.BASE_DIR / "data" / "사진수집현황",
+        "검수대상목록": settings.BASE_DIR / "data" / "검수대상목록",
+        "spider": settings.BASE_DIR / "data" / "spider",
+    },
+    cache_path=settings.PHASH_CACHE_PATH
+)
+
+PREDICTION_SOURCES = {
+    "사진수집현황": ANALYSIS_OUTPUT_FILE,
+    "검수대상목록": settings.BASE_DIR / "data" / "검수대상목록" / "gpt_analysis_results.jsonl",
+}
+
+
+def review_neighbors(source: str):
+    """검수 큐용 유사 이미지 분석 결과 조회 함수 (인덱스가 빌드된 뒤에만 사용)"""
+    def neighbors(file_path: str) -> List[tuple]:
+        if not phash_index.built:
+            return []
+        result = []
+        for neighbor in phash_index.find_similar(f"{source}/{file_path}", settings.PHASH_RADIUS):
+            root, _, neighbor_path = neighbor['key'].partition('/')
+            store = prediction_stores.get(root)
+            record = store.peek(neighbor_path) if store is not None else None
+            if record is None or record.get('confidence') == FALLBACK_CONFIDENCE:
+                continue
+            result.append((neighbor_path if root == source else None, record))
+        return result
+    return neighbors
+
+
+def labeled_from(source: str):
+    """검수 큐 제외 함수 (같은 출처에서 레이블된 이미지만, 다른 출처의 같은 경로는 별개 이미지)"""
+    return lambda file_path: data_manager.has_label(file_path, source)
+
+
+# 분석 결과별 매장 인덱스와 검수 우선순위 큐 (GT 레이블이 있는 이미지는 검수 큐에서 제외)
+store_indexes = {
+    source: StoreIndex(data_manager.calculate_accessibility_score) for source in PREDICTION_SOURCES
+}
+review_queues = {
+    source: ReviewQueue(review_neighbors(source), exclude=labeled_from(source)) for source in PREDICTION_SOURCES
+}
+
+# file_path 별 최신 분석 결과 (사진수집현황 우선)
+prediction_stores = {
+    source: PredictionStore(
+        path,
+        history=settings.PREDICTION_HISTORY,
+        indexes=[store_indexes[source], review_queues[source]]
+    )
+    for source, path in PREDICTION_SOURCES.items()
+}
+
+# 시작 시 백그라운드 워밍업 (데이터 로드 및 캐시 생성)
+warmup = Warmup(settings.WARMUP_MAX_ATTEMPTS, settings.WARMUP_RETRY_BACKOFF)
+warmup.register("dataset", data_manager.load_all_data)
+warmup.register("statistics", data_manager.get_statistics)
+warmup.register("positions", data_manager.get_positions)
+warmup.register("change_log", change_log.load)
+warmup.register("data_cube", data_manager.get_cube)
+warmup.register("store_index", data_manager.get_store_index)
+warmup.register("time_index", data_manager.get_time_index)
+warmup.register("predictions", lambda: sum(store.load() for store in prediction_stores.values()))
+# 두 결과 파일을 모두 읽은 뒤 검수 점수 계산 (유사 이미지 불일치는 phash 인덱스 구성 후 다시 계산)
+warmup.register("review_queue", lambda: sum(queue.rescore_all() for queue in review_queues.values()))
+
+
+# 콜드 캐시 로드는 I/O 스레드 풀에서 (동시 미스는 진행 중인 로드 하나를 공유)
+cold_loads = SingleFlight()
+WARM_GETTERS = {
+    "dataset": data_manager.load_all_data,
+    "stats_cache": data_manager.get_statistics,
+    "positions": data_manager.get_positions,
+    "cube": data_manager.get_cube,
+    "store_index": data_manager.get_store_index,
+    "time_index": data_manager.get_time_index,
+}
+
+
+async def ensure_warm(*names: str):
+    """데이터셋과 지정한 캐시가 비어 있으면 이벤트 루프 밖에서 구성하고 기다림
+    
+    조회와 커밋의 제자리 갱신은 모두 I/O 스레드에서 실행되며, 데이터 관리자의
+    읽기/쓰기 잠금으로 서로 겹치지 않습니다.
+    """
+    for name in ("dataset",) + names:
+        if not data_manager.is_warm(name):
+            await cold_loads.run(name, WARM_GETTERS[name])
+
+
+async def ensure_predictions(*stores: PredictionStore):
+    """분석 결과 파일을 이벤트 루프 밖에서 읽음 (동시 요청은 진행 중인 읽기 하나를 공유)
+    
+    처음 조회하거나 교체·압축된 파일은 전체를 다시 읽고, 그 외에는 새로 추가된 줄만
+    이어 읽습니다 (인덱스 갱신 콜백도 I/O 스레드에서 실행).
+    """
+    for store in stores:
+        if store.stale():
+            await cold_loads.run(("predictions", str(store.path)), store.load)
+        elif store.appended():
+            await cold_loads.run(("refresh", str(store.path)), store.refresh)
+
+
+# 분석 큐 (모든 분석 경로가 공유, 클라이언트별 공정 순서)
+analysis_queue = AnalysisQueue(
+    settings.ANALYSIS_CONCURRENCY,
+    max_pending=settings.ANALYSIS_QUEUE_MAX,
+    max_pending_per_client=settings.ANALYSIS_QUEUE_MAX_PER_CLIENT
+)
+
+
+async def compact_predictions_periodically():
+    """분석 결과·GT 로그가 커지면 주기적으로 압축 (작성기는 세그먼트 교체 순간만 대기)"""
+    while True:
+        await asyncio.sleep(settings.PREDICTION_COMPACT_INTERVAL)
+        for store in prediction_stores.values():
+            try:
+                if await blocking.run(log_size, store.path) < settings.PREDICTION_COMPACT_MIN_BYTES:
+                    continue
+                await blocking.run(
+                    compact_prediction_log, store.path, max(1, settings.PREDICTION_HISTORY)
+                )
+            except Exception as e:
+                logger.error(f"Prediction log compaction failed ({store.path}): {e}")
+        try:
+            # 덮어쓴 줄·삭제된 레코드가 살아 있는 레코드 수 이상이면 GT 로그 압축
+            await blocking.run(change_log.refresh)
+            if (
+                change_log.dead_lines >= max(1, change_log.live_records)
+                and await blocking.run(log_size, data_manager.gt_jsonl_path) >= settings.PREDICTION_COMPACT_MIN_BYTES
+            ):
+                await blocking.run(data_manager.compact_log)
+        except Exception as e:
+            logger.error(f"GT log compaction failed: {e}")
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """로깅 구성 후 데이터 워밍업을 백그라운드로 시작"""
+    configure_logging()
+    if settings.WARMUP_ON_STARTUP:
+        warmup.start()
+    if settings.PREDICTION_COMPACT_INTERVAL > 0:
+        app.state.compaction_task = asyncio.create_task(compact_predictions_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_analysis_queue():
+    """분석 워커 종료 후 남은 결과 기록"""
+    warmup.stop()
+    compaction_task = getattr(app.state, "compaction_task", None)
+    if compaction_task is not None:
+        compaction_task.cancel()
+    await analysis_queue.shutdown()
+    await blocking.run(close_all_writers)
+    blocking.shutdown()
 
 # 이미지 파일 서빙
 img_gt_path = settings.IMG_GT_PATH
@@ -95,11 +321,30 @@ async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """레디니스 체크 (워밍업 진행 상황)"""
+    progress = warmup.progress()
+    if not progress['ready']:
+        return JSONResponse(status_code=503, content=progress)
+    return progress
+
+
+def parse_shards(value: Optional[str]) -> Optional[List[str]]:
+    """쉼표로 구분된 샤드 이름 (미지정이면 None)"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()] or None
+
+
 @app.get("/api/statistics")
-async def get_statistics():
-    """전체 통계"""
+async def get_statistics(
+    shard: Optional[str] = Query(None, description="파티션 모드에서 집계할 샤드 (쉼표 구분)")
+):
+    """전체 통계 (shard 를 지정하면 해당 샤드 집계만 합산)"""
     try:
-        stats = data_manager.get_statistics()
+        await ensure_warm("stats_cache")
+        stats = await blocking.run(data_manager.get_statistics, shards=parse_shards(shard))
         
         # 추가 계산
         total = stats['total_images']
@@ -110,6 +355,11 @@ async def get_statistics():
             }
         
         return stats
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": str(e)}
+        )
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
         return JSONResponse(
@@ -118,6 +368,224 @@ async def get_statistics():
         )
 
 
+@app.get("/api/shards")
+async def get_shards():
+    """GT 파티션(샤드)별 이미지 수와 집계"""
+    try:
+        await ensure_warm()
+        return {
+            "partitioned": data_manager.shard_dir is not None,
+            "shards": await blocking.run(data_manager.shard_summaries)
+        }
+    except Exception as e:
+        logger.error(f"Error getting shards: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+def crosstab(dimensions: List[str], **filters) -> Dict:
+    """데이터 큐브 교차표 (커밋의 제자리 갱신과 겹치지 않게 읽기 잠금)"""
+    cube = data_manager.get_cube()
+    with data_manager.reading():
+        return cube.crosstab(dimensions, **filters)
+
+
+def trends(bucket: str, captured_from, captured_to) -> Dict:
+    """촬영 시기별 추이 (커밋의 제자리 갱신과 겹치지 않게 읽기 잠금)"""
+    time_index = data_manager.get_time_index()
+    with data_manager.reading():
+        return {
+            "bucket": bucket,
+            "total": len(time_index),
+            "buckets": time_index.rollup(bucket, captured_from, captured_to)
+        }
+
+
+@app.get("/api/crosstab")
+async def get_crosstab(
+    by: str = Query("has_step,width_class", description=f"집계 기준 (쉼표 구분: {', '.join(CUBE_DIMENSIONS)})"),
+    has_step: Optional[bool] = Query(None, description="단차 유무 필터"),
+    width_class: Optional[str] = Query(None, description="통로 너비 필터"),
+    chair_type: Optional[str] = Query(None, description="의자 타입 필터"),
+    grade: Optional[str] = Query(None, description="등급 필터 (S, A, B, C, D)")
+):
+    """속성 교차표 (데이터 큐브에서 계산)"""
+    try:
+        dimensions = [dim.strip() for dim in by.split(",") if dim.strip()]
+        await ensure_warm("cube")
+        return await blocking.run(
+            crosstab,
+            dimensions,
+            has_step=has_step,
+            width_class=width_class,
+            chair_type=chair_type,
+            grade=grade
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": str(e)}
+        )
+    except Exception as e:
+        logger.error(f"Error getting crosstab: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/trends")
+async def get_trends(
+    bucket: str = Query("month", pattern="^(day|week|month)$", description="집계 단위"),
+    captured_from: Optional[Union[datetime, date]] = Query(None, description="촬영 시각 시작 (포함, 날짜 또는 일시)"),
+    captured_to: Optional[Union[datetime, date]] = Query(None, description="촬영 시각 끝 (포함, 날짜 또는 일시)")
+):
+    """촬영 시기별 접근성 추이"""
+    try:
+        await ensure_warm("time_index")
+        return await blocking.run(trends, bucket, captured_from, captured_to)
+    except Exception as e:
+        logger.error(f"Error getting trends: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+# /api/images 응답 캐시 (데이터셋 버전이 바뀌면 자동으로 비워짐)
+images_cache = QueryCache(settings.IMAGE_CACHE_MAX_ENTRIES, settings.IMAGE_CACHE_MAX_BYTES)
+
+IMAGE_FILTERS = (
+    "skip", "limit", "has_step", "width_class", "chair_type", "needs_relabeling",
+    "captured_from", "captured_to", "sort", "shards"
+)
+
+# 재로딩·레이블 커밋 후 미리 계산할 갤러리 첫 페이지 (필터 조합 × 페이지 크기)
+PREWARM_IMAGE_QUERIES = [
+    {},
+    {"has_step": False},
+    {"has_step": True},
+    *({"width_class": width} for width in WIDTH_CLASSES),
+    *({"chair_type": chair} for chair in ("movable", "high_movable", "fixed", "floor")),
+]
+PREWARM_PAGE_SIZES = (12, 20)
+
+
+def image_query(**params) -> Dict:
+    """/api/images 쿼리 (지정하지 않은 파라미터는 기본값)"""
+    query = {name: None for name in IMAGE_FILTERS}
+    query.update(skip=0, limit=20, fields=None, shape="objects")
+    query.update(params)
+    return query
+
+
+def render_images(query: Dict, version: Optional[int] = None) -> Optional[bytes]:
+    """/api/images 응답 본문 (같은 쿼리·데이터셋 버전이면 캐시에서 재사용, I/O 스레드에서 호출)
+    
+    version 을 주면 데이터셋이 그 버전이 아닐 때 계산하지 않고 None 을 반환합니다.
+    """
+    data_manager.load_all_data()
+    with data_manager.reading():
+        if version is not None and data_manager.version != version:
+            return None
+        return _render_images(query)
+
+
+def _render_images(query: Dict) -> bytes:
+    version = data_manager.version
+    key = normalize_query(query)
+    body = images_cache.get(version, key)
+    if body is not None:
+        return body
+    
+    result = data_manager.get_images(**{name: query[name] for name in IMAGE_FILTERS})
+    selected, shape = query['fields'], query['shape']
+    if selected is not None or shape == "compact":
+        # 요청한 필드만 추출해 바로 인코딩
+        selected = selected or list(DEFAULT_IMAGE_FIELDS)
+        rows = [
+            project_record(item, selected, data_manager.calculate_accessibility_score)
+            for item in result['items']
+        ]
+        content = {
+            "total": result['total'],
+            "skip": query['skip'],
+            "limit": query['limit'],
+            "version": version,
+            **shape_rows(rows, selected, shape)
+        }
+    else:
+        # 각 이미지에 점수 추가 (캐시된 레코드는 수정하지 않음)
+        content = {
+            **result,
+            "items": [
+                dict(item, accessibility=data_manager.calculate_accessibility_score(item))
+                for item in result['items']
+            ],
+            # 레이블 커밋 시 expected_version 으로 사용
+            "version": version
+        }
+    
+    body = JSONResponse(content=content).body
+    images_cache.put(version, key, body)
+    return body
+
+
+def prewarm_queries() -> List[Dict]:
+    """미리 계산할 쿼리 (IMAGE_CACHE_PREWARM 이 꺼져 있으면 없음)"""
+    if not settings.IMAGE_CACHE_PREWARM:
+        return []
+    return [
+        image_query(limit=limit, **params)
+        for params in PREWARM_IMAGE_QUERIES for limit in PREWARM_PAGE_SIZES
+    ]
+
+
+def prewarm_images() -> int:
+    """자주 쓰는 필터 조합의 첫 페이지를 캐시에 미리 계산"""
+    for query in prewarm_queries():
+        render_images(query)
+    return len(images_cache)
+
+
+# 커밋 후 미리 계산 상태 (실행 중인 작업 하나, 마지막으로 끝까지 계산한 버전)
+prewarm_running = False
+prewarmed_version: Optional[int] = None
+
+
+async def prewarm_images_after_commit():
+    """커밋 후 미리 계산 (읽기만 하므로 I/O 스레드에서 실행)
+    
+    커밋이 몰려도 작업은 하나만 실행하고 최신 버전만 계산합니다. 이미 실행 중이면
+    바로 돌아가고, 실행 중인 작업은 페이지마다 버전을 확인해 그 사이 커밋이 들어오면
+    남은 페이지를 건너뛰고 새 버전으로 다시 계산합니다.
+    """
+    global prewarm_running, prewarmed_version
+    if prewarm_running:
+        return
+    prewarm_running = True
+    try:
+        while data_manager.version != prewarmed_version:
+            version = data_manager.version
+            for query in prewarm_queries():
+                if data_manager.version != version:
+                    break
+                await blocking.run(render_images, query, version)
+            else:
+                prewarmed_version = version
+    finally:
+        prewarm_running = False
+
+
+# 데이터 로드·인덱스 워밍업 뒤 마지막 필수 단계로 실행
+warmup.register("image_cache", prewarm_images)
+# 모든 이미지 해시는 오래 걸리므로 레디니스 뒤에 구성하고 유사 이미지 불일치 점수 재계산
+warmup.register("phash_index", phash_index.build, required=False)
+warmup.register("review_queue_neighbors", lambda: sum(queue.rescore_all() for queue in review_queues.values()), required=False)
+
+
 @app.get("/api/images")
 async def get_images(
     skip: int = Query(0, ge=0, description="건너뛸 항목 수"),
@@ -125,24 +593,45 @@ async def get_images(
     has_step: Optional[bool] = Query(None, description="단차 유무 필터"),
     width_class: Optional[str] = Query(None, description="통로 너비 필터"),
     chair_type: Optional[str] = Query(None, description="의자 타입 필터"),
-    needs_relabeling: Optional[bool] = Query(None, description="레이블링 필요 필터")
+    needs_relabeling: Optional[bool] = Query(None, description="레이블링 필요 필터"),
+    captured_from: Optional[Union[datetime, date]] = Query(None, description="촬영 시각 시작 (포함, 날짜 또는 일시)"),
+    captured_to: Optional[Union[datetime, date]] = Query(None, description="촬영 시각 끝 (포함, 날짜 또는 일시)"),
+    sort: Optional[str] = Query(None, pattern="^-?captured_at$", description="captured_at 또는 -captured_at"),
+    shard: Optional[str] = Query(None, description="파티션 모드에서 조회할 샤드 (쉼표 구분)"),
+    fields: Optional[str] = Query(None, description=f"응답 필드 (쉼표 구분: {', '.join(IMAGE_FIELDS)})"),
+    shape: str = Query("objects", pattern="^(objects|compact)$", description="objects 또는 compact (필드 이름 + 값 배열)")
 ):
-    """이미지 목록 조회"""
+    """이미지 목록 조회 (같은 쿼리는 데이터셋 버전이 바뀔 때까지 캐시된 응답 사용)"""
+    try:
+        selected = parse_fields(fields, IMAGE_FIELDS)
+        shards = parse_shards(shard)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     try:
-        result = data_manager.get_images(
+        query = image_query(
             skip=skip,
             limit=limit,
             has_step=has_step,
             width_class=width_class,
             chair_type=chair_type,
-            needs_relabeling=needs_relabeling
+            needs_relabeling=needs_relabeling,
+            captured_from=captured_from,
+            captured_to=captured_to,
+            sort=sort,
+            shards=sorted(set(shards)) if shards else None,
+            fields=selected,
+            shape=shape
+        )
+        if captured_from is not None or captured_to is not None or sort is not None:
+            await ensure_warm("time_index")
+        else:
+            await ensure_warm()
+        return Response(content=await blocking.run(render_images, query), media_type="application/json")
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": str(e)}
         )
-        
-        # 각 이미지에 점수 추가
-        for item in result['items']:
-            item['accessibility'] = data_manager.calculate_accessibility_score(item)
-        
-        return result
     except Exception as e:
         logger.error(f"Error getting images: {e}")
         return JSONResponse(
@@ -151,48 +640,64 @@ async def get_images(
         )
 
 
+class ImageDetailsRequest(BaseModel):
+    file_paths: List[str] = Field(..., min_length=1, max_length=200)
+
+
+def image_details(file_paths: List[str]) -> Dict:
+    """GT 레코드와 최신 분석 결과로 상세 목록 구성 (I/O 스레드에서 읽기 잠금)"""
+    data_manager.load_all_data()
+    with data_manager.reading():
+        data = data_manager.load_all_data()
+        positions = data_manager.get_positions()
+        items, missing = [], []
+        for file_path in dict.fromkeys(file_paths):
+            position = positions.get(file_path)
+            record = data[position] if position is not None else None
+            prediction = None
+            for source, store in prediction_stores.items():
+                prediction = store.peek(file_path)
+                if prediction is not None:
+                    prediction = {**prediction, "source": source}
+                    break
+            if record is None and prediction is None:
+                missing.append(file_path)
+                continue
+            items.append(image_detail(
+                record if record is not None else prediction,
+                data_manager.calculate_accessibility_score,
+                prediction
+            ))
+    return {"items": items, "missing": missing}
+
+
+@app.post("/api/images/details")
+async def get_image_details(request: ImageDetailsRequest):
+    """여러 이미지 상세를 한 번에 조회 (갤러리·모달 미리 가져오기)
+    
+    GT 레코드와 최신 GPT 분석 결과를 함께 반환하며, GT에 없는 이미지는 분석 결과로 상세를 만듭니다.
+    """
+    try:
+        await ensure_warm("positions")
+        await ensure_predictions(*prediction_stores.values())
+        return JSONResponse(content=await blocking.run(image_details, request.file_paths))
+    except Exception as e:
+        logger.error(f"Error getting image details: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
 @app.get("/api/images/{file_path:path}")
 async def get_image_detail(file_path: str):
     """이미지 상세 정보"""
     try:
-        data = data_manager.load_all_data()
-        
-        # 파일 경로로 찾기
-        for item in data:
-            if item.get('file_path') == file_path:
-                item['accessibility'] = data_manager.calculate_accessibility_score(item)
-                
-                # 개선 사항 추천
-                recommendations = []
-                
-                if item.get('has_step'):
-                    recommendations.append({
-                        "priority": "high",
-                        "category": "단차",
-                        "title": "경사로 설치 권장",
-                        "description": "휠체어 사용자를 위한 경사로 설치를 권장합니다."
-                    })
-                
-                if 'narrow' in item.get('width_class', []) or 'not_passable' in item.get('width_class', []):
-                    recommendations.append({
-                        "priority": "high",
-                        "category": "통로",
-                        "title": "통로 확장 필요",
-                        "description": "최소 0.9m 이상의 통로 너비 확보가 필요합니다."
-                    })
-                
-                chair = item.get('chair', {})
-                if not chair.get('has_movable_chair'):
-                    recommendations.append({
-                        "priority": "medium",
-                        "category": "의자",
-                        "title": "이동 가능한 의자 배치 권장",
-                        "description": "다양한 신체 조건의 고객을 위해 이동 가능한 의자를 배치하는 것이 좋습니다."
-                    })
-                
-                item['recommendations'] = recommendations
-                
-                return item
+        # 파일 경로 인덱스로 찾기
+        await ensure_warm("positions")
+        item = await blocking.run(data_manager.find_by_path, file_path)
+        if item is not None:
+            return image_detail(item, data_manager.calculate_accessibility_score)
         
         return JSONResponse(
             status_code=404,
@@ -211,19 +716,12 @@ async def get_image_detail(file_path: str):
 async def get_summary():
     """요약 대시보드 데이터"""
     try:
-        stats = data_manager.get_statistics()
-        data = data_manager.load_all_data()
-        
-        # 접근성 점수 평균 계산
-        total_score = 0
-        grade_counts = {'S': 0, 'A': 0, 'B': 0, 'C': 0, 'D': 0}
+        await ensure_warm("stats_cache")
+        stats = await blocking.run(data_manager.get_statistics)
         
-        for item in data:
-            accessibility = data_manager.calculate_accessibility_score(item)
-            total_score += accessibility['score']
-            grade_counts[accessibility['grade']] += 1
-        
-        avg_score = round(total_score / len(data), 1) if data else 0
+        # 점수 평균·등급 분포는 통계 캐시에서 (전체 데이터를 다시 순회하지 않음)
+        grade_counts = stats['grade_distribution']
+        avg_score = stats['average_score'] if stats['total_images'] > 0 else 0
         
         # 평균 등급 계산
         if avg_score >= 90:
@@ -255,19 +753,414 @@ async def get_summary():
             content={"error": str(e)}
         )
 
+@app.get("/api/duplicates")
+async def get_duplicates(
+    root: Optional[str] = Query(None, description="루트 폴더 (사진수집현황, 검수대상목록, spider)"),
+    radius: int = Query(settings.PHASH_RADIUS, ge=0, le=32, description="해밍 거리 반경")
+):
+    """유사 이미지 중복 그룹 (갤러리 접기용, 그룹 첫 항목이 대표 이미지)"""
+    try:
+        # 처음 호출 시 모든 이미지를 해시하므로 이벤트 루프 밖에서 실행
+        groups = await blocking.run(phash_index.duplicate_groups, radius, root)
+        return {
+            "radius": radius,
+            "total_groups": len(groups),
+            "duplicate_images": sum(len(group) - 1 for group in groups),
+            "groups": groups
+        }
+    except Exception as e:
+        logger.error(f"Error getting duplicates: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/similar/{key:path}")
+async def get_similar_images(
+    key: str,
+    radius: int = Query(settings.PHASH_RADIUS, ge=0, le=32, description="해밍 거리 반경")
+):
+    """유사 이미지 조회 (key 예: 사진수집현황/folder_00/image.webp)"""
+    try:
+        if await blocking.run(phash_index.hash_of, key) is None:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "이미지를 찾을 수 없습니다."}
+            )
+        return {
+            "key": key,
+            "radius": radius,
+            "neighbors": await blocking.run(phash_index.find_similar, key, radius)
+        }
+    except Exception as e:
+        logger.error(f"Error getting similar images: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+async def ensure_store_index(source: str):
+    """source 별 매장 인덱스의 콜드 로드를 이벤트 루프 밖에서 수행"""
+    if source == "gt":
+        await ensure_warm("store_index")
+    elif source in prediction_stores:
+        await ensure_predictions(prediction_stores[source])
+
+
+def get_store_index(source: str) -> Optional[StoreIndex]:
+    """source 별 매장 인덱스 (gt 는 검수 완료 데이터, 그 외는 GPT 분석 결과)"""
+    if source == "gt":
+        return data_manager.get_store_index()
+    if source not in prediction_stores:
+        return None
+    return store_indexes[source]
+
+
+def reading_store_index(source: str):
+    """매장 인덱스를 읽는 동안 제자리 갱신(GT 커밋 또는 분석 결과 이어 읽기)을 막는 잠금"""
+    if source == "gt":
+        return data_manager.reading()
+    return prediction_stores[source].reading()
+
+
+def get_store_images(source: str, store_id: str) -> List[dict]:
+    """매장 이미지 레코드 (gt 는 데이터 위치, 그 외는 file_path 기준)"""
+    members = get_store_index(source).members(store_id)
+    if source == "gt":
+        data = data_manager.load_all_data()
+        return [data[position] for position in sorted(members)]
+    return [members[file_path] for file_path in sorted(members)]
+
+
+def store_summaries(source: str, sort: str) -> Optional[tuple]:
+    """(매장 집계 목록, 매칭되지 않은 이미지 수) 또는 알 수 없는 source 면 None (I/O 스레드에서 호출)"""
+    index = get_store_index(source)
+    if index is None:
+        return None
+    with reading_store_index(source):
+        return index.summaries(sort), index.unmatched
+
+
+def store_detail(source: str, store_id: str) -> Optional[Dict]:
+    """매장 집계와 이미지 목록 (없는 매장이면 {}) 또는 알 수 없는 source 면 None (I/O 스레드에서 호출)"""
+    index = get_store_index(source)
+    if index is None:
+        return None
+    if source == "gt":
+        data_manager.load_all_data()
+    with reading_store_index(source):
+        summary = index.summary(store_id)
+        if summary is None:
+            return {}
+        images = [
+            {**item, "accessibility": data_manager.calculate_accessibility_score(item)}
+            for item in get_store_images(source, store_id)
+        ]
+    return {**summary, "source": source, "images": images}
+
+
+@app.get("/api/stores")
+async def get_stores(
+    source: str = Query("gt", description="gt, 사진수집현황 또는 검수대상목록"),
+    skip: int = Query(0, ge=0, description="건너뛸 항목 수"),
+    limit: int = Query(50, ge=1, le=500, description="가져올 항목 수"),
+    sort: str = Query("store_id", pattern="^(store_id|score|images)$", description="정렬 기준")
+):
+    """매장별 접근성 집계 목록"""
+    try:
+        await ensure_store_index(source)
+        summaries = await blocking.run(store_summaries, source, sort)
+        if summaries is None:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"알 수 없는 source입니다: {source}"}
+            )
+        stores, unmatched = summaries
+        return {
+            "source": source,
+            "total": len(stores),
+            "skip": skip,
+            "limit": limit,
+            "unmatched_images": unmatched,
+            "items": stores[skip:skip + limit]
+        }
+    except Exception as e:
+        logger.error(f"Error getting stores: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/stores/{store_id}")
+async def get_store_detail(
+    store_id: str,
+    source: str = Query("gt", description="gt, 사진수집현황 또는 검수대상목록")
+):
+    """매장 상세 (집계 및 이미지 목록)"""
+    try:
+        await ensure_store_index(source)
+        detail = await blocking.run(store_detail, source, store_id)
+        if detail is None:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"알 수 없는 source입니다: {source}"}
+            )
+        if not detail:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "매장을 찾을 수 없습니다."}
+            )
+        return detail
+    except Exception as e:
+        logger.error(f"Error getting store detail: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/predictions/{file_path:path}")
+async def get_prediction(
+    file_path: str,
+    source: Optional[str] = Query(None, description="사진수집현황 또는 검수대상목록 (미지정 시 순서대로 조회)"),
+    history: bool = Query(False, description="최근 분석 이력 포함")
+):
+    """이미지의 최신 GPT 분석 결과 조회 (file_path 예: folder_00/image.webp)"""
+    try:
+        if source is not None and source not in prediction_stores:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"알 수 없는 source입니다: {source}"}
+            )
+        sources = [source] if source else list(prediction_stores)
+        await ensure_predictions(*(prediction_stores[name] for name in sources))
+        for name in sources:
+            store = prediction_stores[name]
+            prediction = store.peek(file_path)
+            if prediction is None:
+                continue
+            response = {"source": name, "file_path": file_path, "prediction": prediction}
+            if history:
+                response["history"] = await blocking.run(store.history, file_path)
+            return response
+        return JSONResponse(
+            status_code=404,
+            content={"error": "분석 결과를 찾을 수 없습니다."}
+        )
+    except Exception as e:
+        logger.error(f"Error getting prediction: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/review-queue")
+async def get_review_queue(
+    source: str = Query("검수대상목록", description="사진수집현황 또는 검수대상목록"),
+    skip: int = Query(0, ge=0, description="건너뛸 항목 수"),
+    limit: int = Query(20, ge=1, le=200, description="가져올 항목 수"),
+    fields: Optional[str] = Query(None, description=f"응답 필드 (쉼표 구분: {', '.join(REVIEW_FIELDS)})"),
+    shape: str = Query("objects", pattern="^(objects|compact)$", description="objects 또는 compact (필드 이름 + 값 배열)")
+):
+    """검수 우선순위가 높은 분석 결과 (낮은 confidence, 파싱 실패, 유사 이미지와 불일치 순)"""
+    try:
+        selected = parse_fields(fields, REVIEW_FIELDS)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    try:
+        store = prediction_stores.get(source)
+        if store is None:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"알 수 없는 source입니다: {source}"}
+            )
+        await ensure_predictions(store)
+        queue = review_queues[source]
+        items = queue.top(limit, skip)
+        response = {"source": source, "total": len(queue), "skip": skip, "limit": limit}
+        if selected is None and shape == "objects":
+            return {**response, "items": items}
+        
+        selected = selected or list(DEFAULT_REVIEW_FIELDS)
+        rows = [
+            project_record(item['prediction'], selected, data_manager.calculate_accessibility_score, extra=item)
+            for item in items
+        ]
+        return JSONResponse(content={**response, **shape_rows(rows, selected, shape)})
+    except Exception as e:
+        logger.error(f"Error getting review queue: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+class LabelRecord(BaseModel):
+    file_path: str = Field(..., min_length=1)
+    has_step: bool
+    width_class: List[str]
+    chair: Dict[str, bool]
+    source: Optional[str] = Field(None, description="검수한 분석 결과 출처 (사진수집현황 또는 검수대상목록, 해당 검수 큐에서 제외)")
+
+
+class PromoteRequest(BaseModel):
+    source: str = Field(..., description="사진수집현황 또는 검수대상목록")
+    file_path: str
+
+
+class LabelCommitRequest(BaseModel):
+    expected_version: Optional[int] = Field(None, description="읽은 시점의 데이터셋 버전 (다르면 409)")
+    labels: List[LabelRecord] = []
+    promote: List[PromoteRequest] = []
+    remove: List[str] = Field([], description="삭제할 file_path 목록")
+
+
+def label_error(label: LabelRecord) -> Optional[str]:
+    """레이블 값 검사 (오류 메시지 또는 None)"""
+    if label.source is not None and label.source not in PREDICTION_SOURCES:
+        return f"{label.file_path}: 알 수 없는 source {label.source}"
+    unknown = set(label.width_class) - set(WIDTH_CLASSES)
+    if unknown:
+        return f"{label.file_path}: 알 수 없는 width_class {sorted(unknown)}"
+    unknown = set(label.chair) - set(CHAIR_KEYS)
+    if unknown:
+        return f"{label.file_path}: 알 수 없는 chair 키 {sorted(unknown)}"
+    return None
+
+
+# 레이블 커밋 직렬화 (파일 기록과 메모리 반영 모두 I/O 스레드, 제자리 갱신은 쓰기 잠금)
+label_commit_lock = asyncio.Lock()
+
+
+@app.post("/api/labels")
+async def commit_labels(request: LabelCommitRequest, background_tasks: BackgroundTasks):
+    """검수 레이블 커밋 (직접 입력 또는 GPT 분석 결과를 GT로 승격)"""
+    try:
+        records = []
+        for label in request.labels:
+            error = label_error(label)
+            if error:
+                return JSONResponse(status_code=400, content={"error": error})
+            records.append(label.model_dump(exclude_none=True))
+        
+        for item in request.promote:
+            store = prediction_stores.get(item.source)
+            if store is None:
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": f"알 수 없는 source입니다: {item.source}"}
+                )
+            await ensure_predictions(store)
+            prediction = store.peek(item.file_path)
+            if prediction is None:
+                return JSONResponse(
+                    status_code=404,
+                    content={"error": f"분석 결과를 찾을 수 없습니다: {item.file_path}"}
+                )
+            records.append({
+                "file_path": item.file_path,
+                "has_step": bool(prediction.get('has_step', False)),
+                "width_class": list(prediction.get('width_class', [])),
+                "chair": {key: bool(prediction.get('chair', {}).get(key, False)) for key in CHAIR_KEYS},
+                "source": item.source
+            })
+        
+        if not records and not request.remove:
+            return JSONResponse(status_code=400, content={"error": "커밋할 레이블이 없습니다."})
+        
+        await ensure_warm("positions")
+        async with label_commit_lock:
+            pending = await blocking.run(data_manager.write_labels, records, request.expected_version, request.remove)
+            result = await blocking.run(data_manager.apply_labels, pending)
+        
+        # 레이블된 이미지는 그 출처의 검수 큐에서만 제외 (GT file_path 에는 출처가 없음),
+        # 다른 출처로 바뀌었거나 삭제된 레이블의 분석 결과는 다시 점수를 매김 (제외 여부는 큐가 판단)
+        for source, queue in review_queues.items():
+            for record in records:
+                if record.get('source') == source:
+                    queue.remove(record['file_path'])
+            rescored = [
+                record['file_path'] for record in records
+                if record.get('source') != source and record['file_path'] not in queue
+            ]
+            for file_path in rescored + pending["removed"]:
+                prediction = prediction_stores[source].peek(file_path)
+                if prediction is not None:
+                    queue.update(file_path, None, prediction)
+        
+        # 새 버전의 갤러리 첫 페이지를 응답 후 미리 계산 (실행 중이면 그 작업이 최신 버전을 계산)
+        background_tasks.add_task(prewarm_images_after_commit)
+        
+        if data_manager.shard_dir is not None:
+            # 파티션 모드는 변경 순번을 제공하지 않음
+            return {**result, "committed": len(records)}
+        return {**result, "committed": len(records), "seq": await blocking.run(change_log.refresh)}
+    except VersionConflict as e:
+        return JSONResponse(
+            status_code=409,
+            content={"error": str(e), "version": e.version}
+        )
+    except Exception as e:
+        logger.error(f"Error committing labels: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@app.get("/api/changes")
+async def get_changes(
+    since: int = Query(0, ge=0, description="마지막으로 받은 변경 순번"),
+    limit: int = Query(1000, ge=1, le=10000, description="최대 레코드 수")
+):
+    """since 이후 GT 변경분 (upserts: 추가·수정된 레코드, removed: 삭제된 file_path)
+    
+    resync 가 true 이면 로그가 압축되어 이어받을 수 없으므로 since=base_seq 로 전체를 다시 받습니다.
+    more 가 true 이면 응답의 seq 를 since 로 다시 요청합니다.
+    파티션 모드(GT_SHARD_DIR)에서는 지원하지 않습니다.
+    """
+    if data_manager.shard_dir is not None:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "파티션 모드에서는 변경 로그를 지원하지 않습니다."}
+        )
+    try:
+        return await blocking.run(change_log.changes, since, limit)
+    except Exception as e:
+        logger.error(f"Error getting changes: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+def list_batches(spider_path: Path) -> List[str]:
+    """batch_* 폴더 이름 (정렬)"""
+    if not spider_path.exists():
+        return []
+    return sorted(d.name for d in spider_path.iterdir() if d.is_dir() and d.name.startswith('batch_'))
+
+
+def list_batch_images(batch_path: Path) -> Optional[List[str]]:
+    """배치 폴더의 이미지 파일 이름 (폴더가 없으면 None)"""
+    if not batch_path.exists():
+        return None
+    image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.webp']
+    images = []
+    for ext in image_extensions:
+        images.extend([f.name for f in batch_path.glob(ext)])
+    return images
+
+
 @app.get("/api/batches")
 async def get_batches():
     """Spider 폴더의 배치 목록 조회"""
     try:
-        spider_path = settings.BASE_DIR / "data" / "spider"
-        if not spider_path.exists():
-            return []
-        
-        # batch_* 폴더들 찾기
-        batch_dirs = [d.name for d in spider_path.iterdir() if d.is_dir() and d.name.startswith('batch_')]
-        batch_dirs.sort()
-        
-        return batch_dirs
+        return await blocking.run(list_batches, settings.BASE_DIR / "data" / "spider")
     except Exception as e:
         logger.error(f"Error getting batches: {e}")
         return JSONResponse(
@@ -280,15 +1173,10 @@ async def get_batch_images(batch_name: str):
     """특정 배치의 이미지 목록 조회"""
     try:
         batch_path = settings.BASE_DIR / "data" / "spider" / batch_name
-        if not batch_path.exists():
+        images = await blocking.run(list_batch_images, batch_path)
+        if images is None:
             raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다")
         
-        # 이미지 파일들 찾기
-        image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.webp']
-        images = []
-        for ext in image_extensions:
-            images.extend([f.name for f in batch_path.glob(ext)])
-        
         return images
     except Exception as e:
         logger.error(f"Error getting batch images: {e}")
@@ -318,199 +1206,212 @@ async def start_batch_analysis(batch_name: str):
 
 class AnalyzeImagesRequest(BaseModel):
     image_paths: List[str]
+    pack_size: Optional[int] = Field(None, ge=1, le=16, description="요청당 이미지 수 (미지정 시 GPT_PACK_SIZE)")
 
 
-def load_openai_api_key() -> str:
-    """OpenAI API 키 로드"""
-    api_key_file = settings.BASE_DIR / "api.txt"
-    if not api_key_file.exists():
-        raise FileNotFoundError("API 키 파일을 찾을 수 없습니다: api.txt")
-    
-    with open(api_key_file, 'r') as f:
-        api_key = f.read().strip()
+def save_analysis_results(results: List[dict]) -> Future:
+    """분석 결과를 JSONL 작성기 큐에 추가 (그룹 커밋되면 완료되는 Future 반환)"""
+    return get_writer(ANALYSIS_OUTPUT_FILE).write_many(results)
+
+
+def reuse_neighbor_label(reusable: tuple, file_path: str, batch_name: str) -> dict:
+    """이웃 이미지의 분석 결과를 현재 이미지 결과로 변환"""
+    neighbor_key, distance, record = reusable
+    result = {k: v for k, v in record.items() if k not in ('file_path', 'batch')}
+    result["file_path"] = file_path
+    result["batch"] = batch_name
+    result["reused_from"] = neighbor_key
+    result["hamming_distance"] = distance
+    return result
+
+
+def prepare_analysis(image_paths: List[str]) -> tuple:
+    """분석 대상 확인: (분석할 이미지, 유사 이미지 재사용 결과, 오류)"""
+    pending = []
+    reused = []
+    errors = []
     
-    if not api_key:
-        raise ValueError("API 키가 비어있습니다")
+    for image_path_str in image_paths:
+        try:
+            # 이미지 경로 파싱 (예: "batch_00/image.webp")
+            parts = image_path_str.split('/')
+            if len(parts) != 2:
+                errors.append({
+                    "file_path": image_path_str,
+                    "error": "잘못된 파일 경로 형식"
+                })
+                continue
+            
+            batch_name = parts[0]
+            image_filename = parts[1]
+            
+            # 실제 이미지 파일 경로
+            image_file_path = PHOTO_COLLECTION_PATH / batch_name / image_filename
+            
+            if not image_file_path.exists():
+                errors.append({
+                    "file_path": image_path_str,
+                    "error": "파일을 찾을 수 없습니다"
+                })
+                continue
+            
+            # 유사 이미지의 기존 분석 결과가 있으면 GPT 호출 없이 재사용
+            image_key = f"사진수집현황/{image_path_str}"
+            if settings.PHASH_REUSE_LABELS:
+                reusable = phash_index.find_reusable_label(image_key, settings.PHASH_RADIUS, image_file_path)
+                if reusable is not None:
+                    reused.append(reuse_neighbor_label(reusable, image_path_str, batch_name))
+                    continue
+            
+            pending.append((image_file_path, batch_name))
+            
+        except Exception as e:
+            logger.error(f"이미지 분석 실패 ({image_path_str}): {e}")
+            errors.append({
+                "file_path": image_path_str,
+                "error": str(e)
+            })
     
-    return api_key
+    return pending, reused, errors
+
+
+def record_analysis_result(result: dict, pack_size: int):
+    """새 분석 결과를 유사 이미지 인덱스에 등록하고 로그 기록"""
+    image_path_str = result["file_path"]
+    phash_index.add_label(f"사진수집현황/{image_path_str}", result)
+    analysis_logger.info(
+        f"이미지 분석 완료 ({image_path_str})",
+        extra={
+            "file_path": image_path_str,
+            "confidence": result.get("confidence"),
+            "pack_size": pack_size
+        }
+    )
+
 
+def client_key(request: Request) -> str:
+    """공정 큐에서 사용할 클라이언트 식별자"""
+    return request.headers.get("X-Client-ID") or (request.client.host if request.client else "unknown")
 
-def encode_image(image_path: Path) -> str:
-    """이미지를 base64로 인코딩"""
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+
+def admit_analysis(client: str, images: int, jobs: int) -> CostReservation:
+    """대기열 여유 확인 후 추정 비용 예약 (초과 시 QueueFull / BudgetExceeded)
+    
+    대기열은 확인만 하므로 호출한 쪽은 await 없이 바로 submit_analysis 로
+    작업을 제출해야 동시에 들어온 요청들이 함께 한도를 넘지 않습니다.
+    """
+    analysis_queue.admit(jobs, client)
+    return get_cost_budget().reserve(estimate_analysis_cost(images))
 
 
-def analyze_image_with_gpt(client: OpenAI, image_path: Path, batch_name: str) -> dict:
-    """GPT Vision API를 사용하여 이미지 분석"""
+def submit_analysis(func, jobs: List[tuple], client: str, reservation: CostReservation) -> List[asyncio.Future]:
+    """입장한 작업들을 분석 큐에 제출 (마지막 작업이 끝나면 남은 비용 예약 반환)"""
+    futures = [analysis_queue.submit(func, *args, reservation, client=client) for args in jobs]
+    unfinished = len(futures)
     
-    # 이미지 base64 인코딩
-    base64_image = encode_image(image_path)
+    def job_done(_):
+        nonlocal unfinished
+        unfinished -= 1
+        if not unfinished:
+            reservation.release()
     
-    # 프롬프트 작성
-    prompt = """이 이미지는 음식점의 실내 공간 사진입니다. 이동약자 접근성 관점에서 다음 항목들을 분석해주세요:
+    for future in futures:
+        future.add_done_callback(job_done)
+    if not futures:
+        reservation.release()
+    return futures
 
-1. **단차/계단/턱 (has_step)**: 
-   - 휠체어 사용자가 진입하기 어려운 단차, 계단, 문턱이 있는지 확인
-   - boolean 값으로 반환 (true: 있음, false: 없음)
 
-2. **통로 너비 (width_class)**:
-   - wide: 휠체어가 여유롭게 통과 가능 (약 90cm 이상)
-   - normal: 휠체어가 통과 가능하나 좁음 (약 70-90cm)
-   - narrow: 휠체어 통과가 매우 어려움 (약 50-70cm)
-   - not_passable: 휠체어 통과 불가능 (50cm 미만)
-   - 배열로 반환 (여러 구간이 있으면 모두 포함)
+def admission_rejected(e: Exception) -> JSONResponse:
+    """대기열·비용 한도 초과 응답 (429, Retry-After)"""
+    logger.warning(f"Analysis request rejected: {e}")
+    return JSONResponse(
+        status_code=429,
+        content={"error": str(e), "retry_after": e.retry_after},
+        headers={"Retry-After": str(e.retry_after)}
+    )
 
-3. **의자 타입 (chair)**:
-   - has_movable_chair: 일반적인 이동 가능한 의자 (의자, 스툴 등)
-   - has_high_movable_chair: 팔걸이가 있거나 높이 조절 가능한 의자
-   - has_fixed_chair: 고정된 의자 (벤치, 부스 좌석 등)
-   - has_floor_chair: 바닥 좌석 (좌식 테이블)
-   - 각각 boolean 값으로 반환
 
-응답은 반드시 다음 JSON 형식으로만 제공해주세요:
-{
-  "has_step": boolean,
-  "width_class": ["wide" 또는 "normal" 또는 "narrow" 또는 "not_passable"],
-  "chair": {
-    "has_movable_chair": boolean,
-    "has_high_movable_chair": boolean,
-    "has_fixed_chair": boolean,
-    "has_floor_chair": boolean
-  },
-  "confidence": float (0.0-1.0, 전체 예측의 신뢰도)
-}"""
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """/api/images 응답 캐시 현황 (항목 수, 바이트, 적중률)"""
+    return {"images": images_cache.stats()}
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/webp;base64,{base64_image}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=500,
-            temperature=0.1
-        )
-        
-        # 응답에서 JSON 추출
-        content = response.choices[0].message.content.strip()
-        
-        # JSON 파싱 (마크다운 코드 블록 제거)
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        result = json.loads(content)
-        
-        # file_path 추가
-        result["file_path"] = f"{batch_name}/{image_path.name}"
-        result["batch"] = batch_name
-        
-        # confidence가 없으면 기본값 설정
-        if "confidence" not in result:
-            result["confidence"] = 0.85
-        
-        return result
-        
-    except json.JSONDecodeError as e:
-        logger.warning(f"JSON 파싱 오류 ({image_path.name}): {e}")
-        # 기본값 반환
-        return {
-            "file_path": f"{batch_name}/{image_path.name}",
-            "batch": batch_name,
-            "has_step": False,
-            "width_class": ["normal"],
-            "chair": {
-                "has_movable_chair": True,
-                "has_high_movable_chair": False,
-                "has_fixed_chair": False,
-                "has_floor_chair": False
-            },
-            "confidence": 0.5
+
+@app.get("/api/analyze/limits")
+async def get_analysis_limits():
+    """분석 대기열·속도 제한·비용 한도 현황"""
+    budget = get_cost_budget()
+    remaining = budget.remaining()
+    return {
+        "queue": {
+            "pending": analysis_queue.pending,
+            "max_pending": settings.ANALYSIS_QUEUE_MAX,
+            "max_pending_per_client": settings.ANALYSIS_QUEUE_MAX_PER_CLIENT
+        },
+        "rate_limit": {
+            "rpm": settings.GPT_RPM,
+            "tpm": settings.GPT_TPM,
+            "backlog_seconds": round(get_rate_limiter().backlog(), 2)
+        },
+        "budget": {
+            "daily_usd": settings.GPT_DAILY_BUDGET_USD,
+            "spent_usd": round(budget.spent, 6),
+            "reserved_usd": round(budget.reserved, 6),
+            "remaining_usd": round(remaining, 6) if remaining is not None else None
         }
-    except Exception as e:
-        logger.error(f"API 호출 오류 ({image_path.name}): {e}")
-        raise
+    }
 
 
 @app.post("/api/analyze/images")
-async def analyze_images(request: AnalyzeImagesRequest):
+async def analyze_images(request: AnalyzeImagesRequest, http_request: Request):
     """선택된 이미지들을 GPT Vision API로 분석"""
     try:
-        # API 키 로드
-        api_key = load_openai_api_key()
-        client = OpenAI(api_key=api_key)
+        # API 키 로드 및 클라이언트 생성
+        client = await blocking.run(create_client)
         
-        # 사진수집현황 경로
-        photo_collection_path = settings.BASE_DIR / "data" / "사진수집현황"
-        output_file = settings.BASE_DIR / "data" / "사진수집현황" / "gpt_analysis_results.jsonl"
+        pending, results, errors = await blocking.run(prepare_analysis, request.image_paths)
         
-        results = []
-        errors = []
+        # GPT Vision API로 분석 (pack_size > 1 이면 여러 장을 한 요청에 묶음)
+        pack_size = request.pack_size or settings.GPT_PACK_SIZE
+        chunks = [pending[i:i + pack_size] for i in range(0, len(pending), pack_size)]
+        client_id = client_key(http_request)
+        try:
+            reservation = admit_analysis(client_id, len(pending), len(chunks))
+        except (QueueFull, BudgetExceeded) as e:
+            return admission_rejected(e)
         
-        for image_path_str in request.image_paths:
-            try:
-                # 이미지 경로 파싱 (예: "batch_00/image.webp")
-                parts = image_path_str.split('/')
-                if len(parts) != 2:
-                    errors.append({
-                        "file_path": image_path_str,
-                        "error": "잘못된 파일 경로 형식"
-                    })
-                    continue
-                
-                batch_name = parts[0]
-                image_filename = parts[1]
-                
-                # 실제 이미지 파일 경로
-                image_file_path = photo_collection_path / batch_name / image_filename
-                
-                if not image_file_path.exists():
+        # 입장 확인 직후 await 없이 공용 분석 큐에 제출 (분석 후 작업에서 저장)
+        metrics = AnalysisMetrics()
+        futures = submit_analysis(
+            analyze_chunk, [(client, chunk, pack_size, metrics) for chunk in chunks], client_id, reservation
+        )
+        jobs = list(zip(chunks, futures))
+        
+        # 유사 이미지 재사용 결과 저장
+        await asyncio.wrap_future(save_analysis_results(results))
+        
+        for chunk, outcomes, job_error in await gather_jobs(jobs):
+            if job_error is not None:
+                outcomes = [(image_file_path, batch_name, None, job_error) for image_file_path, batch_name in chunk]
+            for image_file_path, batch_name, result, error in outcomes:
+                if error is not None:
+                    image_path_str = f"{batch_name}/{image_file_path.name}"
+                    logger.error(f"이미지 분석 실패 ({image_path_str}): {error}")
                     errors.append({
                         "file_path": image_path_str,
-                        "error": "파일을 찾을 수 없습니다"
+                        "error": error
                     })
                     continue
-                
-                # GPT Vision API로 분석
-                result = analyze_image_with_gpt(client, image_file_path, batch_name)
                 results.append(result)
-                
-            except Exception as e:
-                logger.error(f"이미지 분석 실패 ({image_path_str}): {e}")
-                errors.append({
-                    "file_path": image_path_str,
-                    "error": str(e)
-                })
-        
-        # 결과를 JSONL 파일에 저장 (append 모드)
-        if results:
-            with open(output_file, 'a', encoding='utf-8') as f:
-                for result in results:
-                    f.write(json.dumps(result, ensure_ascii=False) + '\n')
         
         return {
             "success": len(results),
             "errors": len(errors),
+            "reused": sum(1 for result in results if result.get("reused_from")),
             "results": results,
             "error_details": errors,
+            "metrics": metrics.summary(),
             "message": f"{len(results)}개 이미지 분석 완료, {len(errors)}개 실패"
         }
         
@@ -522,6 +1423,246 @@ async def analyze_images(request: AnalyzeImagesRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def analyze_chunk(
+    client,
+    chunk: list,
+    pack_size: int,
+    metrics: AnalysisMetrics,
+    reservation: Optional[CostReservation] = None
+) -> list:
+    """분석 큐 작업: 이미지 묶음 분석 후 결과 저장 (클라이언트 연결과 무관하게 저장됨)"""
+    outcomes = analyze_batch(client, chunk, pack_size, metrics, reservation)
+    results = [result for _, _, result, error in outcomes if error is None]
+    for result in results:
+        record_analysis_result(result, pack_size)
+    save_analysis_results(results).result()
+    return outcomes
+
+
+@app.post("/api/analyze/images/stream")
+async def analyze_images_stream(request: AnalyzeImagesRequest, http_request: Request):
+    """선택된 이미지들을 분석하며 진행 상황을 Server-Sent Events로 전송
+    
+    이벤트: start, result(이미지별 결과), error(이미지별 오류), done(요약).
+    각 result/error 이벤트에는 누적 성공·실패 수가 포함됩니다.
+    """
+    try:
+        client = await blocking.run(create_client)
+    except FileNotFoundError as e:
+        logger.error(f"API 키 파일을 찾을 수 없습니다: {e}")
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    pending, reused, errors = await blocking.run(prepare_analysis, request.image_paths)
+    
+    pack_size = request.pack_size or settings.GPT_PACK_SIZE
+    chunks = [pending[i:i + pack_size] for i in range(0, len(pending), pack_size)]
+    client_id = client_key(http_request)
+    try:
+        reservation = admit_analysis(client_id, len(pending), len(chunks))
+    except (QueueFull, BudgetExceeded) as e:
+        return admission_rejected(e)
+    
+    # 분석 큐에 묶음 단위로 제출하여 완료되는 순서대로 전송 (입장 확인 직후 await 없이 제출)
+    metrics = AnalysisMetrics()
+    futures = submit_analysis(
+        analyze_chunk, [(client, chunk, pack_size, metrics) for chunk in chunks], client_id, reservation
+    )
+    jobs = list(zip(chunks, futures))
+    
+    await asyncio.wrap_future(save_analysis_results(reused))
+    total = len(request.image_paths)
+    
+    async def event_stream():
+        counts = {"success": 0, "errors": 0, "completed": 0, "total": total}
+        yield sse_event("start", {"total": total, "queued": len(pending), "reused": len(reused)})
+        
+        for result in reused:
+            counts["success"] += 1
+            counts["completed"] += 1
+            yield sse_event("result", {"file_path": result["file_path"], "result": result, **counts})
+        
+        for error in errors:
+            counts["errors"] += 1
+            counts["completed"] += 1
+            yield sse_event("error", {**error, **counts})
+        
+        async def finished(chunk: list, future: asyncio.Future) -> list:
+            # 작업이 실패하면 묶음의 모든 이미지를 오류로 보고
+            try:
+                return await future
+            except Exception as e:
+                logger.error(f"분석 작업 실패 ({len(chunk)}개 이미지): {e}")
+                return [(image_file_path, batch_name, None, str(e)) for image_file_path, batch_name in chunk]
+        
+        for job in asyncio.as_completed([finished(chunk, future) for chunk, future in jobs]):
+            outcomes = await job
+            for image_file_path, batch_name, result, error in outcomes:
+                image_path_str = f"{batch_name}/{image_file_path.name}"
+                counts["completed"] += 1
+                if error is not None:
+                    counts["errors"] += 1
+                    yield sse_event("error", {"file_path": image_path_str, "error": error, **counts})
+                else:
+                    counts["success"] += 1
+                    yield sse_event("result", {"file_path": image_path_str, "result": result, **counts})
+        
+        yield sse_event("done", {
+            **counts,
+            "reused": len(reused),
+            "metrics": metrics.summary(),
+            "message": f"{counts['success']}개 이미지 분석 완료, {counts['errors']}개 실패"
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def analyze_uploaded_image(client, info: dict, reservation: Optional[CostReservation] = None) -> dict:
+    """분석 큐 작업: 업로드된 이미지 한 장 분석 후 결과 저장 (유사 이미지 레이블 재사용 우선)
+    
+    analyze_chunk 와 마찬가지로 작업 안에서 저장하므로 업로드 요청이 중간에
+    실패하거나 연결이 끊겨도 이미 분석된 결과는 보존됩니다.
+    """
+    image_key = f"사진수집현황/{info['file_path']}"
+    batch_name = info['path'].parent.name
+    
+    result = None
+    if settings.PHASH_REUSE_LABELS:
+        reusable = phash_index.find_reusable_label(image_key, settings.PHASH_RADIUS, info['path'])
+        if reusable is not None:
+            result = reuse_neighbor_label(reusable, info['file_path'], batch_name)
+    
+    if result is None:
+        result = analyze_image_with_gpt(client, info['path'], batch_name, reservation=reservation)
+        record_analysis_result(result, 1)
+    save_analysis_results([result]).result()
+    return result
+
+
+@app.post("/api/upload/{batch_name}")
+async def upload_and_analyze(
+    request: Request,
+    batch_name: str,
+    analyze: bool = Query(True, description="업로드 완료된 이미지를 바로 분석")
+):
+    """여러 이미지를 multipart/form-data로 업로드하고 분석
+    
+    본문은 청크 단위로 디스크에 기록되며, 파일 하나가 저장될 때마다
+    분석 큐에 들어가 나머지 업로드와 동시에 분석됩니다.
+    """
+    if not BATCH_NAME_PATTERN.match(batch_name):
+        raise HTTPException(status_code=400, detail="잘못된 배치 이름입니다")
+    
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="multipart/form-data 요청만 지원합니다")
+    
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 Content-Length 헤더입니다")
+    if content_length > settings.UPLOAD_MAX_REQUEST_BYTES:
+        raise HTTPException(status_code=413, detail="요청 크기 제한을 초과했습니다")
+    
+    try:
+        client = await blocking.run(create_client) if analyze else None
+    except FileNotFoundError as e:
+        logger.error(f"API 키 파일을 찾을 수 없습니다: {e}")
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    client_id = client_key(request)
+    if analyze:
+        # 본문을 받기 전에 대기열·비용 한도 확인 (예약은 파일마다)
+        try:
+            admit_analysis(client_id, 1, 1).release()
+        except (QueueFull, BudgetExceeded) as e:
+            return admission_rejected(e)
+    
+    loop = asyncio.get_running_loop()
+    jobs = []
+    errors = []
+    aborted = False
+    
+    def enqueue(info: dict):
+        if aborted:
+            return
+        try:
+            reservation = admit_analysis(client_id, 1, 1)
+        except (QueueFull, BudgetExceeded) as e:
+            errors.append({"file_path": info['file_path'], "error": str(e), "retry_after": e.retry_after})
+            return
+        [future] = submit_analysis(analyze_uploaded_image, [(client, info)], client_id, reservation)
+        jobs.append((info, future))
+    
+    def on_saved(info: dict):
+        # 파싱 스레드에서 호출되므로 이벤트 루프로 넘겨서 큐에 추가
+        if analyze:
+            loop.call_soon_threadsafe(enqueue, info)
+    
+    try:
+        upload = StreamingImageUpload(
+            content_type,
+            PHOTO_COLLECTION_PATH / batch_name,
+            settings.UPLOAD_MAX_FILE_BYTES,
+            on_saved
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.UPLOAD_MAX_REQUEST_BYTES:
+                raise HTTPException(status_code=413, detail="요청 크기 제한을 초과했습니다")
+            await blocking.run(upload.feed, chunk)
+        await blocking.run(upload.finish)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if not upload.finished:
+            # 연결 끊김·크기 초과 등으로 중단되면 기록 중인 임시 파일을 지우고
+            # 이미 저장된 파일의 분석 중 아직 시작하지 않은 작업은 취소 (비용 예약 반환)
+            aborted = True
+            for _, future in jobs:
+                future.cancel()
+            await blocking.run(upload.abort)
+    
+    # 업로드 중 시작된 분석 작업 대기 (결과는 각 작업에서 저장됨)
+    results = []
+    for info, result, error in await gather_jobs(jobs):
+        if error is not None:
+            logger.error(f"이미지 분석 실패 ({info['file_path']}): {error}")
+            errors.append({"file_path": info['file_path'], "error": error})
+        else:
+            results.append(result)
+    
+    files = [{k: v for k, v in info.items() if k != 'path'} for info in upload.files]
+    saved = sum(1 for info in files if info['status'] == 'saved')
+    duplicates = sum(1 for info in files if info['status'] == 'duplicate')
+    
+    return {
+        "batch_name": batch_name,
+        "uploaded": saved,
+        "duplicates": duplicates,
+        "rejected": len(files) - saved - duplicates,
+        "files": files,
+        "success": len(results),
+        "errors": len(errors),
+        "results": results,
+        "error_details": errors,
+        "message": f"{saved}개 이미지 업로드, {len(results)}개 분석 완료, {len(errors)}개 실패"
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,66 @@
+"""
+목록 응답 필드 선택 (sparse fieldsets)
+
+fields= 로 요청한 필드만 레코드에서 꺼내 응답을 만듭니다. 점수는 점수 관련
+필드를 요청한 경우에만 이미지당 한 번 계산하고, 요청하지 않은 필드는
+복사하거나 인코딩하지 않습니다. shape=compact 이면 필드 이름을 한 번만 보내고
+각 항목을 값 배열로 보냅니다.
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+# /api/images
+IMAGE_FIELDS = ("file_path", "has_step", "width_class", "chair", "score", "grade", "accessibility")
+DEFAULT_IMAGE_FIELDS = ("file_path", "has_step", "width_class", "chair", "accessibility")
+
+# /api/review-queue
+REVIEW_FIELDS = (
+    "file_path", "priority", "reasons", "confidence",
+    "has_step", "width_class", "chair", "score", "grade", "prediction"
+)
+DEFAULT_REVIEW_FIELDS = ("file_path", "priority", "reasons", "prediction")
+
+SHAPES = ("objects", "compact")
+SCORE_FIELDS = {"score", "grade", "accessibility"}
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """쉼표로 구분된 fields 파싱 (미지정이면 None, 알 수 없는 필드는 ValueError)"""
+    if value is None:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    if not fields:
+        raise ValueError("fields is empty")
+    return fields
+
+
+def project_record(
+    record: Dict,
+    fields: Sequence[str],
+    score_func: Callable[[Dict], Dict],
+    extra: Optional[Dict] = None
+) -> List:
+    """레코드에서 요청 필드 값만 순서대로 추출 (extra 에 있는 필드가 우선)"""
+    accessibility = score_func(record) if SCORE_FIELDS.intersection(fields) else None
+    values = []
+    for field in fields:
+        if extra is not None and field in extra:
+            values.append(extra[field])
+        elif field == "score":
+            values.append(accessibility["score"])
+        elif field == "grade":
+            values.append(accessibility["grade"])
+        elif field == "accessibility":
+            values.append(accessibility)
+        else:
+            values.append(record.get(field))
+    return values
+
+
+def shape_rows(rows: List[List], fields: Sequence[str], shape: str) -> Dict:
+    """값 배열 목록을 응답 형태로 변환"""
+    if shape == "compact":
+        return {"fields": list(fields), "rows": rows}
+    return {"items": [dict(zip(fields, row)) for row in rows]}
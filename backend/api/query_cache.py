@@ -0,0 +1,104 @@
+"""
+목록 조회 결과 캐시 (/api/images)
+
+정규화한 쿼리 파라미터와 데이터셋 버전을 키로 인코딩된 응답 본문(bytes)을
+LRU 로 보관합니다. 데이터셋 버전이 올라가면 이전 버전 항목은 다음 조회 때
+한꺼번에 비우므로 별도 무효화가 필요 없습니다. 항목 수와 본문 바이트 합계로
+크기를 제한하고, 적중·미스·제거 횟수를 집계합니다.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Hashable, Optional, Tuple
+
+
+def normalize_query(params: Dict) -> Tuple:
+    """쿼리 파라미터 → 캐시 키 (None 제외, 이름순, 날짜는 ISO 문자열)"""
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, list):
+            value = tuple(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+class QueryCache:
+    """데이터셋 버전별 응답 본문 LRU 캐시 (항목 수·바이트 제한)"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, version: int, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            self._check_version(version)
+            body = self._entries.get(key) if version == self._version else None
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, version: int, key: Hashable, body: bytes):
+        """본문 저장 (이전 버전으로 계산한 본문이나 한도보다 큰 본문은 버림)"""
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _check_version(self, version: int):
+        """새 버전이면 이전 버전 항목 전체 제거"""
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        requests = self.hits + self.misses
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
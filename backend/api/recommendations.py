@@ -0,0 +1,47 @@
+"""
+이미지 상세 응답과 개선 사항 추천
+
+규칙별 추천 문구는 모듈 로드 시 한 번만 만들고 모든 응답이 같은 객체를 공유합니다.
+"""
+from typing import Callable, Dict, List, Optional
+
+RAMP = {
+    "priority": "high",
+    "category": "단차",
+    "title": "경사로 설치 권장",
+    "description": "휠체어 사용자를 위한 경사로 설치를 권장합니다."
+}
+WIDEN_PATH = {
+    "priority": "high",
+    "category": "통로",
+    "title": "통로 확장 필요",
+    "description": "최소 0.9m 이상의 통로 너비 확보가 필요합니다."
+}
+MOVABLE_CHAIR = {
+    "priority": "medium",
+    "category": "의자",
+    "title": "이동 가능한 의자 배치 권장",
+    "description": "다양한 신체 조건의 고객을 위해 이동 가능한 의자를 배치하는 것이 좋습니다."
+}
+
+# (적용 조건, 추천) 순서대로 평가
+RULES = (
+    (lambda item: bool(item.get('has_step')), RAMP),
+    (lambda item: bool({'narrow', 'not_passable'} & set(item.get('width_class', []))), WIDEN_PATH),
+    (lambda item: not item.get('chair', {}).get('has_movable_chair'), MOVABLE_CHAIR),
+)
+
+
+def build_recommendations(item: Dict) -> List[Dict]:
+    """레코드에 해당하는 추천 목록 (공유 템플릿, 수정 금지)"""
+    return [template for matches, template in RULES if matches(item)]
+
+
+def image_detail(item: Dict, score_func: Callable[[Dict], Dict], prediction: Optional[Dict] = None) -> Dict:
+    """상세 응답 (캐시된 레코드는 수정하지 않고 새 dict 생성)"""
+    detail = dict(item)
+    detail['accessibility'] = score_func(item)
+    detail['recommendations'] = build_recommendations(item)
+    if prediction is not None:
+        detail['prediction'] = prediction
+    return detail
@@ -0,0 +1,256 @@
+"""
+스트리밍 멀티파트 이미지 업로드
+
+요청 본문을 청크 단위로 파싱하면서 각 파일 파트를 바로 디스크에 기록하고
+SHA-256을 계산합니다. 파일 전체를 메모리에 올리지 않으며, 형식·크기 검사는
+파트 헤더와 첫 바이트를 받은 시점에 수행합니다.
+"""
+import hashlib
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import multipart
+from multipart.multipart import parse_options_header
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+ALLOWED_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/webp', 'application/octet-stream'}
+_SAFE_NAME = re.compile(r'[^\w.\-가-힣]')
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """매직 바이트로 이미지 형식 판별"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def safe_filename(filename: str) -> str:
+    """경로 구분자 등을 제거한 파일명"""
+    name = Path(filename.replace('\\', '/')).name
+    return _SAFE_NAME.sub('_', name).lstrip('.')
+
+
+class _FilePart:
+    """업로드 중인 파일 파트 상태"""
+
+    def __init__(self):
+        self.headers: Dict[str, bytes] = {}
+        self.filename: Optional[str] = None
+        self.tmp_path: Optional[Path] = None
+        self.file = None
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+        self.sniffed = False
+        self.error: Optional[str] = None
+
+
+class StreamingImageUpload:
+    """멀티파트 본문을 받아 배치 폴더에 이미지를 저장
+
+    feed()로 받은 청크만 처리하므로 메모리 사용량은 청크 크기로 제한됩니다.
+    새 파일 하나가 저장될 때마다 on_saved(파일 정보)가 호출되어
+    나머지 업로드가 진행되는 동안 분석을 시작할 수 있습니다.
+    같은 이름·같은 내용의 파일은 status "duplicate" 로 기록되고 on_saved 를
+    호출하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        batch_dir: Path,
+        max_file_bytes: int,
+        on_saved: Optional[Callable[[Dict], None]] = None
+    ):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b'boundary')
+        if not boundary:
+            raise ValueError("multipart boundary가 없습니다")
+
+        self.batch_dir = Path(batch_dir)
+        self.max_file_bytes = max_file_bytes
+        self.on_saved = on_saved
+        self.files: List[Dict] = []
+        self._part: Optional[_FilePart] = None
+        self._header_field = b''
+        self._header_value = b''
+        # feed·finish 와 중단 정리(abort)가 서로 다른 I/O 스레드에서 겹치지 않도록
+        self._lock = threading.Lock()
+        self._aborted = False
+        self._finished = False
+
+        self._parser = multipart.MultipartParser(boundary, {
+            'on_part_begin': self._on_part_begin,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+        })
+
+    def feed(self, chunk: bytes):
+        """본문 청크 처리"""
+        with self._lock:
+            if not self._aborted:
+                self._parser.write(chunk)
+
+    def finish(self):
+        """본문 종료 처리 (미완료 파트 정리)"""
+        with self._lock:
+            if self._aborted:
+                return
+            self._parser.finalize()
+            if self._part is not None:
+                self._reject(self._part, "업로드가 완료되지 않았습니다")
+                self._part = None
+            self._finished = True
+
+    @property
+    def finished(self) -> bool:
+        """본문을 끝까지 받아 처리했는지"""
+        return self._finished
+
+    def abort(self):
+        """중단된 업로드 정리 (연결 끊김 등, 기록 중인 임시 파일 삭제)
+
+        이미 저장된 파일은 그대로 두며, 이후의 feed()·finish() 는 무시합니다.
+        """
+        with self._lock:
+            self._aborted = True
+            if self._part is not None:
+                self._reject(self._part, "업로드가 중단되었습니다")
+                self._part = None
+
+    # 파서 콜백
+
+    def _on_part_begin(self):
+        self._part = _FilePart()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._part.headers[self._header_field.lower().decode('latin-1')] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def _on_headers_finished(self):
+        part = self._part
+        _, disposition = parse_options_header(part.headers.get('content-disposition', b''))
+        filename = disposition.get(b'filename')
+        if filename is None:
+            # 일반 폼 필드는 무시
+            part.error = "skip"
+            return
+
+        part.filename = safe_filename(filename.decode('utf-8', errors='replace'))
+        content_type, _ = parse_options_header(part.headers.get('content-type', b'application/octet-stream'))
+
+        # 본문을 받기 전에 확장자와 Content-Type 검사
+        if Path(part.filename).suffix.lower() not in ALLOWED_EXTENSIONS:
+            part.error = "지원하지 않는 파일 형식입니다"
+        elif content_type.decode('latin-1').lower() not in ALLOWED_CONTENT_TYPES:
+            part.error = f"지원하지 않는 Content-Type입니다: {content_type.decode('latin-1')}"
+        if part.error:
+            return
+
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        part.tmp_path = self.batch_dir / f".upload-{uuid.uuid4().hex}.part"
+        part.file = open(part.tmp_path, 'wb')
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        part = self._part
+        if part.error:
+            return
+        chunk = data[start:end]
+
+        # 첫 바이트로 실제 이미지 형식 확인
+        if not part.sniffed:
+            part.head += chunk[:12 - len(part.head)]
+            if len(part.head) >= 12:
+                part.sniffed = True
+                if sniff_image_type(part.head) is None:
+                    self._reject(part, "이미지 파일이 아닙니다")
+                    return
+
+        part.size += len(chunk)
+        if part.size > self.max_file_bytes:
+            self._reject(part, f"파일 크기 제한({self.max_file_bytes} bytes)을 초과했습니다")
+            return
+
+        part.hasher.update(chunk)
+        part.file.write(chunk)
+
+    def _on_part_end(self):
+        part = self._part
+        self._part = None
+        if part is None or part.error == "skip":
+            return
+        if part.error:
+            self.files.append({"filename": part.filename, "status": "rejected", "error": part.error})
+            return
+        if not part.sniffed and sniff_image_type(part.head) is None:
+            self._reject(part, "이미지 파일이 아닙니다")
+            self.files.append({"filename": part.filename, "status": "rejected", "error": part.error})
+            return
+
+        part.file.close()
+        sha256 = part.hasher.hexdigest()
+        final_path = self._final_path(part.filename, sha256)
+        duplicate = final_path.exists()
+        if duplicate:
+            # 같은 내용의 파일이 이미 등록되어 있으면 다시 분석하지 않음
+            os.unlink(part.tmp_path)
+        else:
+            os.replace(part.tmp_path, final_path)
+
+        info = {
+            "filename": final_path.name,
+            "file_path": f"{self.batch_dir.name}/{final_path.name}",
+            "path": final_path,
+            "sha256": sha256,
+            "size": part.size,
+            "status": "duplicate" if duplicate else "saved"
+        }
+        self.files.append(info)
+        if not duplicate and self.on_saved is not None:
+            self.on_saved(info)
+
+    def _final_path(self, filename: str, sha256: str) -> Path:
+        """이름이 겹치면 내용이 같은 경우 기존 파일, 다르면 해시 접미사 사용"""
+        path = self.batch_dir / filename
+        if not path.exists() or _file_sha256(path) == sha256:
+            return path
+        return self.batch_dir / f"{path.stem}_{sha256[:8]}{path.suffix}"
+
+    def _reject(self, part: _FilePart, error: str):
+        part.error = error
+        if part.file is not None:
+            part.file.close()
+        if part.tmp_path is not None and part.tmp_path.exists():
+            os.unlink(part.tmp_path)
+        logger.warning(f"Upload rejected ({part.filename}): {error}")
+
+
+def _file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,121 @@
+"""
+서버 시작 시 백그라운드 워밍업
+
+배포 직후 첫 요청이 데이터 파싱 비용을 떠안지 않도록 데이터 로드와
+캐시 생성을 백그라운드 스레드에서 미리 수행하고 진행 상황을 기록합니다.
+실패한 단계는 지수 백오프로 다시 시도하므로 원인이 해결되면 재시작 없이
+준비 상태가 됩니다. 레디니스에 필요 없는 단계(required=False)는 필수 단계가
+모두 끝난 뒤 실행되며 실패해도 레디니스를 막지 않습니다.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class Warmup:
+    """워밍업 단계 등록 및 진행 상태 추적"""
+
+    def __init__(self, max_attempts: int = 0, backoff: float = 1.0, max_backoff: float = 60.0):
+        # max_attempts=0 이면 성공할 때까지 재시도
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._steps: List[Tuple[str, Callable[[], object], bool]] = []
+        self._completed: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = {}
+        self._background_errors: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self.status = "pending"
+        self.current_step: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def register(self, name: str, func: Callable[[], object], required: bool = True):
+        """워밍업 단계 추가 (필수 단계, 선택 단계 각각 등록 순서대로 실행)"""
+        self._steps.append((name, func, required))
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def run(self):
+        """등록된 단계를 순서대로 실행 (블로킹)"""
+        self.status = "running"
+        self.started_at = time.time()
+        for name, func, required in self._steps:
+            if required and not self._run_step(name, func):
+                self.status = "failed"
+                self.finished_at = time.time()
+                return
+
+        self.current_step = None
+        self.status = "ready"
+        self.finished_at = time.time()
+
+        for name, func, required in self._steps:
+            if not required and not self._run_step(name, func):
+                self._background_errors[name] = self.error
+                self.error = None
+        self.current_step = None
+
+    def _run_step(self, name: str, func: Callable[[], object]) -> bool:
+        """단계 하나 실행 (실패하면 백오프 후 재시도, 포기하면 False)"""
+        self.current_step = name
+        attempt = 0
+        while True:
+            attempt += 1
+            self._attempts[name] = attempt
+            step_start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                self.error = f"{name}: {e}"
+                if (self.max_attempts and attempt >= self.max_attempts) or self._stop.is_set():
+                    logger.error(f"Warm-up step '{name}' failed after {attempt} attempts: {e}")
+                    return False
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                logger.warning(f"Warm-up step '{name}' failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                if self._stop.wait(delay):
+                    return False
+                continue
+            self._completed[name] = round((time.perf_counter() - step_start) * 1000, 1)
+            self.error = None
+            logger.info(f"Warm-up step '{name}' done in {self._completed[name]}ms")
+            return True
+
+    def start(self) -> asyncio.Task:
+        """이벤트 루프를 막지 않도록 스레드에서 실행"""
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        return loop.create_task(asyncio.to_thread(self.run))
+
+    def stop(self):
+        """재시도 대기 중단 (서버 종료 시)"""
+        self._stop.set()
+
+    def progress(self) -> Dict:
+        """진행 상황 요약"""
+        total = len(self._steps)
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "completed_steps": len(self._completed),
+            "total_steps": total,
+            "progress": round(len(self._completed) / total, 3) if total else 1.0,
+            "current_step": self.current_step,
+            "step_durations_ms": dict(self._completed),
+            "retries": {name: attempts - 1 for name, attempts in self._attempts.items() if attempts > 1},
+            "background_errors": dict(self._background_errors),
+            "elapsed_seconds": elapsed,
+            "error": self.error
+        }
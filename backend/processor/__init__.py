@@ -3,6 +3,9 @@
 """
 
 from .data_manager import DataManager
+from .shared_dataset import SharedDataset
+from .phash_index import PerceptualHashIndex
+from .prediction_store import PredictionStore, compact_prediction_log
 
-__all__ = ["DataManager"]
+__all__ = ["DataManager", "SharedDataset", "PerceptualHashIndex", "PredictionStore", "compact_prediction_log"]
 
@@ -0,0 +1,185 @@
+"""
+GT 변경 로그 (델타 동기화)
+
+gt.jsonl 은 레이블 커밋마다 줄이 추가되는 로그이므로 줄 번호를 그대로
+변경 순번(seq)으로 사용합니다. 로그를 압축하면 줄 번호가 다시 시작되므로
+압축 전 마지막 순번을 기준값(base)으로 사이드카 파일에 기록하고,
+압축 후 줄의 순번은 base + 줄 번호가 되어 항상 증가합니다.
+삭제는 {"file_path": ..., "deleted": true} 줄(tombstone)로 기록합니다.
+"""
+import json
+import os
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def base_seq_path(path: Path) -> Path:
+    path = Path(path)
+    return path.with_name(f".{path.name}.seq")
+
+
+def read_base_seq(path: Path) -> int:
+    """압축으로 사라진 줄까지의 마지막 순번"""
+    try:
+        return int(base_seq_path(path).read_text(encoding='utf-8').strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_base_seq(path: Path, value: int):
+    """임시 파일에 기록 후 교체"""
+    seq_path = base_seq_path(path)
+    tmp_path = seq_path.with_name(f"{seq_path.name}.tmp")
+    tmp_path.write_text(str(value), encoding='utf-8')
+    os.replace(tmp_path, seq_path)
+
+
+def tombstone(file_path: str) -> Dict:
+    return {"file_path": file_path, "deleted": True}
+
+
+class ChangeLog:
+    """순번 → 줄 위치 인덱스 (파일에 추가된 부분만 이어서 읽음)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.base_seq = 0
+        # 순번 오름차순 (줄마다 하나)
+        self._seqs: List[int] = []
+        self._paths: List[str] = []
+        self._offsets: List[int] = []
+        # file_path → 마지막 줄 순번
+        self._latest: Dict[str, int] = {}
+        self._deleted: Set[str] = set()
+        self._loaded = False
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._line_num = 0
+
+    @property
+    def seq(self) -> int:
+        """현재 마지막 순번"""
+        return self.base_seq + self._line_num
+
+    @property
+    def dead_lines(self) -> int:
+        """압축으로 제거할 수 있는 줄 수 (덮어쓴 줄과 삭제된 레코드)"""
+        return len(self._seqs) - len(self._latest) + len(self._deleted)
+
+    @property
+    def live_records(self) -> int:
+        return len(self._latest) - len(self._deleted)
+
+    def load(self) -> int:
+        with self._lock:
+            self._load_locked()
+            return self.seq
+
+    def refresh(self) -> int:
+        """추가된 줄 반영 (압축·교체되었으면 전체 다시 읽음), 현재 순번 반환"""
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+                return self.seq
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self._inode is not None:
+                    self._load_locked()
+                return self.seq
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._load_locked()
+            elif stat.st_size > self._offset:
+                self._offset = self._read(self._offset)
+            return self.seq
+
+    def _load_locked(self):
+        self.base_seq = read_base_seq(self.path)
+        self._seqs, self._paths, self._offsets = [], [], []
+        self._latest = {}
+        self._deleted = set()
+        self._line_num = 0
+        self._offset = 0
+        try:
+            self._inode = os.stat(self.path).st_ino
+            self._offset = self._read(0)
+        except FileNotFoundError:
+            self._inode = None
+        self._loaded = True
+
+    def _read(self, offset: int) -> int:
+        """offset 부터 완성된 줄까지 인덱싱하고 다음 위치 반환"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        line_offset = offset
+        for line in data[:end].split(b"\n")[:-1]:
+            self._line_num += 1
+            start, line_offset = line_offset, line_offset + len(line) + 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON decode error at line {self._line_num} of {self.path}: {e}")
+                continue
+            file_path = record.get('file_path')
+            if not file_path:
+                continue
+            seq = self.base_seq + self._line_num
+            self._seqs.append(seq)
+            self._paths.append(file_path)
+            self._offsets.append(start)
+            self._latest[file_path] = seq
+            if record.get('deleted'):
+                self._deleted.add(file_path)
+            else:
+                self._deleted.discard(file_path)
+        return offset + end
+
+    def changes(self, since: int, limit: int = 1000) -> Dict:
+        """since 이후 추가·변경된 레코드와 삭제된 file_path
+
+        since 가 압축 기준값보다 작거나 현재 순번보다 크면 resync 를 표시합니다.
+        이 경우 since=base_seq 로 다시 요청하면 살아 있는 레코드 전체를 받습니다.
+        """
+        self.refresh()
+        with self._lock:
+            current = self.seq
+            response = {"since": since, "seq": current, "base_seq": self.base_seq, "resync": False}
+            if since < self.base_seq or since > current:
+                return {**response, "resync": True, "upserts": [], "removed": [], "more": False}
+
+            upserts, removed = [], []
+            cursor = current
+            i = bisect_right(self._seqs, since)
+            with open(self.path, 'rb') as f:
+                while i < len(self._seqs):
+                    if len(upserts) + len(removed) >= limit:
+                        cursor = self._seqs[i - 1]
+                        break
+                    seq, file_path = self._seqs[i], self._paths[i]
+                    i += 1
+                    if self._latest[file_path] != seq:
+                        continue  # 이후 줄에서 다시 바뀐 레코드
+                    if file_path in self._deleted:
+                        removed.append(file_path)
+                        continue
+                    f.seek(self._offsets[i - 1])
+                    upserts.append(json.loads(f.readline()))
+
+            return {
+                **response,
+                "seq": cursor,
+                "upserts": upserts,
+                "removed": removed,
+                "more": cursor < current
+            }
@@ -0,0 +1,169 @@
+"""
+속성 데이터 큐브 (교차 집계용)
+
+단차 여부 × 통로 너비 조합 × 의자 조합 × 등급 (2 × 16 × 16 × 5 = 2560칸)
+개수를 고정 크기 배열에 보관합니다. 교차표·슬라이스·롤업은 데이터 크기와
+무관하게 큐브 칸 수에 비례하는 시간에 계산됩니다.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WIDTH_CLASSES = ("not_passable", "narrow", "normal", "wide")
+CHAIR_TYPES = ("movable", "high_movable", "fixed", "floor")
+CHAIR_KEYS = ("has_movable_chair", "has_high_movable_chair", "has_fixed_chair", "has_floor_chair")
+GRADES = ("S", "A", "B", "C", "D")
+
+STEP_SIZE = 2
+WIDTH_SIZE = 1 << len(WIDTH_CLASSES)
+CHAIR_SIZE = 1 << len(CHAIR_KEYS)
+GRADE_SIZE = len(GRADES)
+CUBE_SIZE = STEP_SIZE * WIDTH_SIZE * CHAIR_SIZE * GRADE_SIZE
+
+# 집계 기준: 다중 값 속성은 포함 여부(width_class, chair_type) 또는 정확한 조합(*_set)
+DIMENSIONS = ("has_step", "width_class", "width_set", "chair_type", "chair_set", "grade")
+
+
+def width_mask(width_classes: Iterable[str]) -> int:
+    mask = 0
+    for i, name in enumerate(WIDTH_CLASSES):
+        if name in width_classes:
+            mask |= 1 << i
+    return mask
+
+
+def chair_mask(chair: Dict) -> int:
+    mask = 0
+    for i, key in enumerate(CHAIR_KEYS):
+        if chair.get(key):
+            mask |= 1 << i
+    return mask
+
+
+def _mask_names(mask: int, names: Tuple[str, ...]) -> List[str]:
+    return [name for i, name in enumerate(names) if mask & (1 << i)]
+
+
+class AttributeCube:
+    """속성 조합별 이미지 수 큐브"""
+
+    def __init__(self, score_func):
+        # score_func(item) -> {"score", "grade"} (DataManager.calculate_accessibility_score)
+        self._score_func = score_func
+        self.counts = array('q', bytes(8 * CUBE_SIZE))
+        self.scores = array('q', bytes(8 * CUBE_SIZE))
+        self.total = 0
+
+    @staticmethod
+    def cell_index(has_step: int, width: int, chair: int, grade: int) -> int:
+        return ((has_step * WIDTH_SIZE + width) * CHAIR_SIZE + chair) * GRADE_SIZE + grade
+
+    def _cell_of(self, item: Dict) -> Tuple[int, int]:
+        score = self._score_func(item)
+        index = self.cell_index(
+            1 if item.get('has_step', False) else 0,
+            width_mask(item.get('width_class', [])),
+            chair_mask(item.get('chair', {})),
+            GRADES.index(score['grade'])
+        )
+        return index, score['score']
+
+    def build(self, data: Iterable[Dict]):
+        """전체 데이터로 큐브 재구성"""
+        self.counts = array('q', bytes(8 * CUBE_SIZE))
+        self.scores = array('q', bytes(8 * CUBE_SIZE))
+        self.total = 0
+        for item in data:
+            self.add(item)
+
+    def add(self, item: Dict):
+        index, score = self._cell_of(item)
+        self.counts[index] += 1
+        self.scores[index] += score
+        self.total += 1
+
+    def remove(self, item: Dict):
+        index, score = self._cell_of(item)
+        self.counts[index] -= 1
+        self.scores[index] -= score
+        self.total -= 1
+
+    def update(self, old_item: Dict, new_item: Dict):
+        """레이블 수정 반영"""
+        self.remove(old_item)
+        self.add(new_item)
+
+    def _cells(self):
+        """(단차, 너비 마스크, 의자 마스크, 등급, 개수, 점수 합) - 비어 있지 않은 칸만"""
+        counts = self.counts
+        for index in range(CUBE_SIZE):
+            count = counts[index]
+            if not count:
+                continue
+            rest, grade = divmod(index, GRADE_SIZE)
+            rest, chair = divmod(rest, CHAIR_SIZE)
+            has_step, width = divmod(rest, WIDTH_SIZE)
+            yield has_step, width, chair, grade, count, self.scores[index]
+
+    def crosstab(
+        self,
+        by: List[str],
+        has_step: Optional[bool] = None,
+        width_class: Optional[str] = None,
+        chair_type: Optional[str] = None,
+        grade: Optional[str] = None
+    ) -> Dict:
+        """필터로 자른 뒤 by 차원별로 롤업"""
+        for dim in by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {dim}")
+        width_bit = 1 << WIDTH_CLASSES.index(width_class) if width_class else 0
+        chair_bit = 1 << CHAIR_TYPES.index(chair_type) if chair_type else 0
+        grade_index = GRADES.index(grade) if grade else None
+
+        groups: Dict[Tuple, List[int]] = {}
+        matched = 0
+        for step, width, chair, grade_i, count, score_sum in self._cells():
+            if has_step is not None and step != int(has_step):
+                continue
+            if width_bit and not width & width_bit:
+                continue
+            if chair_bit and not chair & chair_bit:
+                continue
+            if grade_index is not None and grade_i != grade_index:
+                continue
+            matched += count
+
+            # 포함 여부 차원은 한 칸이 여러 그룹에 더해짐
+            keys = [()]
+            for dim in by:
+                if dim == "has_step":
+                    values = [bool(step)]
+                elif dim == "width_class":
+                    values = _mask_names(width, WIDTH_CLASSES) or ["none"]
+                elif dim == "width_set":
+                    values = ["+".join(_mask_names(width, WIDTH_CLASSES)) or "none"]
+                elif dim == "chair_type":
+                    values = _mask_names(chair, CHAIR_TYPES) or ["none"]
+                elif dim == "chair_set":
+                    values = ["+".join(_mask_names(chair, CHAIR_TYPES)) or "none"]
+                else:
+                    values = [GRADES[grade_i]]
+                keys = [key + (value,) for key in keys for value in values]
+
+            for key in keys:
+                group = groups.setdefault(key, [0, 0])
+                group[0] += count
+                group[1] += score_sum
+
+        def sort_key(key: Tuple) -> Tuple:
+            return tuple(GRADES.index(v) if dim == "grade" else str(v) for dim, v in zip(by, key))
+
+        cells = []
+        for key in sorted(groups, key=sort_key):
+            count, score_sum = groups[key]
+            cell = dict(zip(by, key))
+            cell["count"] = count
+            cell["average_score"] = round(score_sum / count, 1)
+            cells.append(cell)
+
+        return {"by": by, "total": matched, "cells": cells}
@@ -1,55 +1,689 @@
 """
 데이터 관리 모듈
 """
+import copy
 import json
+import os
+import threading
+from datetime import date
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 from backend.utils.logger import setup_logger
+from backend.utils.rwlock import ReadWriteLock
+from backend.processor import shared_dataset
+from backend.processor.shared_dataset import SharedDataset, SharedRecords
+from backend.processor.change_log import read_base_seq, tombstone, write_base_seq
+from backend.processor.data_cube import AttributeCube
+from backend.processor.gt_shards import (
+    SHARD_SUFFIX, Shard, load_shards, merge_statistics, shard_files, shard_key
+)
+from backend.processor.jsonl_reader import read_jsonl
+from backend.processor.jsonl_writer import file_lock
+from backend.processor.store_index import StoreIndex
+from backend.processor.time_index import CaptureTimeIndex
 
 logger = setup_logger(__name__)
 
 
+class VersionConflict(Exception):
+    """데이터셋 버전 불일치 (낙관적 동시성 검사 실패)"""
+
+    def __init__(self, version: int):
+        super().__init__(f"데이터셋이 변경되었습니다 (현재 버전: {version})")
+        self.version = version
+
+
 class DataManager:
     """GT 데이터 관리"""
     
-    def __init__(self, gt_jsonl_path: Path):
+    def __init__(
+        self,
+        gt_jsonl_path: Path,
+        shared_dir: Optional[Path] = None,
+        shard_dir: Optional[Path] = None,
+        shard_workers: Optional[int] = None
+    ):
         self.gt_jsonl_path = Path(gt_jsonl_path)
+        # 파티션 모드: shard_dir 의 *.jsonl 샤드를 병렬로 읽어 하나의 목록으로 합침
+        self.shard_dir = Path(shard_dir) if shard_dir is not None else None
+        self.shard_workers = shard_workers
+        self._shards: Dict[str, Shard] = {}
+        # 데이터 위치 → 샤드 이름
+        self._position_shards: List[str] = []
         self._cache: Optional[List[Dict]] = None
+        self._version = 0
+        # (버전, 통계, 점수 합계)
+        self._stats_cache: Optional[Tuple[int, Dict, int]] = None
+        self._positions: Optional[Tuple[int, Dict[str, int]]] = None
+        self._cube: Optional[Tuple[int, AttributeCube]] = None
+        self._store_index: Optional[Tuple[int, StoreIndex]] = None
+        self._time_index: Optional[Tuple[int, CaptureTimeIndex]] = None
+        self._commit_lock = threading.Lock()
+        # 캐시가 비어 있을 때 동시에 들어온 로드·인덱스 구성은 한 스레드만 수행하고 나머지는 결과를 기다림
+        self._load_lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        # 공유 모드: 델타 반영과 커밋 기록 직렬화 (교차 프로세스 잠금보다 먼저 잡음)
+        self._sync_lock = threading.RLock()
+        # 조회·인덱스 구성(읽기)과 커밋의 제자리 갱신(쓰기) 분리 (읽기 → _build_lock 순서로 잡음)
+        self._rw = ReadWriteLock()
+        
+        # 멀티 워커 공유 모드 (POSIX 전용)
+        self._shared: Optional[SharedDataset] = None
+        if shared_dir is not None and self.shard_dir is not None:
+            logger.warning("Shared dataset does not support GT shards, using per-process cache")
+        elif shared_dir is not None:
+            if shared_dataset.is_supported():
+                self._shared = SharedDataset(shared_dir, summarize=self._snapshot_meta)
+            else:
+                logger.warning("Shared dataset is not supported on this platform, using per-process cache")
     
-    def load_all_data(self, use_cache: bool = True) -> List[Dict]:
-        """모든 데이터 로드"""
+    @property
+    def version(self) -> int:
+        """데이터셋 버전 (공유 모드에서는 이 워커가 반영한 교차 프로세스 버전)"""
+        if self._shared is not None:
+            return self._shared.version
+        return self._version
+    
+    def load_all_data(self, use_cache: bool = True) -> Sequence[Dict]:
+        """모든 데이터 로드 (공유 모드에서는 mmap 스냅샷 위의 레코드 목록)"""
+        if self._shared is not None:
+            if not use_cache:
+                self._shared.publish(
+                    self._parse_file(),
+                    shared_dataset.source_fingerprint(self.gt_jsonl_path)
+                )
+            records = self._shared.records
+            if records is not None and self._rw.reading_here():
+                # 읽는 동안에는 델타를 반영하지 않고 같은 상태를 계속 읽음
+                return records
+            # 레코드는 접근할 때 디코딩하고 다른 워커의 커밋 델타는 제자리 반영
+            with self._sync_lock:
+                records = self._shared.ensure(self.gt_jsonl_path, self._parse_file, self._apply_delta)
+            return records if records is not None else []
+        
         if use_cache and self._cache is not None:
             return self._cache
         
-        data = []
-        if not self.gt_jsonl_path.exists():
-            logger.warning(f"GT file not found: {self.gt_jsonl_path}")
+        with self._load_lock:
+            if use_cache and self._cache is not None:
+                # 기다리는 동안 다른 스레드가 로드함
+                return self._cache
+            
+            if self.shard_dir is not None:
+                data = self._load_shards()
+                if self.shard_dir.is_dir():
+                    self._cache = data
+                    self._version += 1
+                return data
+            
+            data = self._parse_file()
+            if self.gt_jsonl_path.exists():
+                self._cache = data
+                self._version += 1
             return data
+    
+    def is_warm(self, name: str) -> bool:
+        """데이터셋(name="dataset") 또는 파생 캐시가 현재 버전으로 준비되어 있는지"""
+        if self._shared is not None:
+            if not self._shared.is_current(self.gt_jsonl_path):
+                return False
+        elif self._cache is None:
+            return False
+        if name == "dataset":
+            return True
+        cached = getattr(self, f"_{name}")
+        return cached is not None and cached[0] == self.version
+    
+    def reading(self):
+        """데이터와 파생 캐시를 읽는 동안 커밋의 제자리 갱신을 막는 잠금 (중첩 가능)"""
+        return self._rw.read()
+    
+    def _versioned(self, attr: str, build: Callable[[List[Dict]], object]):
+        """데이터셋 버전별 캐시 (비어 있으면 한 스레드만 구성)"""
+        data = self.load_all_data()
+        version = self.version
+        cached = getattr(self, attr)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        with self._rw.read(), self._build_lock:
+            cached = getattr(self, attr)
+            if cached is None or cached[0] != version:
+                cached = (version, build(data))
+                setattr(self, attr, cached)
+            return cached[1]
+    
+    def _load_shards(self) -> List[Dict]:
+        """샤드 병렬 로드 (샤드별 데이터 위치와 집계 구성)"""
+        paths = shard_files(self.shard_dir)
+        if not paths:
+            logger.warning(f"No GT shards found in {self.shard_dir}")
+        
+        data: List[Dict] = []
+        shards: Dict[str, Shard] = {}
+        position_shards: List[str] = []
+        for path, records, statistics, score_sum in load_shards(
+            paths, self._parse_file, self._summarize, self.shard_workers
+        ):
+            start = len(data)
+            data.extend(records)
+            shards[path.stem] = Shard(path.stem, path, list(range(start, len(data))), statistics, score_sum)
+            position_shards.extend([path.stem] * len(records))
+        
+        self._shards = shards
+        self._position_shards = position_shards
+        logger.info(f"Loaded {len(data)} items from {len(shards)} GT shards in {self.shard_dir}")
+        return data
+    
+    def _summarize(self, data: List[Dict]) -> Tuple[Dict, int]:
+        """통계와 점수 합계"""
+        score_sum = sum(self.calculate_accessibility_score(item)['score'] for item in data)
+        return self._compute_statistics(data), score_sum
+    
+    def _snapshot_meta(self, data: List[Dict]) -> Dict:
+        """공유 스냅샷에 함께 발행할 통계 (워커마다 다시 계산하지 않음)"""
+        stats, score_sum = self._summarize(data)
+        return {"statistics": stats, "score_sum": score_sum}
+    
+    def _select_shards(self, names: Sequence[str]) -> List[Shard]:
+        """이름으로 샤드 선택 (알 수 없는 이름은 ValueError)"""
+        if self.shard_dir is None:
+            raise ValueError("GT shards are not enabled")
+        unknown = [name for name in names if name not in self._shards]
+        if unknown:
+            raise ValueError(f"Unknown shards: {', '.join(unknown)}")
+        return [self._shards[name] for name in dict.fromkeys(names)]
+    
+    def shard_summaries(self) -> List[Dict]:
+        """샤드별 이미지 수와 집계"""
+        self.load_all_data()
+        return [shard.summary() for shard in self._shards.values()]
+    
+    def _parse_file(self, path: Optional[Path] = None) -> List[Dict]:
+        """GT 파일(또는 샤드) 파싱
+        
+        큰 파일은 청크 단위로 병렬 파싱합니다 (jsonl_reader).
+        GT 파일은 레이블 커밋이 추가 기록되는 로그로 읽습니다. 같은 file_path 가
+        다시 나오면 나중 줄이 앞의 레코드를 대체하고, 삭제(tombstone) 줄은 마지막
+        레코드를 빈 자리로 옮겨 제거합니다. 커밋 API 이전부터 중복 줄이 있던
+        파일도 같은 규칙이 적용되어 file_path 당 한 레코드만 남습니다.
+        """
+        return self._parse_log(path or self.gt_jsonl_path)[0]
+    
+    def _parse_log(self, path: Path, end: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """GT 로그를 end 바이트까지 파싱 → (레코드, 읽은 줄 수)"""
+        data = []
+        positions: Dict[str, int] = {}
+        if not path.exists():
+            logger.warning(f"GT file not found: {path}")
+            return data, 0
+        
+        def on_error(line_num: int, message: str):
+            logger.error(f"JSON decode error at line {line_num} of {path.name}: {message}")
         
+        replaced = 0
+        removed = 0
+        line_count = 0
         try:
-            with open(self.gt_jsonl_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        item = json.loads(line)
-                        data.append(item)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error at line {line_num}: {e}")
+            records, _, line_count = read_jsonl(path, on_error=on_error, end=end)
+            for item in records:
+                file_path = item.get('file_path')
+                if item.get('deleted'):
+                    position = positions.pop(file_path, None)
+                    if position is not None:
+                        removed += 1
+                        last = data.pop()
+                        if position < len(data):
+                            data[position] = last
+                            if last.get('file_path'):
+                                positions[last['file_path']] = position
+                    continue
+                if file_path in positions:
+                    # 레이블 커밋으로 추가된 수정본 (또는 원래부터 중복된 줄)
+                    data[positions[file_path]] = item
+                    replaced += 1
+                    continue
+                if file_path:
+                    positions[file_path] = len(data)
+                data.append(item)
             
-            self._cache = data
-            logger.info(f"Loaded {len(data)} items from {self.gt_jsonl_path}")
+            logger.info(f"Loaded {len(data)} items from {path}")
+            if replaced or removed:
+                logger.info(
+                    f"{path.name}: {replaced} lines replaced an earlier record with the same file_path, "
+                    f"{removed} records removed by tombstones"
+                )
             
         except Exception as e:
             logger.error(f"Error loading data: {e}")
         
-        return data
+        return data, line_count
     
-    def get_statistics(self) -> Dict:
-        """통계 계산"""
+    def get_statistics(self, shards: Optional[Sequence[str]] = None) -> Dict:
+        """통계 계산 (데이터셋 버전별 캐시)
+        
+        파티션 모드에서는 샤드 집계를 합산하며, shards 를 지정하면 해당 샤드만 합산합니다.
+        """
         data = self.load_all_data()
+        version = self.version
+        
+        if shards:
+            selected = self._select_shards(shards)
+            return merge_statistics((shard.statistics, shard.score_sum) for shard in selected)[0]
+        
+        with self._rw.read(), self._build_lock:
+            if self._stats_cache is None or self._stats_cache[0] != version:
+                if self.shard_dir is not None:
+                    stats, score_sum = merge_statistics(
+                        (shard.statistics, shard.score_sum) for shard in self._shards.values()
+                    )
+                elif isinstance(data, SharedRecords) and not data.modified and 'statistics' in data.view.meta:
+                    # 발행한 워커가 계산해 둔 통계 (제자리 갱신에 대비해 복사)
+                    meta = data.view.meta
+                    stats, score_sum = copy.deepcopy(meta['statistics']), meta['score_sum']
+                else:
+                    stats, score_sum = self._summarize(data)
+                self._stats_cache = (version, stats, score_sum)
+            
+            return copy.deepcopy(self._stats_cache[1])
+    
+    def get_positions(self) -> Dict[str, int]:
+        """file_path → 데이터 위치 (데이터셋 버전이 바뀌면 재구성, 공유 모드는 스냅샷의 인덱스)"""
+        return self._versioned("_positions", lambda data: data.positions if isinstance(data, SharedRecords) else {
+            item['file_path']: position
+            for position, item in enumerate(data) if item.get('file_path')
+        })
+    
+    def has_label(self, file_path: str, source: Optional[str] = None) -> bool:
+        """GT 레이블 여부 (file_path 인덱스가 아직 없으면 만들지 않고 False)
+        
+        source 를 주면 그 분석 결과에서 승격한(source 가 같은) 레이블만 셉니다.
+        GT file_path 에는 분석 결과 출처가 없어 다른 출처의 같은 경로와 구분하기 위함입니다.
+        """
+        cached = self._positions
+        if cached is None or file_path not in cached[1]:
+            return False
+        if source is None:
+            return True
+        record = self.find_by_path(file_path)
+        return record is not None and record.get('source') == source
+    
+    def find_by_path(self, file_path: str) -> Optional[Dict]:
+        """file_path 로 레코드 조회"""
+        with self._rw.read():
+            position = self.get_positions().get(file_path)
+            if position is None:
+                return None
+            return self.load_all_data()[position]
+    
+    def commit_labels(
+        self,
+        records: List[Dict],
+        expected_version: Optional[int] = None,
+        removed: Sequence[str] = ()
+    ) -> Dict:
+        """레이블 추가·수정·삭제 커밋
+        
+        GT 파일 끝에 추가 기록(fsync)한 뒤 캐시와 file_path 인덱스, 통계,
+        데이터 큐브, 매장·촬영 시각 인덱스를 다시 만들지 않고 제자리에서 갱신합니다.
+        삭제는 tombstone 줄로 기록하고 마지막 레코드를 빈 자리로 옮깁니다 (파싱 시와 동일).
+        파티션 모드에서는 레코드가 속한 샤드 파일에 기록하고 샤드 집계도 함께 갱신합니다.
+        공유 모드에서는 새 세대를 발행하지 않고 델타 로그에 추가하며, 각 워커가 다음
+        접근 때 같은 방식으로 제자리 반영합니다.
+        expected_version 이 현재 버전과 다르면 VersionConflict 를 발생시킵니다.
+        """
+        with self._commit_lock:
+            return self._apply_labels(self._write_labels(records, expected_version, removed))
+    
+    def write_labels(
+        self,
+        records: List[Dict],
+        expected_version: Optional[int] = None,
+        removed: Sequence[str] = ()
+    ) -> Dict:
+        """커밋의 파일 기록 단계 (이벤트 루프 밖 스레드에서 호출)
+        
+        반환값을 apply_labels() 에 넘겨 메모리 반영을 마칩니다. 두 단계 사이에
+        다른 커밋이 끼어들지 않도록 호출자가 직렬화해야 합니다.
+        """
+        with self._commit_lock:
+            return self._write_labels(records, expected_version, removed)
+    
+    def apply_labels(self, pending: Dict) -> Dict:
+        """커밋의 메모리 반영 단계 (조회와 같은 이벤트 루프에서 호출)"""
+        with self._commit_lock:
+            return self._apply_labels(pending)
+    
+    def _write_labels(self, records: List[Dict], expected_version: Optional[int], removed: Sequence[str]) -> Dict:
+        if self._shared is None:
+            return self._write_records(records, expected_version, removed)
+        
+        with self._sync_lock, self._shared.locked():
+            # 다른 워커의 커밋까지 반영한 뒤 버전 검사 (잠금으로 워커 간 커밋을 직렬화)
+            pending = self._write_records(records, expected_version, removed)
+            # 새 세대를 발행하지 않고 델타만 추가 (모든 워커가 같은 경로로 제자리 반영)
+            pending["version"] = self._shared.append_delta(
+                pending["records"], pending["removed"],
+                shared_dataset.source_fingerprint(self.gt_jsonl_path)
+            )
+            return pending
+    
+    def _write_records(self, records: List[Dict], expected_version: Optional[int], removed: Sequence[str]) -> Dict:
+        self.load_all_data()
+        version = self.version
+        if expected_version is not None and expected_version != version:
+            raise VersionConflict(version)
+        
+        positions = self.get_positions()
+        committed = {record['file_path'] for record in records}
+        created = sum(1 for file_path in committed if file_path not in positions)
+        # 없는 레코드의 삭제는 무시
+        removed = [
+            file_path for file_path in dict.fromkeys(removed)
+            if file_path in positions or file_path in committed
+        ]
+        result = {"created": created, "updated": len(records) - created, "removed": len(removed)}
+        lines = records + [tombstone(file_path) for file_path in removed]
+        if self.shard_dir is not None:
+            self._append_shard_records(lines, positions)
+        else:
+            self._append_records(lines)
         
+        reloaded = self._shared is None and self._cache is None
+        if reloaded:
+            # 새로 생성된 파일은 다시 읽음
+            self.load_all_data(use_cache=False)
+        return {
+            "records": records, "removed": removed, "result": result,
+            "version": version, "reloaded": reloaded
+        }
+    
+    def _apply_labels(self, pending: Dict) -> Dict:
+        result = pending["result"]
+        if pending["reloaded"]:
+            return {"version": self.version, **result}
+        if self._shared is not None:
+            # 기록 단계에서 추가한 델타를 다른 워커와 같은 경로(_apply_delta)로 반영
+            self.load_all_data()
+            return {"version": pending["version"], **result}
+        
+        records, removed, version = pending["records"], pending["removed"], pending["version"]
+        if version != self.version:
+            raise RuntimeError(f"Dataset changed between label write and apply ({version} -> {self.version})")
+        data, positions = self.load_all_data(), self.get_positions()
+        with self._rw.write():
+            self._apply_changes(data, positions, records, removed, version, version + 1)
+            self._version += 1
+        
+        logger.info(
+            f"Committed {len(records)} labels ({result['created']} new, {len(removed)} removed), "
+            f"dataset version {self._version}"
+        )
+        return {"version": self._version, **result}
+    
+    def _apply_delta(
+        self,
+        data: SharedRecords,
+        version: int,
+        new_version: int,
+        records: List[Dict],
+        removed: List[str]
+    ):
+        """공유 모드: 델타 로그의 커밋 하나를 레코드 목록과 파생 캐시에 제자리 반영"""
+        with self._rw.write():
+            self._apply_changes(data, data.positions, records, removed, version, new_version)
+        logger.info(
+            f"Applied shared commit of {len(records)} labels ({len(removed)} removed), "
+            f"dataset version {new_version}"
+        )
+    
+    def _apply_changes(
+        self,
+        data,
+        positions,
+        records: List[Dict],
+        removed: Sequence[str],
+        version: int,
+        new_version: int
+    ):
+        """레코드 추가·수정·삭제를 데이터와 file_path 인덱스, 파생 캐시에 반영하고 캐시를 new_version 으로 유지"""
+        sharded = self.shard_dir is not None
+        
+        def current(cached):
+            return cached[1] if cached is not None and cached[0] == version else None
+        
+        cube = current(self._cube)
+        store_index = current(self._store_index)
+        time_index = current(self._time_index)
+        stats_cache = self._stats_cache if current(self._stats_cache) else None
+        if stats_cache is not None and stats_cache[1]['total_images'] == 0:
+            # 빈 데이터셋 통계는 형식이 달라 다음 조회 때 다시 계산
+            stats_cache = self._stats_cache = None
+        score_sum = stats_cache[2] if stats_cache is not None else 0
+        
+        def apply(position: int, old_record: Optional[Dict], record: Optional[Dict]):
+            """위치의 레코드 변경을 인덱스에 반영 (record=None 이면 삭제)"""
+            nonlocal score_sum
+            if cube is not None:
+                if old_record is not None:
+                    cube.remove(old_record)
+                if record is not None:
+                    cube.add(record)
+            if store_index is not None:
+                if old_record is not None:
+                    store_index.remove(position, old_record)
+                if record is not None:
+                    store_index.add(position, record)
+            if time_index is not None:
+                time_index.update(position, old_record, record)
+            if stats_cache is not None:
+                if old_record is not None:
+                    score_sum += self._adjust_statistics(stats_cache[1], old_record, -1)
+                if record is not None:
+                    score_sum += self._adjust_statistics(stats_cache[1], record, 1)
+            if sharded:
+                shard = self._shards[self._position_shards[position]]
+                if old_record is not None:
+                    shard.score_sum += self._adjust_statistics(shard.statistics, old_record, -1)
+                if record is not None:
+                    shard.score_sum += self._adjust_statistics(shard.statistics, record, 1)
+                self._finish_statistics(shard.statistics, shard.score_sum)
+        
+        for record in records:
+            position = positions.get(record['file_path'])
+            old_record = None
+            if position is None:
+                position = positions[record['file_path']] = len(data)
+                data.append(record)
+                if sharded:
+                    shard = self._get_or_create_shard(shard_key(record['file_path']))
+                    shard.add_position(position)
+                    self._position_shards.append(shard.name)
+            else:
+                old_record = data[position]
+                data[position] = record
+            apply(position, old_record, record)
+        
+        for file_path in removed:
+            position = positions.pop(file_path)
+            apply(position, data[position], None)
+            if sharded:
+                self._shards[self._position_shards[position]].remove_position(position)
+            last_position = len(data) - 1
+            if position < last_position:
+                # 마지막 레코드를 빈 자리로 이동
+                last = data[last_position]
+                apply(last_position, last, None)
+                data[position] = last
+                if last.get('file_path'):
+                    positions[last['file_path']] = position
+                if sharded:
+                    shard = self._shards[self._position_shards[last_position]]
+                    shard.remove_position(last_position)
+                    shard.add_position(position)
+                    self._position_shards[position] = shard.name
+                apply(position, None, last)
+            data.pop()
+            if sharded:
+                self._position_shards.pop()
+        
+        if stats_cache is not None:
+            self._finish_statistics(stats_cache[1], score_sum)
+            self._stats_cache = (version, stats_cache[1], score_sum)
+        
+        # 제자리 갱신한 캐시는 새 버전으로 유지
+        for attr in ("_stats_cache", "_positions", "_cube", "_store_index", "_time_index"):
+            cached = getattr(self, attr)
+            if cached is not None and cached[0] == version:
+                setattr(self, attr, (new_version,) + cached[1:])
+    
+    def compact_log(self) -> Dict:
+        """GT 로그 압축 (file_path 별 최신 레코드만 남기고 삭제된 레코드 제거)
+        
+        레코드 순서는 파싱 결과와 같으므로 메모리의 데이터와 버전은 그대로 유지됩니다.
+        변경 순번이 계속 증가하도록 압축 전 줄 수만큼 기준 순번을 올립니다.
+        파티션 모드의 샤드 파일은 압축하지 않습니다.
+        
+        파싱과 기록은 잠금 없이 시작 시점의 파일 길이까지만 하므로 그동안 커밋은
+        막히지 않습니다. 파일 잠금은 마지막에 그 뒤로 추가된 줄을 옮겨 붙이고
+        교체하는 동안만 잡습니다.
+        """
+        if self.shard_dir is not None:
+            return {"skipped": "partitioned"}
+        path = self.gt_jsonl_path
+        with file_lock(path):
+            # 추가 기록은 파일 잠금 안에서 줄 단위로 끝나므로 이 길이는 줄 경계
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return {"skipped": "missing"}
+        end = stat.st_size
+        records, lines_before = self._parse_log(path, end)
+        
+        tmp_path = path.with_name(f".{path.name}.compact.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+        with file_lock(path):
+            try:
+                current = path.stat()
+            except FileNotFoundError:
+                current = None
+            if current is None or current.st_ino != stat.st_ino or current.st_size < end:
+                # 다른 워커가 먼저 압축했거나 파일이 교체됨
+                tmp_path.unlink()
+                return {"skipped": "changed"}
+            
+            # 파싱하는 동안 커밋된 줄은 그대로 뒤에 붙임 (나중 줄 우선 규칙 유지)
+            with open(path, 'rb') as src:
+                src.seek(end)
+                tail = src.read(current.st_size - end)
+            with open(tmp_path, 'ab') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # 기준 순번을 먼저 올림 (중단되어도 순번이 겹치지 않음)
+            write_base_seq(path, read_base_seq(path) + lines_before)
+            os.replace(tmp_path, path)
+        
+        tail_lines = tail.count(b"\n") + (1 if tail and not tail.endswith(b"\n") else 0)
+        logger.info(
+            f"Compacted {path.name}: {lines_before} -> {len(records)} lines"
+            + (f" (+{tail_lines} lines committed during compaction)" if tail_lines else "")
+        )
+        return {"path": str(path), "lines_before": lines_before, "lines_after": len(records) + tail_lines}
+    
+    def _append_records(self, records: List[Dict], path: Optional[Path] = None):
+        """GT 파일(또는 샤드) 끝에 추가 기록 (다른 워커와 배타 잠금, fsync)"""
+        path = path or self.gt_jsonl_path
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(path):
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # 마지막 줄이 개행 없이 끝났으면 줄을 나눔
+                if os.fstat(fd).st_size > 0:
+                    with open(path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            payload = b"\n" + payload
+                view = memoryview(payload)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    
+    def _append_shard_records(self, lines: List[Dict], positions: Dict[str, int]):
+        """파티션 모드: 기존 레코드는 원래 샤드, 새 레코드는 shard_key 샤드 파일에 기록"""
+        groups: Dict[str, List[Dict]] = {}
+        for line in lines:
+            position = positions.get(line['file_path'])
+            name = self._position_shards[position] if position is not None else shard_key(line['file_path'])
+            groups.setdefault(name, []).append(line)
+        for name, group in groups.items():
+            shard = self._shards.get(name)
+            self._append_records(group, shard.path if shard else self.shard_dir / f"{name}{SHARD_SUFFIX}")
+    
+    def _get_or_create_shard(self, name: str) -> Shard:
+        """샤드 조회 (커밋으로 새 파티션이 생기면 빈 집계로 추가)"""
+        shard = self._shards.get(name)
+        if shard is None:
+            shard = Shard(name, self.shard_dir / f"{name}{SHARD_SUFFIX}", [], self._compute_statistics([]), 0)
+            self._shards[name] = shard
+        return shard
+    
+    def _finish_statistics(self, stats: Dict, score_sum: int):
+        """합계로부터 평균 점수와 비율 갱신"""
+        total = stats['total_images']
+        stats['average_score'] = round(score_sum / total, 1) if total else 0.0
+        stats['percentages']['step_free'] = (
+            round(stats['has_step']['false'] / total * 100, 1) if total else 0
+        )
+    
+    def _adjust_statistics(self, stats: Dict, item: Dict, sign: int) -> int:
+        """캐시된 통계에 레코드 하나를 더하거나(sign=1) 빼고(sign=-1) 점수 변화량 반환"""
+        stats['total_images'] += sign
+        stats['has_step']['true' if item.get('has_step', False) else 'false'] += sign
+        
+        width_counts = stats['width_class']
+        for width in item.get('width_class', []):
+            width_counts[width] = width_counts.get(width, 0) + sign
+            if width_counts[width] == 0:
+                del width_counts[width]
+        
+        chair = item.get('chair', {})
+        chair_counts = stats['chair_types']
+        for chair_type in ('movable', 'high_movable', 'fixed', 'floor'):
+            count = chair_counts.get(chair_type, 0)
+            chair_counts[chair_type] = count + sign if self._has_chair_type(chair, chair_type) else count
+        
+        score = self.calculate_accessibility_score(item)
+        stats['grade_distribution'][score['grade']] += sign
+        return sign * score['score']
+    
+    def get_cube(self) -> AttributeCube:
+        """속성 데이터 큐브 (데이터셋 버전이 바뀌면 재구성)"""
+        return self._versioned("_cube", lambda data: self._build(AttributeCube, data))
+    
+    def get_store_index(self) -> StoreIndex:
+        """매장 ID → 데이터 위치 인덱스 (데이터셋 버전이 바뀌면 재구성)"""
+        return self._versioned("_store_index", lambda data: self._build(StoreIndex, data))
+    
+    def get_time_index(self) -> CaptureTimeIndex:
+        """촬영 시각 정렬 인덱스 (데이터셋 버전이 바뀌면 재구성)"""
+        return self._versioned("_time_index", lambda data: self._build(CaptureTimeIndex, data))
+    
+    def _build(self, index_class, data: List[Dict]):
+        index = index_class(self.calculate_accessibility_score)
+        index.build(data)
+        return index
+    
+    def _compute_statistics(self, data: List[Dict]) -> Dict:
+        """통계 계산"""
         if not data:
             return {
                 "total_images": 0,
@@ -122,48 +756,87 @@ class DataManager:
         has_step: Optional[bool] = None,
         width_class: Optional[str] = None,
         chair_type: Optional[str] = None,
-        needs_relabeling: Optional[bool] = None
+        needs_relabeling: Optional[bool] = None,
+        captured_from: Optional[date] = None,
+        captured_to: Optional[date] = None,
+        sort: Optional[str] = None,
+        shards: Optional[Sequence[str]] = None
     ) -> Dict:
-        """이미지 목록 조회 (필터링 및 페이지네이션)"""
-        data = self.load_all_data()
+        """이미지 목록 조회 (필터링 및 페이지네이션)
         
-        # 필터 적용
-        filtered_data = data
-        
-        if has_step is not None:
-            filtered_data = [
-                item for item in filtered_data 
-                if item.get('has_step', False) == has_step
-            ]
-        
-        if width_class:
-            filtered_data = [
-                item for item in filtered_data
-                if width_class in item.get('width_class', [])
-            ]
-        
-        if chair_type:
-            filtered_data = [
-                item for item in filtered_data
-                if self._has_chair_type(item.get('chair', {}), chair_type)
-            ]
-        
-        if needs_relabeling is not None:
-            filtered_data = [
-                item for item in filtered_data
-                if self._needs_relabeling(item) == needs_relabeling
-            ]
-        
-        # 페이지네이션
-        total = len(filtered_data)
-        paginated_data = filtered_data[skip:skip + limit]
-        
-        return {
-            "total": total,
-            "skip": skip,
-            "limit": limit,
-            "items": paginated_data
-        }
+        촬영 기간 필터나 시각 정렬(sort="captured_at" 또는 "-captured_at")을 쓰면
+        파일명에 촬영 시각이 있는 이미지만 대상이 되며, 구간은 이진 탐색으로 찾습니다.
+        파티션 모드에서 shards 를 지정하면 해당 샤드의 레코드만 조회합니다.
+        """
+        self.load_all_data()
+        with self._rw.read():
+            data = self.load_all_data()
+            selected = self._select_shards(shards) if shards else None
+            
+            # 필터 적용
+            filtered_data = data
+            if selected is not None:
+                # 샤드 위치를 데이터 순서대로 병합
+                shard_positions = sorted(position for shard in selected for position in shard.positions)
+                filtered_data = [data[position] for position in shard_positions]
+            
+            if captured_from is not None or captured_to is not None or sort is not None:
+                time_index = self.get_time_index()
+                lo, hi = time_index.bounds(captured_from, captured_to)
+                descending = sort == "-captured_at"
+                
+                if (
+                    selected is None and has_step is None and not width_class
+                    and not chair_type and needs_relabeling is None
+                ):
+                    # 다른 필터가 없으면 필요한 페이지만 바로 꺼냄
+                    return {
+                        "total": hi - lo,
+                        "skip": skip,
+                        "limit": limit,
+                        "items": [data[position] for position in time_index.page(lo, hi, skip, limit, descending)]
+                    }
+                
+                positions = time_index.iter_range(lo, hi, descending)
+                if selected is not None:
+                    allowed = set(shard_positions)
+                    positions = (position for position in positions if position in allowed)
+                filtered_data = [data[position] for position in positions]
+            
+            if has_step is not None:
+                filtered_data = [
+                    item for item in filtered_data 
+                    if item.get('has_step', False) == has_step
+                ]
+            
+            if width_class:
+                filtered_data = [
+                    item for item in filtered_data
+                    if width_class in item.get('width_class', [])
+                ]
+            
+            if chair_type:
+                filtered_data = [
+                    item for item in filtered_data
+                    if self._has_chair_type(item.get('chair', {}), chair_type)
+                ]
+            
+            if needs_relabeling is not None:
+                filtered_data = [
+                    item for item in filtered_data
+                    if self._needs_relabeling(item) == needs_relabeling
+                ]
+            
+            # 페이지네이션
+            total = len(filtered_data)
+            paginated_data = filtered_data[skip:skip + limit]
+            
+            return {
+                "total": total,
+                "skip": skip,
+                "limit": limit,
+                "items": paginated_data
+            }
     
     def _has_chair_type(self, chair: Dict, chair_type: str) -> bool:
         """의자 타입 확인"""
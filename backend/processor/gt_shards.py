@@ -0,0 +1,110 @@
+"""
+GT 파티션(샤드) 카탈로그
+
+shard_dir 아래 *.jsonl 파일 하나가 파티션 하나이며, 파일 이름(확장자 제외)이
+파티션 키입니다 (예: folder_09.jsonl, region_seoul.jsonl). 샤드는 스레드 풀에서
+병렬로 읽고 샤드마다 집계를 만들어 두며, 전체 통계는 샤드 집계를 합쳐 계산합니다.
+새 레코드의 파티션은 file_path 의 첫 경로 요소(배치 폴더)이고 없으면 DEFAULT_SHARD 입니다.
+"""
+import copy
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.processor.data_cube import GRADES
+
+DEFAULT_SHARD = "default"
+SHARD_SUFFIX = ".jsonl"
+
+
+def shard_key(file_path: str) -> str:
+    """레코드가 속할 파티션 키 (숨김 파일 이름이 되는 키는 DEFAULT_SHARD)"""
+    head, sep, _ = file_path.partition('/')
+    return head if sep and head and not head.startswith('.') else DEFAULT_SHARD
+
+
+def shard_files(directory: Path) -> List[Path]:
+    """샤드 파일 목록 (이름순, 숨김 파일 제외)"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        path for path in directory.glob(f"*{SHARD_SUFFIX}")
+        if path.is_file() and not path.name.startswith('.')
+    )
+
+
+class Shard:
+    """파티션 하나의 데이터 위치(오름차순)와 집계"""
+
+    __slots__ = ("name", "path", "positions", "statistics", "score_sum")
+
+    def __init__(self, name: str, path: Path, positions: List[int], statistics: Dict, score_sum: int):
+        self.name = name
+        self.path = path
+        self.positions = positions
+        self.statistics = statistics
+        self.score_sum = score_sum
+
+    def add_position(self, position: int):
+        insort(self.positions, position)
+
+    def remove_position(self, position: int):
+        i = bisect_left(self.positions, position)
+        if i < len(self.positions) and self.positions[i] == position:
+            del self.positions[i]
+
+    def summary(self) -> Dict:
+        return {
+            "name": self.name,
+            "file": self.path.name,
+            "images": len(self.positions),
+            "statistics": copy.deepcopy(self.statistics)
+        }
+
+
+def load_shards(
+    paths: List[Path],
+    parse: Callable[[Path], List[Dict]],
+    summarize: Callable[[List[Dict]], Tuple[Dict, int]],
+    workers: Optional[int] = None
+) -> List[Tuple[Path, List[Dict], Dict, int]]:
+    """샤드를 스레드 풀에서 읽고 집계 (결과는 파일 순서)"""
+    def load(path: Path) -> Tuple[Path, List[Dict], Dict, int]:
+        records = parse(path)
+        statistics, score_sum = summarize(records)
+        return path, records, statistics, score_sum
+
+    if len(paths) <= 1:
+        return [load(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gt-shard") as executor:
+        return list(executor.map(load, paths))
+
+
+def merge_statistics(parts: Iterable[Tuple[Dict, int]]) -> Tuple[Dict, int]:
+    """샤드 집계 합산 (전체 데이터를 한 번에 계산한 결과와 같은 형식)"""
+    merged = {
+        "total_images": 0,
+        "has_step": {"true": 0, "false": 0},
+        "width_class": {},
+        "chair_types": {},
+        "grade_distribution": {grade: 0 for grade in GRADES},
+        "average_score": 0.0,
+        "percentages": {"step_free": 0}
+    }
+    score_sum = 0
+    for statistics, part_score_sum in parts:
+        merged["total_images"] += statistics["total_images"]
+        for key in ("true", "false"):
+            merged["has_step"][key] += statistics["has_step"][key]
+        for group in ("width_class", "chair_types", "grade_distribution"):
+            for key, count in statistics[group].items():
+                merged[group][key] = merged[group].get(key, 0) + count
+        score_sum += part_score_sum
+
+    total = merged["total_images"]
+    if total:
+        merged["average_score"] = round(score_sum / total, 1)
+        merged["percentages"]["step_free"] = round(merged["has_step"]["false"] / total * 100, 1)
+    return merged, score_sum
@@ -0,0 +1,42 @@
+"""
+수집 이미지 파일명 파싱
+
+사진수집현황 파일명은 촬영 시각, 사진 번호, 매장 해시를 담고 있습니다.
+  20240406121216_photo1_96fe98eaa714.webp
+  20241214072812938_photo_1a04d11682bc.webp   (밀리초 포함, 번호 없음)
+  gold_20240317125953_photo4_8fa73bbfd2e7.webp (검수 완료본)
+  20240926051235_menu6_73f5b44b6f50.webp      (사진 종류: photo, menu, profile_photo 등)
+"""
+import re
+from datetime import datetime
+from pathlib import PurePosixPath
+from typing import Dict, Optional
+
+_IMAGE_NAME = re.compile(
+    r'^(?P<gold>gold_)?(?P<stamp>\d{14}(?:\d{3})?)_(?P<kind>[a-z]+(?:_[a-z]+)*)(?P<photo_no>\d*)_(?P<store_id>[A-Za-z0-9]+)$'
+)
+
+
+def parse_image_name(file_path: str) -> Optional[Dict]:
+    """파일명에서 촬영 시각·사진 종류와 번호·매장 ID 추출 (형식이 다르면 None)"""
+    stem = PurePosixPath(file_path).stem
+    match = _IMAGE_NAME.match(stem)
+    if match is None:
+        return None
+
+    stamp = match.group('stamp')
+    try:
+        captured_at = datetime.strptime(stamp[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    if len(stamp) == 17:
+        captured_at = captured_at.replace(microsecond=int(stamp[14:]) * 1000)
+
+    photo_no = match.group('photo_no')
+    return {
+        "store_id": match.group('store_id'),
+        "captured_at": captured_at,
+        "kind": match.group('kind'),
+        "photo_no": int(photo_no) if photo_no else None,
+        "gold": match.group('gold') is not None
+    }
@@ -0,0 +1,170 @@
+"""
+이미지 수집(ingestion) 스캐너
+
+사진수집현황·검수대상목록·spider 폴더에서 새로 생기거나 바뀐 이미지만 찾아
+프로세스 풀에서 파일 크기·해상도·SHA-256을 추출하고, 열 수 없는 파일은
+corrupt 로 표시합니다. 결과는 영구 매니페스트(JSON)에 누적되며
+프론트엔드 갤러리용 이미지 목록 JSON도 이 매니페스트에서 다시 생성합니다.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+MANIFEST_VERSION = 1
+
+
+def scan_image(path: str) -> Dict:
+    """이미지 하나의 메타데이터 추출 (프로세스 풀 작업)"""
+    from PIL import Image
+
+    entry = {"corrupt": False}
+    try:
+        stat = os.stat(path)
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        entry["sha256"] = hasher.hexdigest()
+
+        # verify() 후에는 이미지를 다시 열어야 하므로 헤더 정보만 먼저 읽음
+        with Image.open(path) as image:
+            entry["width"], entry["height"] = image.size
+            entry["format"] = image.format
+            image.verify()
+    except Exception as e:
+        entry["corrupt"] = True
+        entry["error"] = f"{type(e).__name__}: {e}"
+    return entry
+
+
+class IngestManifest:
+    """이미지별 메타데이터 매니페스트 (키: 루트이름/상대경로)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get("version") == MANIFEST_VERSION:
+                self.entries = payload.get("entries", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ingest manifest unreadable, rescanning all images: {e}")
+            self.entries = {}
+
+    def save(self):
+        """임시 파일에 기록 후 교체"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def images(self, root_name: str, include_corrupt: bool = False) -> List[str]:
+        """루트 아래 이미지 상대 경로 목록 (정렬)"""
+        prefix = f"{root_name}/"
+        return sorted(
+            key[len(prefix):] for key, entry in self.entries.items()
+            if key.startswith(prefix) and (include_corrupt or not entry.get("corrupt"))
+        )
+
+
+def _iter_images(root: Path):
+    for path in root.rglob("*"):
+        if path.suffix.lower() in IMAGE_EXTENSIONS and not path.name.startswith('.') and path.is_file():
+            yield path
+
+
+def scan_roots(
+    roots: Dict[str, Path],
+    manifest: IngestManifest,
+    workers: Optional[int] = None,
+    full: bool = False
+) -> Dict:
+    """바뀐 이미지만 다시 스캔하여 매니페스트 갱신
+
+    크기와 수정 시각(mtime_ns)이 매니페스트와 같으면 파일을 열지 않습니다.
+    """
+    start = time.perf_counter()
+    seen = set()
+    changed: List[tuple] = []
+
+    for name, root in roots.items():
+        if not root.exists():
+            continue
+        for path in _iter_images(root):
+            key = f"{name}/{path.relative_to(root).as_posix()}"
+            seen.add(key)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                seen.discard(key)
+                continue
+            entry = manifest.entries.get(key)
+            if (
+                full or entry is None
+                or entry.get("size") != stat.st_size
+                or entry.get("mtime_ns") != stat.st_mtime_ns
+            ):
+                changed.append((key, path))
+
+    removed = [key for key in manifest.entries if key not in seen]
+    for key in removed:
+        del manifest.entries[key]
+
+    if changed:
+        paths = [str(path) for _, path in changed]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+            for (key, _), entry in zip(changed, executor.map(scan_image, paths, chunksize=chunksize)):
+                manifest.entries[key] = entry
+
+    if changed or removed:
+        manifest.save()
+
+    corrupt = [key for key, _ in changed if manifest.entries[key].get("corrupt")]
+    for key in corrupt:
+        logger.warning(f"Corrupt image: {key} ({manifest.entries[key].get('error')})")
+
+    summary = {
+        "total": len(manifest.entries),
+        "scanned": len(changed),
+        "removed": len(removed),
+        "corrupt": corrupt,
+        "corrupt_total": sum(1 for entry in manifest.entries.values() if entry.get("corrupt")),
+        "elapsed_seconds": round(time.perf_counter() - start, 2)
+    }
+    logger.info(
+        f"Ingest scan: {summary['scanned']} scanned, {summary['removed']} removed, "
+        f"{len(corrupt)} corrupt, {summary['total']} total"
+    )
+    return summary
+
+
+def write_gallery_manifest(manifest: IngestManifest, root_name: str, output_path: Path) -> bool:
+    """프론트엔드용 이미지 목록 JSON 재생성 (내용이 바뀐 경우만 기록)"""
+    content = json.dumps(manifest.images(root_name), ensure_ascii=False, indent=2)
+    output_path = Path(output_path)
+    if output_path.exists() and output_path.read_text(encoding='utf-8') == content:
+        return False
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    tmp_path.write_text(content, encoding='utf-8')
+    os.replace(tmp_path, output_path)
+    return True
@@ -0,0 +1,189 @@
+"""
+대용량 JSONL 병렬 파싱
+
+파일을 줄 경계에 맞춘 바이트 구간(청크)으로 나눠 프로세스 풀에서 파싱하고
+결과를 파일 순서대로 합칩니다. 청크마다 줄 수를 함께 돌려주므로 잘못된 줄은
+단일 프로세스로 읽을 때와 같은 줄 번호로 보고됩니다. orjson 이 설치되어 있으면
+더 빠른 파서로 사용하고, 작은 파일은 현재 프로세스에서 구간별로 이어 읽습니다.
+
+워커 프로세스는 fork 대신 forkserver(없으면 spawn)로 시작합니다. 서버처럼
+스레드가 많은 프로세스를 fork 하면 다른 스레드가 잡고 있던 잠금이 자식에
+잠긴 채로 복사되어 교착될 수 있기 때문입니다. 워커 시작 비용이 매 로드에
+붙지 않도록 프로세스 풀은 워커 수별로 하나만 만들어 재사용합니다.
+"""
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+from backend.utils.config import settings
+
+loads = orjson.loads if orjson is not None else json.loads
+
+MIN_CHUNK_BYTES = 1024 * 1024
+TAIL_BLOCK_BYTES = 64 * 1024
+# 단일 프로세스 파싱 시 한 번에 읽는 최대 바이트
+SERIAL_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _mp_context():
+    """워커 시작 방식 (forkserver 우선, 워커가 파서 모듈을 미리 임포트)"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    """워커 수별 공유 프로세스 풀 (처음 요청 시 생성)"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            _pools[workers] = pool
+        return pool
+
+
+def _discard_pool(workers: Optional[int], pool: ProcessPoolExecutor):
+    """깨진 풀 제거 (다음 호출에서 새로 생성)"""
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pools():
+    """공유 프로세스 풀 종료"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pools)
+
+
+def parse_lines(data: bytes) -> Tuple[List[Dict], List[Tuple[int, str]], int]:
+    """줄 단위 파싱 → (레코드, (청크 안 줄 번호, 오류) 목록, 줄 수)"""
+    lines = data.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    records, errors = [], []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(loads(line))
+        except ValueError as e:  # JSONDecodeError, 잘못된 UTF-8
+            errors.append((line_num, str(e)))
+    return records, errors, len(lines)
+
+
+def _parse_range(task: Tuple[str, int, int]) -> Tuple[List[Dict], List[Tuple[int, str]], int]:
+    """바이트 구간 하나 파싱 (프로세스 풀 작업)"""
+    path, start, end = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return parse_lines(f.read(end - start))
+
+
+def _last_line_end(f, start: int, end: int) -> int:
+    """start~end 안 마지막 개행 다음 위치 (개행이 없으면 start)"""
+    pos = end
+    while pos > start:
+        size = min(TAIL_BLOCK_BYTES, pos - start)
+        f.seek(pos - size)
+        i = f.read(size).rfind(b"\n")
+        if i >= 0:
+            return pos - size + i + 1
+        pos -= size
+    return start
+
+
+def chunk_ranges(path: Path, start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """줄 경계에 맞춘 바이트 구간 목록"""
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < end:
+            if start + chunk_bytes >= end:
+                ranges.append((start, end))
+                break
+            f.seek(start + chunk_bytes)
+            f.readline()
+            boundary = min(f.tell(), end)
+            ranges.append((start, boundary))
+            start = boundary
+    return ranges
+
+
+def read_jsonl(
+    path: Path,
+    offset: int = 0,
+    complete_lines: bool = False,
+    first_line: int = 1,
+    on_error: Optional[Callable[[int, str], None]] = None,
+    workers: Optional[int] = None,
+    min_parallel_bytes: Optional[int] = None,
+    chunk_bytes: Optional[int] = None,
+    end: Optional[int] = None
+) -> Tuple[List[Dict], int, int]:
+    """offset 부터 파일 끝(또는 end)까지 파싱 → (레코드, 다음 읽을 위치, 읽은 줄 수)
+
+    complete_lines 이면 개행으로 끝난 줄까지만 읽습니다 (기록 중인 마지막 줄 제외).
+    on_error(줄 번호, 오류) 의 줄 번호는 first_line 부터 셉니다.
+    """
+    path = Path(path)
+    workers = workers if workers is not None else settings.JSONL_PARSE_WORKERS
+    if min_parallel_bytes is None:
+        min_parallel_bytes = settings.JSONL_PARALLEL_MIN_BYTES
+
+    with open(path, 'rb') as f:
+        file_end = f.seek(0, os.SEEK_END)
+        end = file_end if end is None else min(end, file_end)
+        if complete_lines:
+            end = _last_line_end(f, offset, end)
+    parallel = workers != 1 and end - offset >= max(1, min_parallel_bytes)
+
+    if parallel:
+        if chunk_bytes is None:
+            # 워커당 청크 4개 (줄 길이가 달라도 워커가 고르게 바쁘도록)
+            chunk_bytes = max(MIN_CHUNK_BYTES, -(-(end - offset) // ((workers or os.cpu_count() or 1) * 4)))
+        tasks = [(str(path), start, stop) for start, stop in chunk_ranges(path, offset, end, chunk_bytes)]
+        pool = _get_pool(workers)
+        try:
+            results = list(pool.map(_parse_range, tasks))
+        except BrokenProcessPool:
+            # 워커가 죽은 풀은 재사용할 수 없음
+            _discard_pool(workers, pool)
+            raise
+    else:
+        # 구간 전체를 한 번에 읽지 않고 줄 경계에 맞춘 블록 단위로 파싱
+        tasks = [(str(path), start, stop) for start, stop in chunk_ranges(path, offset, end, SERIAL_CHUNK_BYTES)]
+        results = [_parse_range(task) for task in tasks]
+
+    records: List[Dict] = []
+    line_count = 0
+    for chunk_records, errors, chunk_lines in results:
+        if on_error is not None:
+            for line_num, message in errors:
+                on_error(first_line + line_count + line_num - 1, message)
+        records.extend(chunk_records)
+        line_count += chunk_lines
+    return records, end, line_count
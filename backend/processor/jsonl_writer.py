@@ -0,0 +1,253 @@
+"""
+JSONL 그룹 커밋 단일 작성기
+
+출력 파일마다 작성 스레드 하나가 메모리 큐에서 레코드를 받아
+크기·시간 기준으로 모아 한 번의 write()로 기록합니다.
+요청 핸들러와 분석 스레드는 큐에 넣기만 하므로 서로 줄이 섞이지 않고,
+fsync 정책과 크기 기준 파일 교체(rotation)를 설정할 수 있습니다.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from backend.utils.config import settings
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FSYNC_POLICIES = ("always", "interval", "never")
+_STOP = object()
+
+
+class JsonlWriter:
+    """출력 파일 하나를 담당하는 그룹 커밋 작성기"""
+
+    def __init__(
+        self,
+        path: Path,
+        max_batch_lines: int = 512,
+        max_batch_bytes: int = 1024 * 1024,
+        max_delay: float = 0.02,
+        fsync: str = "always",
+        fsync_interval: float = 1.0,
+        rotate_bytes: int = 0
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.path = Path(path)
+        self.max_batch_lines = max_batch_lines
+        self.max_batch_bytes = max_batch_bytes
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._fd: Optional[int] = None
+        self._last_fsync = time.monotonic()
+        self._stats = {"lines": 0, "groups": 0, "bytes": 0, "fsyncs": 0, "rotations": 0}
+        self._thread = threading.Thread(target=self._run, name=f"jsonl-writer:{self.path.name}", daemon=True)
+        self._thread.start()
+
+    # 생산자 API
+
+    def write(self, record: Dict) -> Future:
+        """레코드 한 줄 추가 (커밋되면 완료되는 Future 반환)"""
+        return self.write_many([record])
+
+    def write_many(self, records: Iterable[Dict]) -> Future:
+        """여러 레코드를 한 번에 추가 (모두 같은 그룹에서 커밋됨)"""
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        future: Future = Future()
+        if not data:
+            future.set_result(0)
+            return future
+        self._queue.put((data, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 레코드를 커밋하고 작성 스레드 종료"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {"path": str(self.path), "pending": self._queue.qsize(), **self._stats}
+
+    # 작성 스레드
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_delay
+
+            # 크기 또는 시간 기준에 도달할 때까지 그룹에 모음
+            while len(batch) < self.max_batch_lines and size < self.max_batch_bytes:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._commit(batch)
+
+        self._sync(force=self.fsync != "never")
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _commit(self, batch: List[Tuple[bytes, Future]]):
+        data = b"".join(chunk for chunk, _ in batch)
+        try:
+            with file_lock(self.path):
+                self._ensure_open()
+                if self.rotate_bytes and os.fstat(self._fd).st_size + len(data) > self.rotate_bytes:
+                    self._rotate()
+                view = memoryview(data)
+                while view:
+                    written = os.write(self._fd, view)
+                    view = view[written:]
+                self._sync(force=self.fsync == "always")
+        except Exception as e:
+            logger.error(f"JSONL group commit failed ({self.path}): {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self._stats["lines"] += data.count(b"\n")
+        self._stats["groups"] += 1
+        self._stats["bytes"] += len(data)
+        for chunk, future in batch:
+            future.set_result(chunk.count(b"\n"))
+
+    def _sync(self, force: bool):
+        if self._fd is None or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._fd)
+            self._last_fsync = now
+            self._stats["fsyncs"] += 1
+
+    def _ensure_open(self):
+        """파일을 열거나, 다른 프로세스가 교체했으면 다시 엶"""
+        if self._fd is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._fd).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+            os.close(self._fd)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _rotate(self):
+        """현재 파일을 타임스탬프 이름으로 옮기고 새 파일 시작"""
+        self._sync(force=self.fsync != "never")
+        os.close(self._fd)
+        self._fd = None
+
+        rotated = rotated_path(self.path)
+        os.replace(self.path, rotated)
+        self._stats["rotations"] += 1
+        logger.info(f"Rotated {self.path.name} -> {rotated.name}")
+        self._ensure_open()
+
+
+@contextmanager
+def file_lock(path: Path):
+    """같은 파일을 쓰는 다른 워커 프로세스와의 배타 잠금"""
+    if fcntl is None:
+        yield
+        return
+    path = Path(path)
+    lock_path = path.with_name(f".{path.name}.lock")
+    with open(lock_path, "a+") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def rotated_path(path: Path) -> Path:
+    """교체 시 사용할 타임스탬프 파일 이름"""
+    path = Path(path)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    return path.with_name(f"{path.stem}-{stamp}{path.suffix}")
+
+
+def rotated_files(path: Path) -> List[Path]:
+    """교체된 이전 파일 목록 (오래된 순)"""
+    path = Path(path)
+    return sorted(path.parent.glob(f"{path.stem}-*{path.suffix}"))
+
+
+def log_files(path: Path) -> List[Path]:
+    """교체된 파일과 현재 파일을 기록 순서대로 (존재하는 것만)"""
+    path = Path(path)
+    files = rotated_files(path)
+    if path.exists():
+        files.append(path)
+    return files
+
+
+_writers: Dict[Path, JsonlWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path: Path) -> JsonlWriter:
+    """출력 파일별 작성기 (프로세스당 파일 하나에 작성기 하나)"""
+    key = Path(path).resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = JsonlWriter(
+                key,
+                max_batch_lines=settings.WRITER_MAX_BATCH_LINES,
+                max_delay=settings.WRITER_MAX_DELAY_MS / 1000,
+                fsync=settings.WRITER_FSYNC,
+                fsync_interval=settings.WRITER_FSYNC_INTERVAL,
+                rotate_bytes=settings.WRITER_ROTATE_BYTES
+            )
+            _writers[key] = writer
+        return writer
+
+
+def close_all_writers():
+    """모든 작성기의 남은 레코드 커밋 후 종료"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_writers)
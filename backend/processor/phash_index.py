@@ -0,0 +1,294 @@
+"""
+지각 해시(dHash) 기반 유사 이미지 인덱스
+
+같은 매장의 재촬영본, gold_ 변형, 재인코딩 사본처럼 바이트가 달라도
+거의 같은 이미지를 BK-tree 해밍 거리 검색으로 찾습니다.
+분석 엔드포인트는 이웃 이미지의 레이블을 재사용하여 GPT 호출을 줄이고,
+갤러리는 중복 그룹을 하나로 접을 수 있습니다.
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.processor.jsonl_writer import log_files
+from backend.processor.review_queue import FALLBACK_CONFIDENCE
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+HASH_SIZE = 8
+
+
+def dhash(image_path: Path, hash_size: int = HASH_SIZE) -> int:
+    """차이 해시(dHash) 계산 (64비트)"""
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        # 가로로 한 칸 더 줄여 인접 픽셀 밝기 차이를 비교
+        small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """해밍 거리"""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """해밍 거리 반경 검색용 BK-tree"""
+
+    def __init__(self):
+        # 노드: [hash, keys, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, key: str):
+        """해시와 키 추가 (같은 해시는 한 노드에 묶음)"""
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [key], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, str]]:
+        """반경 내 (거리, 키) 목록을 거리순으로 반환"""
+        results = []
+        if self._root is None:
+            return results
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                results.extend((distance, key) for key in node[1])
+            # 삼각 부등식으로 탐색 범위 제한
+            low, high = distance - radius, distance + radius
+            for child_distance, child in node[2].items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+
+        results.sort()
+        return results
+
+
+class PerceptualHashIndex:
+    """데이터 폴더 전체 이미지의 지각 해시 인덱스
+
+    키는 '<root>/<상대 경로>' 형식입니다 (예: 사진수집현황/folder_00/a.webp).
+    해시는 (크기, 수정시각)과 함께 캐시 파일에 저장되어 재빌드 시
+    변경된 파일만 다시 계산합니다.
+    """
+
+    def __init__(self, roots: Dict[str, Path], cache_path: Optional[Path] = None):
+        self.roots = {name: Path(path) for name, path in roots.items()}
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, int] = {}
+        self._tree = BKTree()
+        self._labels: Dict[str, Dict] = {}
+        self._built = False
+
+    def _iter_images(self) -> Iterator[Tuple[str, Path]]:
+        for name, root in self.roots.items():
+            if not root.exists():
+                continue
+            for path in sorted(root.rglob("*")):
+                if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                    yield f"{name}/{path.relative_to(root).as_posix()}", path
+
+    def _load_cache(self) -> Dict[str, list]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable phash cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self, cache: Dict[str, list]):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        tmp_path.replace(self.cache_path)
+
+    def _load_labels(self) -> Dict[str, Dict]:
+        """각 루트의 gpt_analysis_results.jsonl 에서 재사용 가능한 레이블 수집"""
+        labels = {}
+        for name, root in self.roots.items():
+            # 교체·압축된 이전 파일부터 순서대로 읽어 최신 결과가 남도록 함
+            for results_path in log_files(root / "gpt_analysis_results.jsonl"):
+                with open(results_path, 'r', encoding='utf-8') as f:
+                    for line_num, line in enumerate(f, 1):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            logger.error(f"JSON decode error at line {line_num} of {results_path}: {e}")
+                            continue
+                        if record.get('file_path'):
+                            labels[f"{name}/{record['file_path']}"] = record
+        return labels
+
+    def build(self) -> int:
+        """인덱스 (재)빌드, 인덱싱된 이미지 수 반환"""
+        with self._lock:
+            return self._build_locked()
+
+    def _build_locked(self) -> int:
+        cache = self._load_cache()
+        new_cache = {}
+        hashes = {}
+        computed = 0
+
+        for key, path in self._iter_images():
+            stat = path.stat()
+            cached = cache.get(key)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                value = int(cached[2], 16)
+            else:
+                try:
+                    value = dhash(path)
+                except Exception as e:
+                    logger.warning(f"Could not hash image {path}: {e}")
+                    continue
+                computed += 1
+            new_cache[key] = [stat.st_size, stat.st_mtime_ns, f"{value:016x}"]
+            hashes[key] = value
+
+        tree = BKTree()
+        for key, value in hashes.items():
+            tree.add(value, key)
+
+        self._hashes = hashes
+        self._tree = tree
+        self._labels = self._load_labels()
+        self._built = True
+        if computed or len(new_cache) != len(cache):
+            self._save_cache(new_cache)
+
+        logger.info(f"Perceptual hash index built: {len(hashes)} images ({computed} hashed)")
+        return len(hashes)
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def ensure_built(self):
+        """최초 사용 시 빌드 (동시 호출은 진행 중인 빌드를 기다림)"""
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._build_locked()
+
+    def hash_of(self, key: str) -> Optional[int]:
+        self.ensure_built()
+        return self._hashes.get(key)
+
+    def add_image(self, key: str, path: Path) -> Optional[int]:
+        """인덱스에 없는 이미지를 즉시 해시하여 추가"""
+        self.ensure_built()
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+            try:
+                value = dhash(path)
+            except Exception as e:
+                logger.warning(f"Could not hash image {path}: {e}")
+                return None
+            self._hashes[key] = value
+            self._tree.add(value, key)
+            return value
+
+    def find_similar(self, key: str, radius: int, path: Optional[Path] = None) -> List[Dict]:
+        """반경 내 유사 이미지 (자기 자신 제외)"""
+        value = self.hash_of(key)
+        if value is None and path is not None:
+            value = self.add_image(key, path)
+        if value is None:
+            return []
+        # 분석 스레드의 add_image 와 겹치지 않도록 잠금 안에서 탐색
+        with self._lock:
+            matches = self._tree.search(value, radius)
+        return [
+            {"key": other, "distance": distance}
+            for distance, other in matches
+            if other != key
+        ]
+
+    def find_reusable_label(self, key: str, radius: int, path: Optional[Path] = None) -> Optional[Tuple[str, int, Dict]]:
+        """가장 가까운 이웃의 분석 결과 (재사용 결과·파싱 실패 기본값 제외)"""
+        for neighbor in self.find_similar(key, radius, path):
+            record = self._labels.get(neighbor['key'])
+            if record is None or record.get('reused_from') or record.get('confidence') == FALLBACK_CONFIDENCE:
+                continue
+            return neighbor['key'], neighbor['distance'], record
+        return None
+
+    def add_label(self, key: str, record: Dict):
+        """새 분석 결과를 재사용 후보로 등록"""
+        self._labels[key] = record
+
+    def duplicate_groups(self, radius: int, root: Optional[str] = None) -> List[List[str]]:
+        """반경 내로 연결된 중복 그룹 (크기 2 이상, 대표 이미지가 첫 번째)"""
+        self.ensure_built()
+
+        def find(k: str) -> str:
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        with self._lock:
+            keys = [k for k in self._hashes if root is None or k.startswith(f"{root}/")]
+            parent = {k: k for k in keys}
+            for key in keys:
+                for _, other in self._tree.search(self._hashes[key], radius):
+                    if other in parent and other != key:
+                        a, b = find(key), find(other)
+                        if a != b:
+                            parent[max(a, b)] = min(a, b)
+
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            groups.setdefault(find(key), []).append(key)
+
+        return sorted(
+            (sorted(members, key=_representative_order) for members in groups.values() if len(members) > 1),
+            key=lambda members: members[0]
+        )
+
+
+def _representative_order(key: str) -> Tuple[int, str]:
+    """gold_ 이미지를 그룹 대표로 우선"""
+    return (0 if Path(key).name.startswith("gold_") else 1, key)
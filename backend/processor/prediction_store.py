@@ -0,0 +1,288 @@
+"""
+GPT 분석 결과(예측) 저장소와 로그 압축
+
+gpt_analysis_results.jsonl 은 재분석할 때마다 줄이 추가되는 로그입니다.
+PredictionStore 는 file_path 별 최신 결과(선택적으로 최근 N개 이력)를
+딕셔너리 인덱스로 유지하고, 파일에 새로 추가된 부분만 이어서 읽습니다.
+compact_prediction_log() 는 활성 파일을 잠깐 잠가 세그먼트로 넘긴 뒤
+잠금 없이 세그먼트들을 file_path 별 최신 결과만 남도록 병합합니다.
+"""
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from backend.processor.jsonl_reader import read_jsonl
+from backend.processor.jsonl_writer import file_lock, log_files, rotated_files, rotated_path
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PredictionStore:
+    """file_path → 최신 분석 결과 인덱스"""
+
+    def __init__(self, path: Path, history: int = 0, indexes: Sequence = ()):
+        self.path = Path(path)
+        self.history_size = max(0, history)
+        # 최신 결과가 바뀔 때마다 갱신되는 인덱스 (StoreIndex, ReviewQueue 등; 키: file_path)
+        self.indexes = list(indexes)
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Dict] = {}
+        self._history: Dict[str, Deque[Dict]] = {}
+        self._loaded = False
+        # 현재 파일의 inode 와 읽은 위치 (추가분만 이어 읽기)
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._line_num = 0
+        self.records_read = 0
+
+    def load(self) -> int:
+        """교체된 파일까지 모두 다시 읽음, 인덱싱된 file_path 수 반환"""
+        with self._lock:
+            self._load_locked()
+            return len(self._latest)
+
+    def refresh(self):
+        """현재 파일에 추가된 줄 반영 (교체·압축되었으면 전체 다시 읽음)"""
+        with self._lock:
+            if self._stale():
+                self._load_locked()
+                return
+            try:
+                size = os.stat(self.path).st_size
+            except FileNotFoundError:
+                return
+            if size > self._offset:
+                self._offset = self._read(self.path, self._offset)
+
+    def stale(self) -> bool:
+        """전체를 다시 읽어야 하는지 (아직 읽지 않았거나 파일이 교체·압축됨, 파일 상태만 확인)
+
+        이벤트 루프에서는 stale() 이면 load() 를 스레드에서 실행하고,
+        아니면 refresh() 로 추가된 줄만 이어 읽습니다.
+        """
+        return self._stale()
+
+    def appended(self) -> bool:
+        """현재 파일에 아직 읽지 않은 줄이 있는지 (파일 상태만 확인)"""
+        try:
+            return os.stat(self.path).st_size > self._offset
+        except FileNotFoundError:
+            return False
+
+    def reading(self):
+        """인덱스(StoreIndex 등)를 읽는 동안 refresh() 가 끼어들지 않게 하는 잠금"""
+        return self._lock
+
+    def _stale(self) -> bool:
+        if not self._loaded:
+            return True
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._inode is not None
+        return stat.st_ino != self._inode or stat.st_size < self._offset
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        self.refresh()
+        return self._latest.get(file_path)
+
+    def peek(self, file_path: str) -> Optional[Dict]:
+        """파일을 다시 읽지 않고 현재 인덱스에서 조회 (인덱스 갱신 콜백용)"""
+        return self._latest.get(file_path)
+
+    def history(self, file_path: str) -> List[Dict]:
+        """최근 결과 목록 (오래된 순, history=0 이면 최신 결과만)"""
+        self.refresh()
+        if file_path in self._history:
+            return list(self._history[file_path])
+        latest = self._latest.get(file_path)
+        return [latest] if latest is not None else []
+
+    def latest(self) -> List[Dict]:
+        """file_path 별 최신 결과 전체"""
+        self.refresh()
+        return list(self._latest.values())
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._latest
+
+    def _load_locked(self):
+        self._latest = {}
+        self._history = {}
+        for index in self.indexes:
+            index.clear()
+        self._inode = None
+        self._offset = 0
+        self.records_read = 0
+
+        for segment in rotated_files(self.path):
+            self._line_num = 0
+            try:
+                self._read(segment, 0)
+            except FileNotFoundError:
+                # 읽는 도중 압축으로 병합된 세그먼트 (내용은 더 최신 세그먼트에 있음)
+                continue
+
+        self._line_num = 0
+        try:
+            self._inode = os.stat(self.path).st_ino
+            self._offset = self._read(self.path, 0)
+        except FileNotFoundError:
+            self._inode = None
+        self._loaded = True
+
+    def _read(self, path: Path, offset: int) -> int:
+        """offset 부터 완성된 줄까지 읽고 다음 위치 반환 (큰 구간은 청크 병렬 파싱)"""
+        def on_error(line_num: int, message: str):
+            logger.error(f"JSON decode error at line {line_num} of {path}: {message}")
+
+        # 기록 중인 마지막 줄은 다음 번에 읽음
+        records, end, line_count = read_jsonl(
+            path, offset, complete_lines=True, first_line=self._line_num + 1, on_error=on_error
+        )
+        self._line_num += line_count
+        for record in records:
+            self._apply(record)
+        return end
+
+    def _apply(self, record: Dict):
+        file_path = record.get('file_path')
+        if not file_path:
+            return
+        self.records_read += 1
+        for index in self.indexes:
+            index.update(file_path, self._latest.get(file_path), record)
+        self._latest[file_path] = record
+        if self.history_size:
+            self._history.setdefault(file_path, deque(maxlen=self.history_size)).append(record)
+
+
+def merge_latest(records: Iterable[Dict], keep_history: int = 1) -> List[Dict]:
+    """file_path 별 최근 keep_history 개만 남김 (마지막 기록 순서 유지)"""
+    merged: Dict[str, Deque[Dict]] = {}
+    for record in records:
+        file_path = record.get('file_path')
+        if not file_path:
+            continue
+        entries = merged.pop(file_path, None)
+        if entries is None:
+            entries = deque(maxlen=max(1, keep_history))
+        entries.append(record)
+        merged[file_path] = entries
+    return [record for entries in merged.values() for record in entries]
+
+
+@contextmanager
+def _compaction_lock(path: Path):
+    """동시 압축 방지 (이미 진행 중이면 False)"""
+    if fcntl is None:
+        yield True
+        return
+    lock_path = path.with_name(f".{path.name}.compact.lock")
+    with open(lock_path, "a+") as lock_file:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read_records(path: Path) -> Iterable[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON decode error at line {line_num} of {path}: {e}")
+
+
+def log_size(path: Path) -> int:
+    """교체된 파일을 포함한 로그 전체 크기"""
+    total = 0
+    for file in log_files(path):
+        try:
+            total += file.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def compact_prediction_log(path: Path, keep_history: int = 1) -> Dict:
+    """로그를 file_path 별 최신 결과만 남도록 압축
+
+    작성기는 활성 파일을 세그먼트로 옮기는 순간에만 잠금을 기다리고,
+    병합은 더 이상 추가되지 않는 세그먼트에 대해 잠금 없이 수행됩니다.
+    병합 결과는 가장 최신 세그먼트 이름으로 교체되므로 읽는 쪽은
+    언제나 기록 순서대로 이어 읽으면 최신 결과를 얻습니다.
+    """
+    path = Path(path)
+    with _compaction_lock(path) as acquired:
+        if not acquired:
+            return {"path": str(path), "skipped": True}
+
+        # 1. 활성 파일을 세그먼트로 교체 (작성기는 다음 커밋 때 새 파일을 엶)
+        with file_lock(path):
+            if path.exists() and path.stat().st_size > 0:
+                os.replace(path, rotated_path(path))
+
+        segments = rotated_files(path)
+        if not segments:
+            return {"path": str(path), "segments": 0, "lines_before": 0, "lines_after": 0}
+
+        # 2. 세그먼트 병합
+        lines_before = 0
+
+        def records():
+            nonlocal lines_before
+            for segment in segments:
+                for record in _read_records(segment):
+                    lines_before += 1
+                    yield record
+
+        merged = merge_latest(records(), keep_history)
+
+        # 3. 임시 파일에 기록 후 가장 최신 세그먼트와 교체, 이전 세그먼트 삭제
+        target = segments[-1]
+        tmp_path = target.with_name(f".{target.name}.compact.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in merged:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+        for segment in segments[:-1]:
+            os.unlink(segment)
+
+    logger.info(
+        f"Compacted {path.name}: {lines_before} -> {len(merged)} lines ({len(segments)} segments)"
+    )
+    return {
+        "path": str(path),
+        "segments": len(segments),
+        "lines_before": lines_before,
+        "lines_after": len(merged)
+    }
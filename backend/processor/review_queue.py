@@ -0,0 +1,167 @@
+"""
+검수 우선순위 큐
+
+GPT 분석 결과마다 검수 가치(낮은 confidence, 파싱 실패 기본값,
+유사 이미지와의 레이블 불일치)를 점수로 매겨 힙에 보관합니다.
+결과가 바뀌면 해당 이미지와 이웃 이미지만 다시 점수를 매기고,
+상위 N개 조회는 전체 정렬 없이 힙에서 O(N log M)에 꺼냅니다.
+이미 GT 레이블이 있는 이미지(exclude)는 점수를 매기지 않고 조회에서도 건너뛰므로
+분석 결과를 다시 읽어도 검수한 이미지가 큐에 돌아오지 않습니다.
+"""
+import heapq
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.processor.data_cube import CHAIR_KEYS
+
+# 파싱 실패 시 기본값의 confidence (gpt_vision._fallback_result)
+FALLBACK_CONFIDENCE = 0.5
+# confidence 가 없는 결과에 적용되는 기본값 (gpt_vision.analyze_image_with_gpt)
+DEFAULT_CONFIDENCE = 0.85
+
+# neighbors(key) -> [(이 큐의 키 또는 None, 이웃 분석 결과)]
+NeighborFunc = Callable[[str], List[Tuple[Optional[str], Dict]]]
+# exclude(key) -> 큐에서 제외할 키인지 (GT 레이블이 있는 이미지 등)
+ExcludeFunc = Callable[[str], bool]
+
+
+def label_disagreement(record: Dict, other: Dict) -> float:
+    """두 레이블의 불일치 정도 (단차·통로 너비·의자 각 1/3)"""
+    diff = 0
+    if bool(record.get('has_step')) != bool(other.get('has_step')):
+        diff += 1
+    if set(record.get('width_class', [])) != set(other.get('width_class', [])):
+        diff += 1
+    chair, other_chair = record.get('chair', {}), other.get('chair', {})
+    if any(bool(chair.get(key)) != bool(other_chair.get(key)) for key in CHAIR_KEYS):
+        diff += 1
+    return diff / 3
+
+
+def review_priority(record: Dict, neighbors: List[Dict]) -> Tuple[float, List[str]]:
+    """검수 우선순위 점수와 사유"""
+    reasons = []
+    confidence = record.get('confidence', DEFAULT_CONFIDENCE)
+    try:
+        confidence = float(confidence)
+    except (TypeError, ValueError):
+        confidence = 0.0
+
+    priority = 1.0 - confidence
+    if confidence == FALLBACK_CONFIDENCE:
+        # 응답 파싱에 실패해 기본값이 저장된 결과는 가장 먼저 검수
+        priority += 1.0
+        reasons.append("fallback")
+    elif confidence < 0.7:
+        reasons.append("low_confidence")
+
+    if neighbors:
+        disagreement = sum(label_disagreement(record, other) for other in neighbors) / len(neighbors)
+        if disagreement > 0:
+            priority += disagreement
+            reasons.append("neighbor_disagreement")
+
+    return round(priority, 4), reasons
+
+
+class ReviewQueue:
+    """file_path → 검수 우선순위 (지연 삭제 힙)"""
+
+    def __init__(self, neighbors: Optional[NeighborFunc] = None, exclude: Optional[ExcludeFunc] = None):
+        self._neighbors = neighbors
+        self._exclude = exclude
+        self._records: Dict[str, Dict] = {}
+        # 키별 현재 (우선순위, 순번, 사유); 힙의 다른 순번 항목은 무효
+        self._entries: Dict[str, Tuple[float, int, List[str]]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    def clear(self):
+        with self._lock:
+            self._records = {}
+            self._entries = {}
+            self._heap = []
+
+    def update(self, key: str, old_record: Optional[Dict], record: Dict):
+        """분석 결과 추가·변경 (이웃의 불일치 점수도 갱신)"""
+        with self._lock:
+            self._records[key] = record
+            for neighbor_key in self._score(key):
+                if neighbor_key in self._records:
+                    self._score(neighbor_key)
+
+    def remove(self, key: str):
+        """검수 완료 등으로 큐에서 제외"""
+        with self._lock:
+            self._records.pop(key, None)
+            self._entries.pop(key, None)
+
+    def rescore_all(self) -> int:
+        """전체 점수 재계산 (유사 이미지 인덱스가 준비된 뒤 호출)"""
+        with self._lock:
+            self._entries = {}
+            self._heap = []
+            for key in self._records:
+                self._score(key)
+            return len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _excluded(self, key: str) -> bool:
+        return self._exclude is not None and self._exclude(key)
+
+    def _score(self, key: str) -> List[str]:
+        """키 점수 계산 후 힙에 추가 (제외 대상이면 큐에서 뺌), 같은 큐에 속한 이웃 키 반환"""
+        neighbors = self._neighbors(key) if self._neighbors is not None else []
+        if self._excluded(key):
+            # 결과가 바뀌면 이웃의 불일치 점수는 여전히 갱신
+            self._entries.pop(key, None)
+        else:
+            priority, reasons = review_priority(self._records[key], [record for _, record in neighbors])
+            seq = next(self._seq)
+            self._entries[key] = (priority, seq, reasons)
+            heapq.heappush(self._heap, (-priority, seq, key))
+            if len(self._heap) > 2 * len(self._entries) + 1024:
+                self._compact()
+        return [neighbor_key for neighbor_key, _ in neighbors if neighbor_key is not None]
+
+    def _compact(self):
+        """무효 항목 제거"""
+        self._heap = [
+            (-priority, seq, key) for key, (priority, seq, _) in self._entries.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def top(self, limit: int, skip: int = 0) -> List[Dict]:
+        """우선순위 상위 항목 (skip 이후 limit 개)"""
+        with self._lock:
+            popped = []
+            items = []
+            while self._heap and len(popped) < skip + limit:
+                neg_priority, seq, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None or entry[1] != seq:
+                    continue  # 갱신·삭제된 항목
+                if self._excluded(key):
+                    # 점수를 매긴 뒤 레이블된 항목 (다른 워커의 커밋 등)
+                    del self._entries[key]
+                    continue
+                popped.append((neg_priority, seq, key))
+            # 꺼낸 유효 항목은 다시 넣음 (조회는 큐를 바꾸지 않음)
+            for item in popped:
+                heapq.heappush(self._heap, item)
+
+            for neg_priority, _, key in popped[skip:]:
+                items.append({
+                    "file_path": key,
+                    "priority": -neg_priority,
+                    "reasons": self._entries[key][2],
+                    "prediction": self._records[key]
+                })
+            return items
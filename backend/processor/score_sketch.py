@@ -0,0 +1,79 @@
+"""
+병합 가능한 점수 분포 스케치
+
+접근성 점수는 0~100 정수이므로 값별 개수(101칸)만 세면 메모리가 데이터 크기와
+무관하고, 중간값·백분위수도 전체 점수 목록으로 계산한 값과 정확히 같습니다.
+청크별 스케치를 merge() 로 더하면 병렬로 나눠 계산한 결과를 합칠 수 있습니다.
+"""
+from typing import Dict, Iterable, List, Sequence
+
+
+class ScoreSketch:
+    """정수 점수 분포 (값별 개수, 같은 범위끼리 병합 가능)"""
+
+    def __init__(self, low: int = 0, high: int = 100):
+        if high < low:
+            raise ValueError(f"Invalid score range: {low}..{high}")
+        self.low = low
+        self.high = high
+        self.counts: List[int] = [0] * (high - low + 1)
+        self.count = 0
+        self.total = 0
+
+    def add(self, score: int, count: int = 1):
+        if not self.low <= score <= self.high or score != int(score):
+            raise ValueError(f"Score out of range {self.low}..{self.high}: {score}")
+        self.counts[int(score) - self.low] += count
+        self.count += count
+        self.total += int(score) * count
+
+    def update(self, scores: Iterable[int]):
+        for score in scores:
+            self.add(score)
+
+    def merge(self, other: "ScoreSketch") -> "ScoreSketch":
+        """다른 스케치의 개수를 더함 (범위가 다르면 ValueError)"""
+        if (other.low, other.high) != (self.low, self.high):
+            raise ValueError(f"Cannot merge sketches with ranges {self.low}..{self.high} and {other.low}..{other.high}")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def __len__(self) -> int:
+        return self.count
+
+    def mean(self) -> float:
+        if not self.count:
+            raise ValueError("mean of empty sketch")
+        return self.total / self.count
+
+    def _value_at(self, rank: int) -> int:
+        """오름차순 rank 번째(0부터) 점수"""
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                return self.low + i
+        raise IndexError(rank)
+
+    def quantile(self, q: float) -> float:
+        """분위수 (가장 가까운 두 순위 사이 선형 보간, q=0.5 는 statistics.median 과 같음)"""
+        if not self.count:
+            raise ValueError("quantile of empty sketch")
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f"Quantile must be between 0 and 1: {q}")
+        position = (self.count - 1) * q
+        lower = int(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return float(low_value)
+        high_value = self._value_at(lower + 1)
+        return low_value + (high_value - low_value) * (position - lower)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def percentiles(self, points: Sequence[int] = (10, 25, 50, 75, 90)) -> Dict[int, float]:
+        return {point: self.quantile(point / 100) for point in points}
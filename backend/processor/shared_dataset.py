@@ -0,0 +1,537 @@
+"""
+멀티 워커 공유 데이터셋 모듈
+
+uvicorn/gunicorn 워커들이 하나의 mmap 스냅샷을 읽기 전용으로 공유합니다.
+스냅샷은 세대(generation) 단위로 발행되고, 교차 프로세스 버전 스탬프가
+바뀌면 각 워커는 다음 접근 시 새 세대로 원자적으로 전환합니다.
+
+레코드는 워커 메모리에 목록으로 풀지 않고 오프셋으로 접근할 때마다 디코딩합니다.
+file_path → 위치 인덱스(정렬된 해시 표)와 발행 시 계산한 메타데이터(통계 등)도
+스냅샷에 함께 기록되어 워커마다 다시 만들지 않습니다.
+
+레이블 커밋은 새 세대를 발행하지 않고 세대별 델타 로그에 한 줄씩 추가합니다.
+각 워커는 델타를 자기 레코드 목록(변경된 위치만 메모리에 둠)과 파생 인덱스에
+제자리 반영하며, 원본 파일이 커밋 외의 이유로 바뀌면(압축 등) 새 세대를 발행합니다.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Mapping, MutableMapping, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from backend.processor.jsonl_reader import loads
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 스냅샷 헤더: magic, generation, version, count, source size, source mtime_ns, key count, meta size
+# 본문: 오프셋 배열 | 레코드 JSON | (file_path 해시, 위치) 정렬 표 | 메타데이터 JSON
+_HEADER = struct.Struct("<8sQQQQqQQ")
+_MAGIC = b"DJSNAP02"
+_OFFSET = struct.Struct("<Q")
+_KEY = struct.Struct("<QQ")
+# 버전 스탬프: 발행된 세대, 데이터셋 버전 (세대 발행과 델타 추가마다 증가)
+_STAMP = struct.Struct("<QQ")
+_STAMP_SIZE = _STAMP.size
+_KEEP_GENERATIONS = 2
+
+
+def is_supported() -> bool:
+    """공유 데이터셋 사용 가능 여부 (POSIX 전용)"""
+    return fcntl is not None
+
+
+def source_fingerprint(path: Path) -> Tuple[int, int]:
+    """원본 파일 식별값 (크기, 수정시각)"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def path_hash(file_path: str) -> int:
+    """위치 인덱스용 file_path 64비트 해시"""
+    return int.from_bytes(hashlib.blake2b(file_path.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SnapshotPositions(Mapping):
+    """스냅샷에 기록된 file_path → 데이터 위치 인덱스
+
+    해시 표를 이진 탐색하고 후보 레코드의 file_path 를 비교해 충돌을 걸러냅니다.
+    """
+
+    def __init__(self, view: "SnapshotView", start: int, count: int):
+        self._view = view
+        self._start = start
+        self._count = count
+
+    def _entry(self, index: int) -> Tuple[int, int]:
+        return _KEY.unpack_from(self._view._mm, self._start + index * _KEY.size)
+
+    def __getitem__(self, file_path: str) -> int:
+        key = path_hash(file_path)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._count:
+            entry_key, position = self._entry(lo)
+            if entry_key != key:
+                break
+            if self._view[position].get('file_path') == file_path:
+                return position
+            lo += 1
+        raise KeyError(file_path)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._view[self._entry(index)[1]]['file_path']
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SnapshotView(Sequence):
+    """mmap 스냅샷 위의 읽기 전용 레코드 뷰
+
+    인덱스 접근은 접근할 때마다 오프셋 구간만 디코딩하므로 워커가 세대 전체를
+    목록으로 들고 있지 않습니다 (반환된 dict를 수정해도 공유 스냅샷에는 영향이 없음).
+    세대가 바뀌어도 뷰를 참조하는 요청이 남아 있으면 mmap 은 GC 때까지 유지됩니다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, version, count, src_size, src_mtime, keys, meta_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"Invalid snapshot file: {self.path}")
+        self.generation = generation
+        self.version = version
+        self.source = (src_size, src_mtime)
+        self._count = count
+        self._offsets_start = _HEADER.size
+        self._payload_start = self._offsets_start + (count + 1) * _OFFSET.size
+        keys_start = self._payload_start + _OFFSET.unpack_from(self._mm, self._offsets_start + count * _OFFSET.size)[0]
+        self._meta_start = keys_start + keys * _KEY.size
+        self._meta_size = meta_size
+        self._meta: Optional[Dict[str, Any]] = None
+        self._keys_start = keys_start
+        self._keys = keys
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        base = self._offsets_start + index * _OFFSET.size
+        start = _OFFSET.unpack_from(self._mm, base)[0]
+        end = _OFFSET.unpack_from(self._mm, base + _OFFSET.size)[0]
+        return self._payload_start + start, self._payload_start + end
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        start, end = self._bounds(index)
+        return loads(self._mm[start:end])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def positions(self) -> SnapshotPositions:
+        """스냅샷에 기록된 file_path → 위치 인덱스"""
+        return SnapshotPositions(self, self._keys_start, self._keys)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """발행 시 함께 기록한 메타데이터 (처음 접근 때 한 번 디코딩, 수정하지 말 것)"""
+        if self._meta is None:
+            start = self._meta_start
+            self._meta = loads(self._mm[start:start + self._meta_size]) if self._meta_size else {}
+        return self._meta
+
+
+class SharedPositions(MutableMapping):
+    """스냅샷 위치 인덱스 위에 델타로 바뀐 file_path 만 덮어쓴 인덱스"""
+
+    def __init__(self, base: SnapshotPositions):
+        self._base = base
+        # file_path → 위치 (None 이면 삭제됨)
+        self._overlay: Dict[str, Optional[int]] = {}
+        self._count = len(base)
+
+    def __getitem__(self, file_path: str) -> int:
+        if file_path in self._overlay:
+            position = self._overlay[file_path]
+            if position is None:
+                raise KeyError(file_path)
+            return position
+        return self._base[file_path]
+
+    def __setitem__(self, file_path: str, position: int):
+        if file_path not in self:
+            self._count += 1
+        self._overlay[file_path] = position
+
+    def __delitem__(self, file_path: str):
+        if file_path not in self:
+            raise KeyError(file_path)
+        self._overlay[file_path] = None
+        self._count -= 1
+
+    def __iter__(self) -> Iterator[str]:
+        for file_path, position in self._overlay.items():
+            if position is not None:
+                yield file_path
+        for file_path in self._base:
+            if file_path not in self._overlay:
+                yield file_path
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SharedRecords(Sequence):
+    """스냅샷 뷰 위에 델타를 덮어쓴 워커별 레코드 목록
+
+    커밋으로 바뀐 위치의 레코드만 메모리에 두고 나머지는 스냅샷에서 읽습니다.
+    list 와 같은 위치 연산(대입, append, pop)을 지원해 제자리 갱신 코드를 그대로 씁니다.
+    """
+
+    def __init__(self, view: SnapshotView):
+        self.view = view
+        self.positions = SharedPositions(view.positions)
+        # 반영한 델타까지의 버전, 원본 파일 식별값, 델타 로그 읽기 위치
+        self.version = view.version
+        self.source = view.source
+        self.delta_offset = 0
+        self._overlay: Dict[int, Dict] = {}
+        self._count = len(view)
+
+    @property
+    def modified(self) -> bool:
+        """스냅샷 이후 델타가 반영되었는지"""
+        return self.version != self.view.version
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("shared records index out of range")
+        record = self._overlay.get(index)
+        return record if record is not None else self.view[index]
+
+    def __setitem__(self, index: int, record: Dict):
+        if not 0 <= index < self._count:
+            raise IndexError("shared records index out of range")
+        self._overlay[index] = record
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._count):
+            yield self[i]
+
+    def append(self, record: Dict):
+        self._overlay[self._count] = record
+        self._count += 1
+
+    def pop(self) -> Dict:
+        record = self[self._count - 1]
+        self._count -= 1
+        self._overlay.pop(self._count, None)
+        return record
+
+
+class SharedDataset:
+    """세대 단위로 발행되는 교차 프로세스 공유 데이터셋"""
+
+    def __init__(
+        self,
+        shared_dir: Path,
+        name: str = "gt",
+        summarize: Optional[Callable[[List[Dict]], Dict[str, Any]]] = None
+    ):
+        self.shared_dir = Path(shared_dir)
+        self.name = name
+        # 발행하는 워커가 한 번 계산해 스냅샷에 기록할 메타데이터 (JSON 직렬화 가능해야 함)
+        self._summarize = summarize
+        self.shared_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.shared_dir / f"{name}.lock"
+        self._stamp_path = self.shared_dir / f"{name}.stamp"
+        self._stamp = self._open_stamp()
+        self._records: Optional[SharedRecords] = None
+        # 같은 프로세스 안에서는 교차 프로세스 잠금을 다시 잡을 수 있음 (flock 은 fd 단위)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+    def _open_stamp(self) -> mmap.mmap:
+        """버전 스탬프 파일을 mmap으로 연결"""
+        fd = os.open(self._stamp_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _STAMP_SIZE:
+                os.ftruncate(fd, _STAMP_SIZE)
+            return mmap.mmap(fd, _STAMP_SIZE)
+        finally:
+            os.close(fd)
+
+    def _snapshot_path(self, generation: int) -> Path:
+        return self.shared_dir / f"{self.name}-{generation:010d}.snap"
+
+    def _delta_path(self, generation: int) -> Path:
+        return self.shared_dir / f"{self.name}-{generation:010d}.delta"
+
+    def _read_stamp(self) -> Tuple[int, int]:
+        return _STAMP.unpack_from(self._stamp, 0)
+
+    def _write_stamp(self, generation: int, version: int):
+        # 버전을 먼저 올려 세대만 바뀐 상태가 보이지 않도록 함
+        struct.pack_into("<Q", self._stamp, 8, version)
+        struct.pack_into("<Q", self._stamp, 0, generation)
+        self._stamp.flush()
+
+    @property
+    def generation(self) -> int:
+        """현재 발행된 세대 번호 (0이면 미발행)"""
+        return self._read_stamp()[0]
+
+    @property
+    def version(self) -> int:
+        """이 워커가 반영한 데이터셋 버전 (0이면 미연결)"""
+        records = self._records
+        return records.version if records is not None else 0
+
+    @property
+    def records(self) -> Optional[SharedRecords]:
+        """이미 연결된 레코드 목록 (연결·파싱하지 않음)"""
+        return self._records
+
+    def attach(self) -> Optional[SharedRecords]:
+        """현재 세대 스냅샷에 연결 (세대가 바뀌었으면 교체, 델타는 반영하지 않음)"""
+        generation = self.generation
+        if generation == 0:
+            return None
+        records = self._records
+        if records is not None and records.view.generation == generation:
+            return records
+
+        try:
+            view = SnapshotView(self._snapshot_path(generation))
+        except FileNotFoundError:
+            logger.warning(f"Snapshot generation {generation} missing in {self.shared_dir}")
+            return records
+        except (ValueError, struct.error) as e:
+            # 이전 형식이거나 손상된 스냅샷은 새 세대로 다시 발행
+            logger.warning(f"Ignoring snapshot generation {generation}: {e}")
+            return None
+
+        # 참조 교체는 단일 대입이므로 진행 중인 요청은 이전 목록을 계속 읽음
+        # (이전 mmap 은 마지막 참조가 사라질 때 닫힘)
+        new_records = SharedRecords(view)
+        self._records = new_records
+        logger.info(f"Attached shared dataset generation {generation} ({len(view)} items)")
+        return new_records
+
+    def sync(self, apply: Callable[[SharedRecords, int, int, List[Dict], List[str]], None]) -> Optional[SharedRecords]:
+        """현재 세대에 연결하고 아직 반영하지 않은 델타를 apply 로 제자리 반영
+
+        apply(records, version, new_version, records_added, removed) 는 호출자가
+        파생 인덱스와 함께 갱신하며, 호출자가 동시 호출을 직렬화해야 합니다.
+        """
+        records = self.attach()
+        if records is None:
+            return None
+        published = self._read_stamp()[1]
+        if records.version >= published:
+            return records
+
+        try:
+            with open(self._delta_path(records.view.generation), "rb") as f:
+                f.seek(records.delta_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return records
+
+        offset = records.delta_offset
+        # 기록 중인 마지막 줄은 다음 동기화 때 읽음
+        for line in chunk[:chunk.rfind(b"\n") + 1].splitlines(keepends=True):
+            batch = loads(line)
+            if batch["version"] > published:
+                break
+            offset += len(line)
+            if batch["version"] <= records.version:
+                continue
+            apply(records, records.version, batch["version"], batch["records"], batch["removed"])
+            records.version = batch["version"]
+            records.source = tuple(batch["source"])
+        records.delta_offset = offset
+        return records
+
+    def is_current(self, source_path: Path) -> bool:
+        """연결된 목록이 최신 세대·버전이고 원본과 일치하는지 (파싱 없이 확인)"""
+        records = self._records
+        if records is None:
+            return False
+        generation, version = self._read_stamp()
+        return (
+            records.view.generation == generation
+            and records.version >= version
+            and records.source == source_fingerprint(source_path)
+        )
+
+    @contextmanager
+    def locked(self):
+        """세대 발행·델타 추가용 교차 프로세스 배타 잠금 (같은 스레드는 재진입 가능)"""
+        with self._thread_lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self._lock_path, "a+") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _publish_locked(self, records: Iterable[Dict], source: Tuple[int, int]) -> int:
+        stamp_generation, stamp_version = self._read_stamp()
+        generation = stamp_generation + 1
+        version = stamp_version + 1
+        self._write_snapshot(self._snapshot_path(generation), generation, version, records, source)
+
+        # 스냅샷이 완전히 기록된 뒤에 스탬프를 갱신
+        self._write_stamp(generation, version)
+        self._cleanup(generation)
+        logger.info(f"Published shared dataset generation {generation} (version {version})")
+        return generation
+
+    def publish(self, records: Iterable[Dict], source: Tuple[int, int] = (0, 0)) -> int:
+        """새 세대 스냅샷을 기록하고 버전 스탬프를 올림"""
+        with self.locked():
+            return self._publish_locked(records, source)
+
+    def append_delta(self, records: List[Dict], removed: List[str], source: Tuple[int, int]) -> int:
+        """현재 세대에 커밋 델타를 추가하고 버전을 올림 (locked() 안에서, 최신 버전까지 반영한 뒤 호출)"""
+        generation, version = self._read_stamp()
+        current = self._records
+        if generation == 0 or current is None or current.view.generation != generation or current.version != version:
+            raise RuntimeError("Shared dataset must be synced under the lock before appending a delta")
+
+        version += 1
+        line = json.dumps(
+            {"version": version, "records": records, "removed": removed, "source": list(source)},
+            ensure_ascii=False
+        ).encode("utf-8") + b"\n"
+        fd = os.open(self._delta_path(generation), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(line)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        # 델타가 완전히 기록된 뒤에 스탬프를 갱신
+        self._write_stamp(generation, version)
+        return version
+
+    def ensure(
+        self,
+        source_path: Path,
+        loader: Callable[[], Iterable[Dict]],
+        apply: Callable[[SharedRecords, int, int, List[Dict], List[str]], None]
+    ) -> Optional[SharedRecords]:
+        """원본과 일치하는 스냅샷이 없으면 한 워커만 생성하고 나머지는 연결 (델타는 제자리 반영)"""
+        fingerprint = source_fingerprint(source_path)
+        records = self.sync(apply)
+        if records is not None and records.source == fingerprint:
+            return records
+
+        with self.locked():
+            # 잠금을 기다리는 동안 다른 워커가 발행했거나 델타를 추가했을 수 있음
+            records = self.sync(apply)
+            if records is not None and records.source == fingerprint:
+                return records
+            self._publish_locked(loader(), fingerprint)
+
+        return self.sync(apply)
+
+    def _write_snapshot(
+        self,
+        path: Path,
+        generation: int,
+        version: int,
+        records: Iterable[Dict],
+        source: Tuple[int, int]
+    ):
+        """임시 파일에 기록 후 rename으로 원자적 교체"""
+        records = records if isinstance(records, list) else list(records)
+        payload = bytearray()
+        offsets: List[int] = [0]
+        keys: List[Tuple[int, int]] = []
+        for position, record in enumerate(records):
+            payload += json.dumps(record, ensure_ascii=False).encode("utf-8")
+            offsets.append(len(payload))
+            if record.get('file_path'):
+                keys.append((path_hash(record['file_path']), position))
+        keys.sort()
+        count = len(offsets) - 1
+        meta = self._summarize(records) if self._summarize is not None else {}
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(
+                _MAGIC, generation, version, count, source[0], source[1], len(keys), len(meta_bytes)
+            ))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            f.write(payload)
+            f.write(b"".join(_KEY.pack(key, position) for key, position in keys))
+            f.write(meta_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _cleanup(self, current: int):
+        """오래된 세대와 델타 로그 삭제 (이미 mmap한 워커는 계속 읽을 수 있음)"""
+        for pattern in (f"{self.name}-*.snap", f"{self.name}-*.delta"):
+            for path in self.shared_dir.glob(pattern):
+                try:
+                    generation = int(path.stem.rsplit("-", 1)[1])
+                except ValueError:
+                    continue
+                if generation <= current - _KEEP_GENERATIONS:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
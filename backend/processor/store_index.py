@@ -0,0 +1,150 @@
+"""
+매장 단위 그룹 인덱스
+
+파일명의 매장 ID로 이미지를 묶고, 매장별 집계(최악 단차, 가장 좁은 통로,
+의자 유무, 종합 점수)를 이미지 추가·삭제 시 카운터만 갱신하여 유지합니다.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.processor.data_cube import CHAIR_KEYS, CHAIR_TYPES
+from backend.processor.image_name import parse_image_name
+
+# 좁은 순서
+WIDTH_ORDER = ("not_passable", "narrow", "normal", "wide")
+
+
+class _StoreAggregate:
+    """매장 하나의 집계 카운터"""
+
+    __slots__ = ("members", "step_count", "width_counts", "chair_counts", "score_sum")
+
+    def __init__(self):
+        self.members: Dict[Any, Dict] = {}
+        self.step_count = 0
+        self.width_counts = [0] * len(WIDTH_ORDER)
+        self.chair_counts = [0] * len(CHAIR_KEYS)
+        self.score_sum = 0
+
+    def apply(self, item: Dict, score: int, sign: int):
+        if item.get('has_step', False):
+            self.step_count += sign
+        width_classes = item.get('width_class', [])
+        for i, width in enumerate(WIDTH_ORDER):
+            if width in width_classes:
+                self.width_counts[i] += sign
+        chair = item.get('chair', {})
+        for i, key in enumerate(CHAIR_KEYS):
+            if chair.get(key):
+                self.chair_counts[i] += sign
+        self.score_sum += sign * score
+
+
+class StoreIndex:
+    """매장 ID → 이미지 위치 및 매장 집계"""
+
+    def __init__(self, score_func: Callable[[Dict], Dict]):
+        # score_func(item) -> {"score", "grade"} (DataManager.calculate_accessibility_score)
+        self._score_func = score_func
+        self._stores: Dict[str, _StoreAggregate] = {}
+        self.unmatched = 0
+
+    def clear(self):
+        self._stores = {}
+        self.unmatched = 0
+
+    def build(self, items, key_func: Optional[Callable[[int, Dict], Any]] = None):
+        """전체 재구성 (키 기본값은 목록 내 위치)"""
+        self.clear()
+        for position, item in enumerate(items):
+            self.add(key_func(position, item) if key_func else position, item)
+
+    def add(self, key: Any, item: Dict):
+        parsed = parse_image_name(item.get('file_path', ''))
+        if parsed is None:
+            self.unmatched += 1
+            return
+        store = self._stores.get(parsed['store_id'])
+        if store is None:
+            store = self._stores[parsed['store_id']] = _StoreAggregate()
+        if key in store.members:
+            self._remove_from(store, key)
+        store.members[key] = item
+        store.apply(item, self._score_func(item)['score'], 1)
+
+    def remove(self, key: Any, item: Dict):
+        parsed = parse_image_name(item.get('file_path', ''))
+        if parsed is None:
+            self.unmatched -= 1
+            return
+        store = self._stores.get(parsed['store_id'])
+        if store is None or key not in store.members:
+            return
+        self._remove_from(store, key)
+        if not store.members:
+            del self._stores[parsed['store_id']]
+
+    def update(self, key: Any, old_item: Optional[Dict], new_item: Dict):
+        """이미지 레이블 변경 반영"""
+        if old_item is not None:
+            self.remove(key, old_item)
+        self.add(key, new_item)
+
+    def _remove_from(self, store: _StoreAggregate, key: Any):
+        old_item = store.members.pop(key)
+        store.apply(old_item, self._score_func(old_item)['score'], -1)
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def __contains__(self, store_id: str) -> bool:
+        return store_id in self._stores
+
+    def members(self, store_id: str) -> Dict[Any, Dict]:
+        """매장의 이미지 (키 → 레코드)"""
+        store = self._stores.get(store_id)
+        return dict(store.members) if store is not None else {}
+
+    def summary(self, store_id: str) -> Optional[Dict]:
+        """매장 집계 (이미지 수와 무관하게 카운터에서 계산)"""
+        store = self._stores.get(store_id)
+        if store is None:
+            return None
+
+        image_count = len(store.members)
+        narrowest = next(
+            (width for width, count in zip(WIDTH_ORDER, store.width_counts) if count > 0),
+            None
+        )
+        chair = {key: count > 0 for key, count in zip(CHAIR_KEYS, store.chair_counts)}
+
+        # 매장 전체를 하나의 이미지로 보고 최악 조건으로 점수 계산
+        combined = self._score_func({
+            "has_step": store.step_count > 0,
+            "width_class": [narrowest] if narrowest else [],
+            "chair": chair
+        })
+
+        return {
+            "store_id": store_id,
+            "image_count": image_count,
+            "has_step": store.step_count > 0,
+            "step_image_count": store.step_count,
+            "narrowest_width": narrowest,
+            "chair_types": {
+                chair_type: count for chair_type, count in zip(CHAIR_TYPES, store.chair_counts)
+            },
+            "combined_score": combined['score'],
+            "combined_grade": combined['grade'],
+            "average_score": round(store.score_sum / image_count, 1) if image_count else 0.0
+        }
+
+    def summaries(self, sort: str = "store_id") -> List[Dict]:
+        """전체 매장 집계 목록"""
+        items = [self.summary(store_id) for store_id in self._stores]
+        if sort == "score":
+            items.sort(key=lambda s: (s['combined_score'], s['store_id']))
+        elif sort == "images":
+            items.sort(key=lambda s: (-s['image_count'], s['store_id']))
+        else:
+            items.sort(key=lambda s: s['store_id'])
+        return items
@@ -0,0 +1,166 @@
+"""
+촬영 시각 정렬 인덱스
+
+파일명에서 파싱한 촬영 시각을 정렬된 배열로, 데이터 위치를 순열 배열로
+보관합니다. 기간 조회와 시간순 페이지네이션은 이진 탐색으로 범위를 찾고
+필요한 구간만 읽으며, 기간별 추이 집계도 해당 구간만 순회합니다.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.processor.data_cube import GRADES
+from backend.processor.image_name import parse_image_name
+
+BUCKETS = ("day", "week", "month")
+
+
+def as_datetime(value, end: bool = False) -> Optional[datetime]:
+    """조회 경계를 파일명 시각과 비교 가능한 값으로 변환
+
+    파일명 시각은 시간대 정보가 없으므로 시간대를 제거하고,
+    날짜만 주어지면 시작은 그날 0시, 끝은 그날 마지막 시각으로 봅니다.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time.max if end else time.min)
+    if value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def bucket_start(value: datetime, bucket: str) -> date:
+    day = value.date()
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+
+class CaptureTimeIndex:
+    """촬영 시각 오름차순 인덱스"""
+
+    def __init__(self, score_func: Callable[[Dict], Dict]):
+        # score_func(item) -> {"score", "grade"} (DataManager.calculate_accessibility_score)
+        self._score_func = score_func
+        self.times: List[datetime] = []
+        self.positions: List[int] = []
+        self._scores: List[int] = []
+        self._grades: List[str] = []
+        self._has_step: List[bool] = []
+
+    def build(self, data: Sequence[Dict]):
+        """데이터 목록에서 인덱스 구성 (파일명에 시각이 없는 항목은 제외)"""
+        entries = []
+        for position, item in enumerate(data):
+            parsed = parse_image_name(item.get('file_path', ''))
+            if parsed is not None:
+                entries.append((parsed['captured_at'], position, item))
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+        self.times = [captured_at for captured_at, _, _ in entries]
+        self.positions = [position for _, position, _ in entries]
+        scores = [self._score_func(item) for _, _, item in entries]
+        self._scores = [score['score'] for score in scores]
+        self._grades = [score['grade'] for score in scores]
+        self._has_step = [bool(item.get('has_step', False)) for _, _, item in entries]
+
+    def update(self, position: int, old_item: Optional[Dict], item: Optional[Dict]):
+        """데이터 위치의 레코드 추가·변경·삭제 반영 (정렬 위치는 이진 탐색으로 찾음)"""
+        if old_item is not None:
+            self._remove(position, old_item)
+        if item is None:
+            return
+        parsed = parse_image_name(item.get('file_path', ''))
+        if parsed is None:
+            return
+        captured_at = parsed['captured_at']
+        # 같은 시각 안에서는 데이터 위치 오름차순
+        i = bisect_left(
+            self.positions, position,
+            bisect_left(self.times, captured_at), bisect_right(self.times, captured_at)
+        )
+        score = self._score_func(item)
+        self.times.insert(i, captured_at)
+        self.positions.insert(i, position)
+        self._scores.insert(i, score['score'])
+        self._grades.insert(i, score['grade'])
+        self._has_step.insert(i, bool(item.get('has_step', False)))
+
+    def _remove(self, position: int, item: Dict):
+        parsed = parse_image_name(item.get('file_path', ''))
+        if parsed is None:
+            return
+        captured_at = parsed['captured_at']
+        hi = bisect_right(self.times, captured_at)
+        i = bisect_left(self.positions, position, bisect_left(self.times, captured_at), hi)
+        if i < hi and self.positions[i] == position:
+            for values in (self.times, self.positions, self._scores, self._grades, self._has_step):
+                del values[i]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def bounds(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, int]:
+        """[start, end] 기간의 정렬 배열 구간 (이진 탐색)"""
+        start, end = as_datetime(start), as_datetime(end, end=True)
+        lo = bisect_left(self.times, start) if start is not None else 0
+        hi = bisect_right(self.times, end) if end is not None else len(self.times)
+        return lo, max(lo, hi)
+
+    def page(self, lo: int, hi: int, skip: int, limit: int, descending: bool = False) -> List[int]:
+        """구간 안에서 skip/limit 에 해당하는 데이터 위치"""
+        if descending:
+            stop = max(lo, hi - skip)
+            begin = max(lo, stop - limit)
+            return self.positions[begin:stop][::-1]
+        begin = min(hi, lo + skip)
+        return self.positions[begin:min(hi, begin + limit)]
+
+    def iter_range(self, lo: int, hi: int, descending: bool = False) -> Iterator[int]:
+        indices = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        for i in indices:
+            yield self.positions[i]
+
+    def rollup(
+        self,
+        bucket: str = "month",
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> List[Dict]:
+        """기간별 접근성 추이 (해당 구간만 순회)"""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        lo, hi = self.bounds(start, end)
+
+        buckets: Dict[date, Dict] = {}
+        for i in range(lo, hi):
+            key = bucket_start(self.times[i], bucket)
+            entry = buckets.get(key)
+            if entry is None:
+                entry = buckets[key] = {
+                    "count": 0,
+                    "has_step": 0,
+                    "score_sum": 0,
+                    "grade_distribution": {grade: 0 for grade in GRADES}
+                }
+            entry["count"] += 1
+            entry["has_step"] += self._has_step[i]
+            entry["score_sum"] += self._scores[i]
+            entry["grade_distribution"][self._grades[i]] += 1
+
+        # 구간이 시각순이므로 버킷도 시각순으로 생성됨
+        return [
+            {
+                "bucket": key.isoformat(),
+                "count": entry["count"],
+                "step_free_rate": round((entry["count"] - entry["has_step"]) / entry["count"] * 100, 1),
+                "average_score": round(entry["score_sum"] / entry["count"], 1),
+                "grade_distribution": entry["grade_distribution"]
+            }
+            for key, entry in buckets.items()
+        ]
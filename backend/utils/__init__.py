@@ -3,7 +3,7 @@
 """
 
 from .config import settings
-from .logger import setup_logger
+from .logger import setup_logger, configure_logging, request_id_var
 
-__all__ = ["settings", "setup_logger"]
+__all__ = ["settings", "setup_logger", "configure_logging", "request_id_var"]
 
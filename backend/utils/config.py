@@ -13,7 +13,29 @@ class Settings:
     GT_JSONL_PATH = BASE_DIR / "data" / "gt" / "gt.jsonl"
     IMG_GT_PATH = BASE_DIR / "data" / "gt" / "img_gt"
     
+    # Multi-Worker Shared Dataset (비어 있으면 워커별 캐시 사용)
+    SHARED_DATASET_DIR = Path(os.environ["SHARED_DATASET_DIR"]) if os.getenv("SHARED_DATASET_DIR") else None
+    
+    # Partitioned GT (*.jsonl 샤드 디렉터리, 비어 있으면 GT_JSONL_PATH 단일 파일 사용)
+    GT_SHARD_DIR = Path(os.environ["GT_SHARD_DIR"]) if os.getenv("GT_SHARD_DIR") else None
+    GT_SHARD_WORKERS = int(os.getenv("GT_SHARD_WORKERS", "0")) or None  # 0이면 기본 스레드 수
+    
+    # JSONL Parsing (큰 GT·분석 결과 파일은 청크로 나눠 프로세스 풀에서 파싱)
+    JSONL_PARSE_WORKERS = int(os.getenv("JSONL_PARSE_WORKERS", "0")) or None  # 0이면 CPU 수, 1이면 단일 프로세스
+    JSONL_PARALLEL_MIN_BYTES = int(os.getenv("JSONL_PARALLEL_MIN_BYTES", str(64 * 1024 * 1024)))
+    
+    # /api/images 응답 캐시 (쿼리 + 데이터셋 버전 키, LRU)
+    IMAGE_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "512"))  # 0이면 끔
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    IMAGE_CACHE_PREWARM = os.getenv("IMAGE_CACHE_PREWARM", "true").lower() == "true"
+    
+    # 블로킹 I/O 스레드 풀 (콜드 로드, 파일 목록, 로그 기록을 이벤트 루프 밖에서 실행)
+    BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+    
     # API Server Configuration
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "0"))  # 0이면 성공할 때까지 재시도
+    WARMUP_RETRY_BACKOFF = float(os.getenv("WARMUP_RETRY_BACKOFF", "1.0"))  # 초, 시도마다 2배 (최대 60초)
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
     CORS_ORIGINS = [
@@ -23,6 +45,53 @@ class Settings:
         "http://localhost:8001",
         "http://127.0.0.1:8001"
     ]
+    
+    # GPT Vision Analysis
+    GPT_PACK_SIZE = int(os.getenv("GPT_PACK_SIZE", "1"))  # 1이면 이미지별 단건 요청
+    GPT_INPUT_PRICE_PER_1K = float(os.getenv("GPT_INPUT_PRICE_PER_1K", "0.0025"))
+    GPT_OUTPUT_PRICE_PER_1K = float(os.getenv("GPT_OUTPUT_PRICE_PER_1K", "0.01"))
+    ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+    
+    # GPT Admission Control (프로세스 공용 속도 제한, 공정 큐, 일일 비용 한도)
+    GPT_RPM = float(os.getenv("GPT_RPM", "500"))
+    GPT_TPM = float(os.getenv("GPT_TPM", "30000"))
+    GPT_BURST_SECONDS = float(os.getenv("GPT_BURST_SECONDS", "1.0"))
+    GPT_TOKENS_PER_IMAGE = int(os.getenv("GPT_TOKENS_PER_IMAGE", "800"))  # 요청 토큰 추정용
+    GPT_DAILY_BUDGET_USD = float(os.getenv("GPT_DAILY_BUDGET_USD", "0"))  # 0이면 제한 없음
+    ANALYSIS_QUEUE_MAX = int(os.getenv("ANALYSIS_QUEUE_MAX", "500"))
+    ANALYSIS_QUEUE_MAX_PER_CLIENT = int(os.getenv("ANALYSIS_QUEUE_MAX_PER_CLIENT", "100"))
+    
+    # Upload Configuration
+    UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+    UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(1024 * 1024 * 1024)))
+    
+    # JSONL Result Writer (그룹 커밋)
+    WRITER_MAX_BATCH_LINES = int(os.getenv("WRITER_MAX_BATCH_LINES", "512"))
+    WRITER_MAX_DELAY_MS = float(os.getenv("WRITER_MAX_DELAY_MS", "20"))
+    WRITER_FSYNC = os.getenv("WRITER_FSYNC", "always")  # always | interval | never
+    WRITER_FSYNC_INTERVAL = float(os.getenv("WRITER_FSYNC_INTERVAL", "1.0"))
+    WRITER_ROTATE_BYTES = int(os.getenv("WRITER_ROTATE_BYTES", str(256 * 1024 * 1024)))  # 0이면 교체 안 함
+    
+    # Prediction Store (file_path 별 최신 분석 결과, 로그 압축)
+    PREDICTION_HISTORY = int(os.getenv("PREDICTION_HISTORY", "3"))  # 0이면 최신 결과만
+    PREDICTION_COMPACT_INTERVAL = float(os.getenv("PREDICTION_COMPACT_INTERVAL", "3600"))  # 0이면 끔
+    PREDICTION_COMPACT_MIN_BYTES = int(os.getenv("PREDICTION_COMPACT_MIN_BYTES", str(64 * 1024 * 1024)))
+    
+    # Perceptual Hash Index (유사 이미지 탐지)
+    PHASH_CACHE_PATH = BASE_DIR / ".cache" / "phash_index.json"
+    PHASH_RADIUS = int(os.getenv("PHASH_RADIUS", "6"))
+    PHASH_REUSE_LABELS = os.getenv("PHASH_REUSE_LABELS", "true").lower() == "true"
+    
+    # Image Ingestion (이미지 스캔 매니페스트)
+    INGEST_MANIFEST_PATH = BASE_DIR / ".cache" / "ingest_manifest.json"
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or None  # 0이면 CPU 수
+    
+    # Logging Configuration
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # 로거별 샘플링 비율 ("logger=rate,..."), 이미지별 분석 로그 등 빈번한 경로용
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "backend.api.analysis=0.1")
 
 
 settings = Settings()
@@ -1,27 +1,180 @@
 """
 로깅 설정
+
+핸들러는 서버 시작 시 configure_logging() 으로 프로세스당 한 번만 구성합니다.
+모듈을 가져오기만 해서는 루트 로거를 바꾸지 않으므로 스크립트·테스트나 다른
+라이브러리의 로그 설정은 그대로 유지됩니다. 구성 후 호출 스레드는 레코드를
+큐에 넣기만 하고, 포맷팅과 콘솔 출력은 백그라운드 리스너 스레드가 담당합니다.
 """
+import atexit
+import copy
+import json
 import logging
-from pathlib import Path
-
-
-def setup_logger(name: str) -> logging.Logger:
-    """로거 설정"""
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # 콘솔 핸들러
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # 포맷터
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
-    return logger
+import logging.handlers
+import queue
+import random
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from backend.utils.config import settings
+
+# 요청 ID (요청 미들웨어에서 설정)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# LogRecord 기본 속성 (extra 필드 구분용)
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_sample_rates: Dict[str, float] = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """구조화된 JSON 한 줄 포맷터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+
+        # extra={"duration_ms": ...} 등으로 전달된 필드
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key != "request_id":
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """호출 스레드에서 요청 ID를 레코드에 기록"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """로거별 샘플링 (WARNING 이상은 항상 통과)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not _sample_rates:
+            return True
+        rate = _sample_rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 대기하지 않고 레코드를 버리는 큐 핸들러"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 포맷팅은 리스너 스레드에서 수행
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _sample_rate_for(name: str) -> float:
+    """가장 구체적인 로거 이름 기준 샘플링 비율"""
+    while name:
+        if name in _sample_rates:
+            return _sample_rates[name]
+        name = name.rpartition(".")[0]
+    return 1.0
+
+
+def _parse_sampling(spec: str) -> Dict[str, float]:
+    """'logger=rate,logger=rate' 형식 파싱"""
+    rates = {}
+    for part in spec.split(","):
+        name, sep, rate = part.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+def set_sample_rate(name: str, rate: float):
+    """특정 로거(및 하위 로거)의 샘플링 비율 설정"""
+    _sample_rates[name] = max(0.0, min(1.0, rate))
+
+
+def configure_logging():
+    """루트 로거에 큐 핸들러 구성 (여러 번 호출해도 한 번만 적용)"""
+    global _listener, _queue_handler
+
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        if settings.LOG_FORMAT == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        _queue_handler.addFilter(RequestContextFilter())
+        _queue_handler.addFilter(SamplingFilter())
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL)
+        root.addHandler(_queue_handler)
+
+        _sample_rates.update(_parse_sampling(settings.LOG_SAMPLING))
+
+        _listener = logging.handlers.QueueListener(
+            _queue_handler.queue, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _queue_handler = None
+
+
+def dropped_records() -> int:
+    """큐 포화로 버려진 로그 수"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
 
+def setup_logger(name: str, sample_rate: Optional[float] = None) -> logging.Logger:
+    """로거 조회 (핸들러 구성은 configure_logging() 에서)"""
+    if sample_rate is not None:
+        set_sample_rate(name, sample_rate)
+    return logging.getLogger(name)
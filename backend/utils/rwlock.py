@@ -0,0 +1,72 @@
+"""
+읽기/쓰기 잠금
+
+조회(목록 필터링, 큐브·인덱스 읽기)는 여러 스레드가 함께 하고, 레이블 커밋의
+제자리 갱신은 읽는 스레드가 없을 때 혼자 하도록 합니다. 쓰기가 기다리는 동안
+새 읽기는 기다리므로 조회가 몰려도 커밋이 밀리지 않으며, 같은 스레드의 중첩
+읽기와 쓰기 중의 읽기는 그대로 허용합니다.
+"""
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """여러 읽기 또는 하나의 쓰기 (쓰기 우선)"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    def reading_here(self) -> bool:
+        """현재 스레드가 읽기 잠금을 잡고 있는지"""
+        return getattr(self._local, "depth", 0) > 0
+
+    def writing_here(self) -> bool:
+        """현재 스레드가 쓰기 잠금을 잡고 있는지"""
+        return self._writer == threading.get_ident()
+
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, "depth", 0)
+        outer = depth == 0 and not self.writing_here()
+        if outer:
+            with self._cond:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if outer:
+                with self._cond:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        if self.writing_here():
+            yield
+            return
+        if self.reading_here():
+            # 읽기에서 쓰기로 올리면 다른 읽기와 서로 기다리게 됨
+            raise RuntimeError("Cannot acquire write lock while holding a read lock")
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
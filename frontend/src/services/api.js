@@ -329,6 +329,19 @@ export const api = {
     return response.data;
   },
 
+  // 이미지 상세 일괄 조회 (갤러리·모달 이동용 미리 가져오기)
+  getImageDetails: async (filePaths) => {
+    if (isGitHubPages) {
+      const items = await Promise.all(filePaths.map(filePath => api.getImageDetail(filePath)));
+      return {
+        items: items.filter(Boolean),
+        missing: filePaths.filter((_, index) => !items[index])
+      };
+    }
+    const response = await axios.post(`${API_BASE_URL}/images/details`, { file_paths: filePaths });
+    return response.data;
+  },
+
   // 배치 목록 조회
   getBatches: async () => {
     if (isGitHubPages) {
@@ -656,6 +669,51 @@ export const api = {
       throw error;
     }
   },
+
+  // GPT Vision API로 이미지 분석 (SSE 스트리밍, 이미지별 결과를 완료 즉시 onEvent로 전달)
+  // onEvent(eventName, data): 'start' | 'result' | 'error' | 'done'
+  analyzeImagesStream: async (imagePaths, onEvent) => {
+    const response = await fetch(`${API_BASE_URL}/analyze/images/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ image_paths: imagePaths })
+    });
+
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}));
+      throw new Error(body.detail || `이미지 분석 실패: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // 이벤트는 빈 줄로 구분됨
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventName = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event: ')) eventName = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        const payload = data ? JSON.parse(data) : null;
+        if (eventName === 'done') summary = payload;
+        onEvent?.(eventName, payload);
+      }
+    }
+
+    return summary;
+  },
 };
 
 // 이미지 URL 생성
@@ -4,41 +4,61 @@
 
 gt.jsonl 데이터를 분석하여 현재 가중치의 적절성을 평가하고,
 이동약자 관점에서 개선된 가중치를 제안합니다.
+
+--stream 을 지정하면 파일을 한 줄씩 한 번만 읽으면서 모든 집계와 시나리오별
+점수 분포를 함께 갱신하므로 메모리 사용량이 파일 크기와 무관합니다.
+--workers 를 2 이상으로 주면 줄 경계에 맞춘 청크를 프로세스별로 집계한 뒤 합칩니다.
 """
 
-import json
+import argparse
+import os
 import sys
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import statistics
 
 # 프로젝트 루트 경로
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 GT_JSONL_PATH = PROJECT_ROOT / "frontend" / "public" / "gt.jsonl"
 
+from backend.processor import jsonl_reader
+from backend.processor.jsonl_reader import chunk_ranges, read_jsonl
+from backend.processor.score_sketch import ScoreSketch
+from backend.utils.logger import configure_logging
+
+SCENARIOS = ['conservative', 'realistic', 'strict']
+GRADES = ['S', 'A', 'B', 'C', 'D']
+
 
-def load_gt_data() -> List[Dict]:
-    """gt.jsonl 파일 로드"""
-    data = []
-    if not GT_JSONL_PATH.exists():
-        print(f"❌ 파일을 찾을 수 없습니다: {GT_JSONL_PATH}")
-        return data
+def load_gt_data(path: Path = GT_JSONL_PATH) -> List[Dict]:
+    """gt.jsonl 파일 로드 (큰 파일은 청크 병렬 파싱)"""
+    if not path.exists():
+        print(f"❌ 파일을 찾을 수 없습니다: {path}")
+        return []
     
-    with open(GT_JSONL_PATH, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                item = json.loads(line)
-                data.append(item)
-            except json.JSONDecodeError as e:
-                print(f"⚠️  라인 {line_num} JSON 파싱 오류: {e}")
+    def on_error(line_num: int, message: str):
+        print(f"⚠️  라인 {line_num} JSON 파싱 오류: {message}")
     
+    data, _, _ = read_jsonl(path, on_error=on_error)
     return data
 
 
+def iter_gt_lines(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """start~end 바이트 구간의 줄을 하나씩 생성 (빈 줄 포함, 구간은 줄 경계에 맞춰야 함)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while end is None or position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+
 def calculate_current_score(item: Dict) -> Tuple[int, str]:
     """현재 가중치로 점수 계산 (Frontend 로직과 동일)"""
     score = 100
@@ -229,10 +249,9 @@ def analyze_data(data: List[Dict]) -> Dict:
 
 def compare_scenarios(data: List[Dict]) -> Dict:
     """여러 시나리오 비교"""
-    scenarios = ['conservative', 'realistic', 'strict']
     results = {}
     
-    for scenario in scenarios:
+    for scenario in SCENARIOS:
         scores = []
         grades = {'S': 0, 'A': 0, 'B': 0, 'C': 0, 'D': 0}
         
@@ -250,6 +269,147 @@ def compare_scenarios(data: List[Dict]) -> Dict:
     return results
 
 
+class StreamingReport:
+    """한 번 읽으면서 갱신하는 분석 집계 (점수는 목록 대신 ScoreSketch, merge 로 청크 결과 합산)"""
+    
+    def __init__(self):
+        self.total = 0
+        self.has_step = {'true': 0, 'false': 0}
+        self.width_class = {'wide': 0, 'normal': 0, 'narrow': 0, 'not_passable': 0}
+        self.chair = {'movable': 0, 'high_movable': 0, 'fixed': 0, 'floor': 0}
+        self.combinations = {
+            'step_and_width': Counter(),
+            'step_and_chair': Counter(),
+            'width_and_chair': Counter(),
+            'all_three': Counter()
+        }
+        # 'current' 와 시나리오별 점수 분포·등급 개수
+        self.sketches = {name: ScoreSketch() for name in ['current'] + SCENARIOS}
+        self.grades = {name: dict.fromkeys(GRADES, 0) for name in ['current'] + SCENARIOS}
+    
+    def add(self, item: Dict):
+        """레코드 하나를 모든 집계에 반영 (analyze_data·compare_scenarios 와 같은 규칙)"""
+        self.total += 1
+        self.has_step['true' if item.get('has_step') else 'false'] += 1
+        
+        width_class = item.get('width_class', [])
+        for w in width_class:
+            if w in self.width_class:
+                self.width_class[w] += 1
+        
+        chair = item.get('chair', {})
+        for key, name in (('has_movable_chair', 'movable'), ('has_high_movable_chair', 'high_movable'),
+                          ('has_fixed_chair', 'fixed'), ('has_floor_chair', 'floor')):
+            if chair.get(key):
+                self.chair[name] += 1
+        
+        score, grade = calculate_current_score(item)
+        self.sketches['current'].add(score)
+        self.grades['current'][grade] += 1
+        for scenario in SCENARIOS:
+            score, grade = calculate_proposed_score(item, scenario)
+            self.sketches[scenario].add(score)
+            self.grades[scenario][grade] += 1
+        
+        has_step = 'step' if item.get('has_step') else 'no_step'
+        width_main = width_class[0] if width_class else 'unknown'
+        chair_type = 'movable' if chair.get('has_movable_chair') else \
+                     'fixed' if chair.get('has_fixed_chair') else \
+                     'floor' if chair.get('has_floor_chair') else 'none'
+        
+        self.combinations['step_and_width'][f"{has_step}_{width_main}"] += 1
+        self.combinations['step_and_chair'][f"{has_step}_{chair_type}"] += 1
+        self.combinations['width_and_chair'][f"{width_main}_{chair_type}"] += 1
+        self.combinations['all_three'][f"{has_step}_{width_main}_{chair_type}"] += 1
+    
+    def merge(self, other: "StreamingReport") -> "StreamingReport":
+        """다른 청크의 집계를 더함"""
+        self.total += other.total
+        for mine, theirs in ((self.has_step, other.has_step), (self.width_class, other.width_class), (self.chair, other.chair)):
+            for key, count in theirs.items():
+                mine[key] += count
+        for name, counter in other.combinations.items():
+            self.combinations[name].update(counter)
+        for name, sketch in other.sketches.items():
+            self.sketches[name].merge(sketch)
+            for grade, count in other.grades[name].items():
+                self.grades[name][grade] += count
+        return self
+    
+    def stats(self) -> Dict:
+        """analyze_data() 와 같은 형식 (current_scores 대신 current_percentiles)"""
+        if self.total == 0:
+            return {}
+        current = self.sketches['current']
+        return {
+            'total': self.total,
+            'has_step': dict(self.has_step),
+            'width_class': dict(self.width_class),
+            'chair': dict(self.chair),
+            'current_grades': dict(self.grades['current']),
+            'current_avg_score': current.mean(),
+            'current_median_score': current.median(),
+            'current_percentiles': current.percentiles(),
+            'combinations': {name: dict(counter) for name, counter in self.combinations.items()}
+        }
+    
+    def comparisons(self) -> Dict:
+        """compare_scenarios() 와 같은 형식 (백분위수 추가)"""
+        if self.total == 0:
+            return {}
+        return {
+            scenario: {
+                'avg_score': self.sketches[scenario].mean(),
+                'median_score': self.sketches[scenario].median(),
+                'percentiles': self.sketches[scenario].percentiles(),
+                'grades': dict(self.grades[scenario])
+            }
+            for scenario in SCENARIOS
+        }
+
+
+def _report_range(task: Tuple[str, int, int]) -> Tuple[StreamingReport, List[Tuple[int, str]], int]:
+    """바이트 구간 하나 집계 (프로세스 풀 작업) → (집계, (구간 안 줄 번호, 오류) 목록, 줄 수)"""
+    path, start, end = task
+    report = StreamingReport()
+    errors = []
+    line_count = 0
+    for line_count, line in enumerate(iter_gt_lines(Path(path), start, end), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            report.add(jsonl_reader.loads(line))
+        except ValueError as e:
+            errors.append((line_count, str(e)))
+    return report, errors, line_count
+
+
+def stream_report(path: Path, workers: int = 1, chunk_bytes: Optional[int] = None) -> StreamingReport:
+    """파일을 한 번 읽으며 집계 (workers > 1 이면 청크별 집계 후 병합)
+    
+    청크마다 줄 수를 함께 돌려받아 잘못된 줄은 파일 전체 기준 줄 번호로 보고합니다.
+    """
+    size = os.path.getsize(path)
+    if workers <= 1:
+        chunks = [_report_range((str(path), 0, size))]
+    else:
+        if chunk_bytes is None:
+            chunk_bytes = max(jsonl_reader.MIN_CHUNK_BYTES, -(-size // (workers * 4)))
+        tasks = [(str(path), start, end) for start, end in chunk_ranges(path, 0, size, chunk_bytes)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_report_range, tasks))
+    
+    report = StreamingReport()
+    line_count = 0
+    for chunk, errors, chunk_lines in chunks:
+        for line_num, message in errors:
+            print(f"⚠️  라인 {line_count + line_num} JSON 파싱 오류: {message}")
+        report.merge(chunk)
+        line_count += chunk_lines
+    return report
+
+
 def print_analysis_report(stats: Dict, comparisons: Dict):
     """분석 리포트 출력"""
     print("=" * 80)
@@ -278,6 +438,8 @@ def print_analysis_report(stats: Dict, comparisons: Dict):
     print(f"\n📊 현재 점수 분포")
     print(f"  평균 점수: {stats['current_avg_score']:.1f}점")
     print(f"  중간값: {stats['current_median_score']:.1f}점")
+    if 'current_percentiles' in stats:
+        print(f"  백분위수: {format_percentiles(stats['current_percentiles'])}")
     print(f"  등급 분포:")
     for grade, count in stats['current_grades'].items():
         print(f"    {grade}등급: {count}개 ({count/stats['total']*100:.1f}%)")
@@ -289,6 +451,8 @@ def print_analysis_report(stats: Dict, comparisons: Dict):
     for scenario, result in comparisons.items():
         print(f"\n  {scenario.upper()} 시나리오:")
         print(f"    평균 점수: {result['avg_score']:.1f}점 (변화: {result['avg_score'] - stats['current_avg_score']:+.1f}점)")
+        if 'percentiles' in result:
+            print(f"    중간값: {result['median_score']:.1f}점, 백분위수: {format_percentiles(result['percentiles'])}")
         print(f"    등급 분포:")
         for grade, count in result['grades'].items():
             current_count = stats['current_grades'][grade]
@@ -299,20 +463,44 @@ def print_analysis_report(stats: Dict, comparisons: Dict):
     print("\n" + "=" * 80)
 
 
+def format_percentiles(percentiles: Dict[int, float]) -> str:
+    return ", ".join(f"p{point} {value:.1f}" for point, value in percentiles.items())
+
+
 def main():
-    print("🚀 접근성 점수 가중치 분석 시작...\n")
+    parser = argparse.ArgumentParser(description="접근성 점수 가중치 분석")
+    parser.add_argument("--path", type=Path, default=GT_JSONL_PATH, help="분석할 GT JSONL 파일")
+    parser.add_argument("--stream", action="store_true", help="한 번 읽으며 집계 (메모리 사용량 일정)")
+    parser.add_argument("--workers", type=int, default=1, help="--stream 청크 병렬 집계 프로세스 수")
+    args = parser.parse_args()
+    # 백엔드 모듈의 INFO 로그도 콘솔에 출력
+    configure_logging()
     
-    # 데이터 로드
-    data = load_gt_data()
-    if not data:
-        print("❌ 분석할 데이터가 없습니다.")
-        sys.exit(1)
-    
-    print(f"✅ {len(data)}개의 이미지 데이터를 로드했습니다.\n")
+    print("🚀 접근성 점수 가중치 분석 시작...\n")
     
-    # 분석 실행
-    stats = analyze_data(data)
-    comparisons = compare_scenarios(data)
+    if args.stream:
+        if not args.path.exists():
+            print(f"❌ 파일을 찾을 수 없습니다: {args.path}")
+            sys.exit(1)
+        report = stream_report(args.path, args.workers)
+        if report.total == 0:
+            print("❌ 분석할 데이터가 없습니다.")
+            sys.exit(1)
+        print(f"✅ {report.total}개의 이미지 데이터를 스트리밍으로 집계했습니다.\n")
+        stats = report.stats()
+        comparisons = report.comparisons()
+    else:
+        # 데이터 로드
+        data = load_gt_data(args.path)
+        if not data:
+            print("❌ 분석할 데이터가 없습니다.")
+            sys.exit(1)
+        
+        print(f"✅ {len(data)}개의 이미지 데이터를 로드했습니다.\n")
+        
+        # 분석 실행
+        stats = analyze_data(data)
+        comparisons = compare_scenarios(data)
     
     # 리포트 출력
     print_analysis_report(stats, comparisons)
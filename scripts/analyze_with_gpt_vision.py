@@ -1,151 +1,35 @@
 #!/usr/bin/env python3
 """
 GPT Vision API를 사용하여 검수대상목록 이미지 분석 스크립트
+
+여러 노드로 나눠 실행하려면 노드마다 --shard i/n (0 <= i < n) 을 지정합니다.
+샤드 결과는 gpt_analysis_results.shard-i-of-n.jsonl 에 기록되고, 공유 폴더의
+임대 파일로 샤드를 한 노드만 처리합니다. --takeover 를 주면 자기 샤드를 마친 뒤
+하트비트가 끊긴(중단된) 노드의 샤드를 넘겨받아 남은 이미지만 분석합니다.
+모든 샤드가 끝나면 --merge n 으로 결과를 gpt_analysis_results.jsonl 하나로 합칩니다.
 """
 
-import json
-import base64
-import os
+import argparse
 import sys
 from pathlib import Path
 from typing import Dict, List
-import time
-from openai import OpenAI
 
 # 프로젝트 루트 경로
 PROJECT_ROOT = Path(__file__).parent.parent
-API_KEY_FILE = PROJECT_ROOT / "api.txt"
-REVIEW_QUEUE_PATH = PROJECT_ROOT / "data" / "검수대상목록"
-OUTPUT_FILE = PROJECT_ROOT / "data" / "검수대상목록" / "gpt_analysis_results.jsonl"
-
-def load_api_key() -> str:
-    """API 키 로드"""
-    if not API_KEY_FILE.exists():
-        raise FileNotFoundError(f"API 키 파일을 찾을 수 없습니다: {API_KEY_FILE}")
-    
-    with open(API_KEY_FILE, 'r') as f:
-        api_key = f.read().strip()
-    
-    if not api_key:
-        raise ValueError("API 키가 비어있습니다")
-    
-    return api_key
-
-
-def encode_image(image_path: Path) -> str:
-    """이미지를 base64로 인코딩"""
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend.analyzer.batch_shards import (
+    ShardLease, completed_paths, merge_shard_outputs, parse_shard, shard_of, shard_output_path
+)
+from backend.analyzer.gpt_vision import AnalysisMetrics, analyze_batch, create_client
+from backend.analyzer.rate_limit import estimate_analysis_cost, get_cost_budget
+from backend.processor.jsonl_writer import close_all_writers, get_writer
+from backend.utils.config import settings
+from backend.utils.logger import configure_logging
 
-def analyze_image_with_gpt(client: OpenAI, image_path: Path, batch_name: str) -> Dict:
-    """GPT Vision API를 사용하여 이미지 분석"""
-    
-    # 이미지 base64 인코딩
-    base64_image = encode_image(image_path)
-    
-    # 프롬프트 작성
-    prompt = """이 이미지는 음식점의 실내 공간 사진입니다. 이동약자 접근성 관점에서 다음 항목들을 분석해주세요:
-
-1. **단차/계단/턱 (has_step)**: 
-   - 휠체어 사용자가 진입하기 어려운 단차, 계단, 문턱이 있는지 확인
-   - boolean 값으로 반환 (true: 있음, false: 없음)
-
-2. **통로 너비 (width_class)**:
-   - wide: 휠체어가 여유롭게 통과 가능 (약 90cm 이상)
-   - normal: 휠체어가 통과 가능하나 좁음 (약 70-90cm)
-   - narrow: 휠체어 통과가 매우 어려움 (약 50-70cm)
-   - not_passable: 휠체어 통과 불가능 (50cm 미만)
-   - 배열로 반환 (여러 구간이 있으면 모두 포함)
-
-3. **의자 타입 (chair)**:
-   - has_movable_chair: 일반적인 이동 가능한 의자 (의자, 스툴 등)
-   - has_high_movable_chair: 팔걸이가 있거나 높이 조절 가능한 의자
-   - has_fixed_chair: 고정된 의자 (벤치, 부스 좌석 등)
-   - has_floor_chair: 바닥 좌석 (좌식 테이블)
-   - 각각 boolean 값으로 반환
-
-응답은 반드시 다음 JSON 형식으로만 제공해주세요:
-{
-  "has_step": boolean,
-  "width_class": ["wide" 또는 "normal" 또는 "narrow" 또는 "not_passable"],
-  "chair": {
-    "has_movable_chair": boolean,
-    "has_high_movable_chair": boolean,
-    "has_fixed_chair": boolean,
-    "has_floor_chair": boolean
-  },
-  "confidence": float (0.0-1.0, 전체 예측의 신뢰도)
-}"""
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",  # 또는 "gpt-4-vision-preview"
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/webp;base64,{base64_image}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=500,
-            temperature=0.1  # 일관성을 위해 낮은 temperature
-        )
-        
-        # 응답에서 JSON 추출
-        content = response.choices[0].message.content.strip()
-        
-        # JSON 파싱 (마크다운 코드 블록 제거)
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        result = json.loads(content)
-        
-        # file_path 추가
-        result["file_path"] = f"{batch_name}/{image_path.name}"
-        result["batch"] = batch_name
-        
-        # confidence가 없으면 기본값 설정
-        if "confidence" not in result:
-            result["confidence"] = 0.85  # 기본 신뢰도
-        
-        return result
-        
-    except json.JSONDecodeError as e:
-        print(f"⚠️  JSON 파싱 오류 ({image_path.name}): {e}")
-        print(f"   응답 내용: {content[:200]}...")
-        # 기본값 반환
-        return {
-            "file_path": f"{batch_name}/{image_path.name}",
-            "batch": batch_name,
-            "has_step": False,
-            "width_class": ["normal"],
-            "chair": {
-                "has_movable_chair": True,
-                "has_high_movable_chair": False,
-                "has_fixed_chair": False,
-                "has_floor_chair": False
-            },
-            "confidence": 0.5  # 낮은 신뢰도 (파싱 실패)
-        }
-    except Exception as e:
-        print(f"❌ API 호출 오류 ({image_path.name}): {e}")
-        raise
+REVIEW_QUEUE_PATH = PROJECT_ROOT / "data" / "검수대상목록"
+OUTPUT_FILE = PROJECT_ROOT / "data" / "검수대상목록" / "gpt_analysis_results.jsonl"
+LEASE_DIR = REVIEW_QUEUE_PATH / ".analysis_leases"
 
 
 def get_all_images() -> List[tuple]:
@@ -158,7 +42,7 @@ def get_all_images() -> List[tuple]:
     
     # batch 폴더들 순회
     for batch_dir in sorted(REVIEW_QUEUE_PATH.iterdir()):
-        if not batch_dir.is_dir():
+        if not batch_dir.is_dir() or batch_dir.name.startswith('.'):
             continue
         
         batch_name = batch_dir.name
@@ -171,13 +55,124 @@ def get_all_images() -> List[tuple]:
     return images
 
 
+def analyze_images(client, images: List[tuple], writer, lease: ShardLease = None, pack_size: int = 1) -> Dict:
+    """이미지 목록 분석 후 결과 기록 (임대를 잃거나 일일 비용 한도에 닿으면 중단)
+    
+    서버와 같은 analyze_batch 를 사용하므로 프로세스 공용 속도 제한기와
+    일일 비용 한도(GPT_RPM, GPT_TPM, GPT_DAILY_BUDGET_USD)를 그대로 따릅니다.
+    """
+    total = len(images)
+    success_count = 0
+    error_count = 0
+    metrics = AnalysisMetrics()
+    budget = get_cost_budget()
+    pack_size = max(1, pack_size)
+    
+    for start in range(0, total, pack_size):
+        if lease is not None and (lease.lost or not lease.holds()):
+            print("   ⛔ 샤드 임대를 잃어 중단합니다 (다른 노드가 넘겨받음)")
+            break
+        chunk = [(image_path, batch_name) for batch_name, image_path in images[start:start + pack_size]]
+        print(f"[{start + 1}/{total}] 분석 중: {', '.join(f'{batch}/{path.name}' for path, batch in chunk)}")
+        
+        outcomes = analyze_batch(client, chunk, pack_size, metrics)
+        failed = False
+        for image_path, batch_name, result, error in outcomes:
+            if error is not None:
+                print(f"   ❌ 오류 ({batch_name}/{image_path.name}): {error}")
+                error_count += 1
+                failed = True
+                continue
+            
+            success_count += 1
+            # 결과를 JSONL 작성기 큐에 추가 (파일을 매번 다시 열지 않음)
+            future = writer.write(result)
+            if lease is not None:
+                # 다른 노드가 넘겨받아도 다시 분석하지 않도록 기록될 때까지 대기
+                future.result()
+            print(f"   ✅ 완료 ({batch_name}/{image_path.name}, 신뢰도: {result.get('confidence', 0):.2f})")
+        
+        remaining = budget.remaining()
+        if failed and remaining is not None and remaining < estimate_analysis_cost(1):
+            print("   ⛔ 일일 GPT 비용 한도에 도달하여 중단합니다")
+            break
+    
+    cost = metrics.summary()
+    print(f"\n💰 GPT 요청 {cost['api_calls']}회, 추정 비용 ${cost['estimated_cost_usd']:.4f}")
+    return {"total": total, "success": success_count, "error": error_count}
+
+
+def run_shard(client, images: List[tuple], index: int, count: int, args) -> Dict:
+    """샤드 하나 처리 (임대 획득, 이미 기록된 이미지 건너뛰기, 완료 표시)"""
+    lease = ShardLease(LEASE_DIR, index, count, timeout=args.lease_timeout, heartbeat=args.heartbeat)
+    if not lease.acquire():
+        print(f"⏭️  샤드 {index}/{count}: 완료되었거나 다른 노드가 처리 중입니다")
+        return {}
+    
+    output = shard_output_path(OUTPUT_FILE, index, count)
+    try:
+        done = completed_paths(output)
+        pending = [
+            (batch_name, image_path) for batch_name, image_path in images
+            if shard_of(f"{batch_name}/{image_path.name}", count) == index
+            and f"{batch_name}/{image_path.name}" not in done
+        ]
+        print(f"📦 샤드 {index}/{count}: 남은 이미지 {len(pending)}개 (기록됨 {len(done)}개) -> {output.name}\n")
+        summary = analyze_images(client, pending, get_writer(output), lease, args.pack_size)
+        # 오류가 난 이미지가 있으면 완료 표시하지 않음 (다시 실행하면 남은 이미지만 분석)
+        finished = not lease.lost and summary["success"] == summary["total"]
+        lease.release(done=finished, summary=summary)
+        return summary
+    except BaseException:
+        lease.release()
+        raise
+
+
+def print_summary(summary: Dict, output: Path):
+    print("\n" + "=" * 80)
+    print("📊 분석 완료 요약")
+    print("=" * 80)
+    print(f"  총 이미지: {summary['total']}개")
+    print(f"  성공: {summary['success']}개")
+    print(f"  실패: {summary['error']}개")
+    print(f"  결과 파일: {output}")
+    print("\n✅ 분석 완료!")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="GPT Vision API 검수대상목록 분석")
+    parser.add_argument("--shard", help="이 노드가 처리할 샤드 i/n (0 <= i < n)")
+    parser.add_argument("--takeover", action="store_true", help="자기 샤드를 마친 뒤 중단된 노드의 샤드 처리")
+    parser.add_argument("--lease-timeout", type=float, default=120.0, help="하트비트가 끊긴 임대를 넘겨받기까지의 시간(초)")
+    parser.add_argument("--heartbeat", type=float, default=15.0, help="임대 하트비트 간격(초)")
+    parser.add_argument("--merge", type=int, metavar="N", help="샤드 N개의 결과를 하나의 결과 파일로 합치고 종료")
+    parser.add_argument("--pack-size", type=int, default=settings.GPT_PACK_SIZE, help="한 요청에 묶어 분석할 이미지 수")
+    args = parser.parse_args()
+    # 백엔드 모듈의 INFO 로그도 콘솔에 출력
+    configure_logging()
+    
+    if args.merge:
+        unfinished = [
+            index for index in range(args.merge)
+            if not ShardLease(LEASE_DIR, index, args.merge).done
+        ]
+        if unfinished:
+            print(f"⚠️  완료 표시가 없는 샤드: {unfinished} (지금까지의 결과만 합칩니다)")
+        summary = merge_shard_outputs(OUTPUT_FILE, args.merge)
+        print(f"✅ {summary['lines_before']}줄 -> {summary['merged']}개 이미지, 결과 파일: {OUTPUT_FILE}")
+        return
+    
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
     print("🚀 GPT Vision API 이미지 분석 시작...\n")
     
     # API 키 로드
     try:
-        api_key = load_api_key()
-        client = OpenAI(api_key=api_key)
+        client = create_client()
         print("✅ API 키 로드 완료\n")
     except Exception as e:
         print(f"❌ API 키 로드 실패: {e}")
@@ -193,6 +188,17 @@ def main():
     
     print(f"📸 총 {total}개의 이미지를 찾았습니다.\n")
     
+    if shard is not None:
+        index, count = shard
+        order = [index] + ([other for other in range(count) if other != index] if args.takeover else [])
+        summary = {"total": 0, "success": 0, "error": 0}
+        for current in order:
+            for key, value in run_shard(client, images, current, count, args).items():
+                summary[key] += value
+        close_all_writers()
+        print_summary(summary, shard_output_path(OUTPUT_FILE, index, count))
+        return
+    
     # 기존 결과 파일이 있으면 백업
     if OUTPUT_FILE.exists():
         backup_file = OUTPUT_FILE.with_suffix('.jsonl.backup')
@@ -200,43 +206,14 @@ def main():
         shutil.copy(OUTPUT_FILE, backup_file)
         print(f"📦 기존 결과를 백업했습니다: {backup_file}\n")
     
-    # 결과 저장
-    results = []
-    success_count = 0
-    error_count = 0
+    # 결과 저장 (그룹 커밋 작성기)
+    summary = analyze_images(client, images, get_writer(OUTPUT_FILE), pack_size=args.pack_size)
     
-    for idx, (batch_name, image_path) in enumerate(images, 1):
-        print(f"[{idx}/{total}] 분석 중: {batch_name}/{image_path.name}")
-        
-        try:
-            result = analyze_image_with_gpt(client, image_path, batch_name)
-            results.append(result)
-            success_count += 1
-            
-            # 결과를 JSONL 형식으로 즉시 저장
-            with open(OUTPUT_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(result, ensure_ascii=False) + '\n')
-            
-            print(f"   ✅ 완료 (신뢰도: {result.get('confidence', 0):.2f})")
-            
-            # API rate limit 방지를 위한 대기
-            if idx < total:
-                time.sleep(1)  # 1초 대기
-            
-        except Exception as e:
-            print(f"   ❌ 오류: {e}")
-            error_count += 1
-            continue
+    # 남은 결과 기록
+    close_all_writers()
     
     # 요약 출력
-    print("\n" + "=" * 80)
-    print("📊 분석 완료 요약")
-    print("=" * 80)
-    print(f"  총 이미지: {total}개")
-    print(f"  성공: {success_count}개")
-    print(f"  실패: {error_count}개")
-    print(f"  결과 파일: {OUTPUT_FILE}")
-    print("\n✅ 분석 완료!")
+    print_summary(summary, OUTPUT_FILE)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+GPT Vision 단건/묶음 모드 비용·처리량 비교 벤치마크
+
+검수대상목록 이미지 일부를 pack_size 별로 분석하여 이미지당 비용,
+분당 처리 이미지 수, 단건 재시도(fallback) 수를 비교합니다.
+실제 API를 호출하므로 api.txt 가 필요하며 비용이 발생합니다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.analyzer.gpt_vision import AnalysisMetrics, analyze_batch, create_client
+
+REVIEW_QUEUE_PATH = PROJECT_ROOT / "data" / "검수대상목록"
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+
+
+def get_sample_images(limit: int):
+    """검수대상목록에서 앞에서부터 limit 개 이미지"""
+    images = []
+    for batch_dir in sorted(REVIEW_QUEUE_PATH.iterdir()):
+        if not batch_dir.is_dir():
+            continue
+        for image_file in sorted(batch_dir.glob("*")):
+            if image_file.is_file() and image_file.suffix.lower() in IMAGE_EXTENSIONS:
+                images.append((image_file, batch_dir.name))
+    return images[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT Vision 묶음 모드 벤치마크")
+    parser.add_argument("--images", type=int, default=8, help="분석할 이미지 수")
+    parser.add_argument("--pack-sizes", default="1,4", help="비교할 pack_size 목록 (쉼표 구분)")
+    args = parser.parse_args()
+
+    images = get_sample_images(args.images)
+    if not images:
+        print("❌ 분석할 이미지가 없습니다.")
+        sys.exit(1)
+
+    client = create_client()
+    pack_sizes = [int(size) for size in args.pack_sizes.split(",")]
+
+    print(f"🚀 {len(images)}개 이미지로 pack_size {pack_sizes} 비교\n")
+
+    rows = []
+    for pack_size in pack_sizes:
+        metrics = AnalysisMetrics()
+        outcomes = analyze_batch(client, images, pack_size, metrics)
+        failed = sum(1 for _, _, _, error in outcomes if error is not None)
+        summary = metrics.summary()
+        rows.append((pack_size, summary, failed))
+        print(f"  pack_size={pack_size}: {summary['api_calls']}회 호출, 실패 {failed}개")
+
+    print("\n" + "=" * 80)
+    print(f"{'pack':>5} {'calls':>6} {'prompt tok':>11} {'$/image':>10} {'img/min':>9} {'fallback':>9}")
+    print("-" * 80)
+    for pack_size, summary, _ in rows:
+        print(
+            f"{pack_size:>5} {summary['api_calls']:>6} {summary['prompt_tokens']:>11} "
+            f"{summary['cost_per_image_usd']:>10.5f} {summary['images_per_minute']:>9.1f} "
+            f"{summary['fallbacks']:>9}"
+        )
+
+
+if __name__ == '__main__':
+    main()
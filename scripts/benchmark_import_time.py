@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+backend.api.main 임포트 시간 벤치마크
+
+새 인터프리터에서 반복 임포트하여 콜드 스타트 시간을 측정하고,
+무거운 선택 의존성(openai)이 임포트 시점에 로드되지 않는지 확인합니다.
+--max-ms 를 지정하면 기준을 넘을 때 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로
+PROJECT_ROOT = Path(__file__).parent.parent
+TARGET_MODULE = "backend.api.main"
+LAZY_MODULES = ["openai"]
+
+MEASURE_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once(module: str) -> dict:
+    """새 프로세스에서 한 번 임포트하여 시간 측정"""
+    code = MEASURE_CODE.format(module=module, lazy=LAZY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # 로거 출력이 섞일 수 있으므로 마지막 줄만 사용
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="backend.api.main 임포트 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="반복 횟수")
+    parser.add_argument("--max-ms", type=float, default=None, help="중간값 허용 한도 (ms)")
+    args = parser.parse_args()
+
+    print(f"⏱️  {TARGET_MODULE} 임포트 시간 측정 ({args.runs}회)...\n")
+
+    timings = []
+    eager_modules = set()
+    for idx in range(1, args.runs + 1):
+        result = measure_once(TARGET_MODULE)
+        timings.append(result["ms"])
+        eager_modules.update(result["loaded"])
+        print(f"  [{idx}/{args.runs}] {result['ms']:.1f}ms")
+
+    median = statistics.median(timings)
+    print("\n" + "=" * 60)
+    print(f"  중간값: {median:.1f}ms")
+    print(f"  최소/최대: {min(timings):.1f}ms / {max(timings):.1f}ms")
+
+    failed = False
+    if eager_modules:
+        print(f"  ❌ 임포트 시 로드된 지연 대상 모듈: {', '.join(sorted(eager_modules))}")
+        failed = True
+    else:
+        print(f"  ✅ 지연 대상 모듈 미로드: {', '.join(LAZY_MODULES)}")
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"  ❌ 기준 초과: {median:.1f}ms > {args.max_ms:.1f}ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+JSONL 청크 병렬 파싱 벤치마크
+
+합성 GT 레코드로 JSONL 파일을 만들고(또는 --path 파일 사용)
+워커 수별 read_jsonl 로드 시간을 단일 프로세스 파싱과 비교합니다.
+첫 로드(워커 풀 시작 포함)와 풀을 재사용한 로드를 따로 재고, 워커가 파싱한
+레코드를 부모로 돌려보낼 때 드는 피클 직렬화·역직렬화 비용도 함께 측정합니다.
+수 GB 파일은 --size-gb 로 만듭니다.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.processor import jsonl_reader
+from backend.processor.jsonl_reader import read_jsonl
+
+
+def write_synthetic(path: Path, count: int):
+    widths = ["not_passable", "narrow", "normal", "wide"]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "file_path": f"folder_{i % 20:02d}/20240101120000_photo{i}_store{i % 500}.webp",
+                "has_step": i % 3 == 0,
+                "width_class": [widths[i % 4]],
+                "chair": {
+                    "has_movable_chair": i % 2 == 0,
+                    "has_high_movable_chair": False,
+                    "has_fixed_chair": i % 5 == 0,
+                    "has_floor_chair": False
+                }
+            }, ensure_ascii=False) + "\n")
+
+
+def write_synthetic_size(path: Path, size_bytes: int) -> int:
+    """목표 크기까지 합성 레코드 작성 (수 GB 용, 한 블록씩 반복 기록) → 레코드 수"""
+    block_path = path.with_suffix(".block")
+    write_synthetic(block_path, 10_000)
+    block = block_path.read_bytes()
+    block_path.unlink()
+    written = 0
+    with open(path, 'wb') as f:
+        while written < size_bytes:
+            f.write(block)
+            written += len(block)
+    return written // len(block) * 10_000
+
+
+def pickle_cost(path: Path) -> tuple:
+    """청크별 레코드 피클 왕복 시간 → (직렬화 초, 역직렬화 초, 피클 MB)"""
+    dumps = loads = 0.0
+    size = 0
+    for start, stop in jsonl_reader.chunk_ranges(path, 0, os.path.getsize(path), jsonl_reader.SERIAL_CHUNK_BYTES):
+        result = jsonl_reader._parse_range((str(path), start, stop))
+        began = time.perf_counter()
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        dumps += time.perf_counter() - began
+        began = time.perf_counter()
+        pickle.loads(data)
+        loads += time.perf_counter() - began
+        size += len(data)
+    return dumps, loads, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL 병렬 파싱 벤치마크")
+    parser.add_argument("--path", type=Path, help="측정할 JSONL 파일 (없으면 합성 데이터)")
+    parser.add_argument("--records", type=int, default=1_000_000, help="합성 레코드 수")
+    parser.add_argument("--size-gb", type=float, help="합성 파일 크기 (GB, 지정 시 --records 무시)")
+    parser.add_argument("--workers", default="1,2,4,8", help="측정할 워커 수 (쉼표 구분)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            path = Path(tmp) / "gt.jsonl"
+            if args.size_gb:
+                write_synthetic_size(path, int(args.size_gb * 1024 ** 3))
+            else:
+                write_synthetic(path, args.records)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        parser_name = "orjson" if jsonl_reader.orjson is not None else "json"
+        print(f"📦 {path.name}: {size_mb:.1f} MB, 파서 {parser_name}, CPU {os.cpu_count()}\n")
+        print(f"{'workers':<10}{'records':>12}{'first':>10}{'reused':>10}{'speedup':>10}")
+        print("-" * 52)
+
+        baseline = None
+        for workers in [int(value) for value in args.workers.split(",")]:
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                records, _, _ = read_jsonl(path, workers=workers, min_parallel_bytes=0)
+                timings.append(time.perf_counter() - start)
+                count = len(records)
+                del records
+            baseline = baseline or timings[1]
+            print(f"{workers:<10}{count:>12,}{timings[0]:>10.2f}{timings[1]:>10.2f}{baseline / timings[1]:>10.2f}")
+        jsonl_reader.shutdown_pools()
+
+        dumps, loads, pickled_mb = pickle_cost(path)
+        print(f"\n피클 왕복 (워커 → 부모 전달분): {pickled_mb:.1f} MB, 직렬화 {dumps:.2f}s, 역직렬화 {loads:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+/api/images 필드 선택(projection) 응답 크기·인코딩 시간 벤치마크
+
+GT 레코드(또는 --synthetic 개의 합성 레코드)로 한 페이지 응답을 만들어
+전체 레코드 응답과 fields=, shape=compact 응답의 바이트 수와
+생성·인코딩 시간을 비교합니다. 전체 응답은 FastAPI 기본 경로와 같이
+jsonable_encoder 를 거친 뒤 인코딩합니다.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.api.projection import DEFAULT_IMAGE_FIELDS, project_record, shape_rows
+from backend.processor.data_manager import DataManager
+from backend.utils.config import settings
+
+PROJECTIONS = [
+    ("full", None, "objects"),
+    ("file_path,grade,score", ["file_path", "grade", "score"], "objects"),
+    ("file_path,grade,score (compact)", ["file_path", "grade", "score"], "compact"),
+    ("default (compact)", list(DEFAULT_IMAGE_FIELDS), "compact"),
+]
+
+
+def synthetic_records(count: int):
+    widths = ["not_passable", "narrow", "normal", "wide"]
+    return [
+        {
+            "file_path": f"20240101120000_photo{i}_store{i % 500}.webp",
+            "has_step": i % 3 == 0,
+            "width_class": [widths[i % 4]],
+            "chair": {
+                "has_movable_chair": i % 2 == 0,
+                "has_high_movable_chair": False,
+                "has_fixed_chair": i % 5 == 0,
+                "has_floor_chair": False
+            }
+        }
+        for i in range(count)
+    ]
+
+
+def render(items, fields, shape, manager: DataManager) -> bytes:
+    """한 페이지 응답 생성 및 인코딩 (엔드포인트와 같은 경로)"""
+    if fields is None:
+        page = [dict(item, accessibility=manager.calculate_accessibility_score(item)) for item in items]
+        content = jsonable_encoder({"total": len(items), "skip": 0, "limit": len(items), "items": page})
+        return JSONResponse(content=content).body
+    rows = [project_record(item, fields, manager.calculate_accessibility_score) for item in items]
+    return JSONResponse(content={
+        "total": len(items), "skip": 0, "limit": len(items), **shape_rows(rows, fields, shape)
+    }).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/images 필드 선택 벤치마크")
+    parser.add_argument("--page-size", type=int, default=100, help="페이지당 항목 수")
+    parser.add_argument("--runs", type=int, default=50, help="반복 횟수")
+    parser.add_argument("--synthetic", type=int, default=0, help="GT 대신 사용할 합성 레코드 수")
+    args = parser.parse_args()
+
+    manager = DataManager(settings.GT_JSONL_PATH)
+    records = synthetic_records(args.synthetic) if args.synthetic else manager.load_all_data()
+    if not records:
+        print("❌ 레코드가 없습니다. --synthetic 으로 합성 데이터를 사용하세요.")
+        sys.exit(1)
+    items = records[:args.page_size]
+
+    print(f"📦 {len(items)}개 항목 페이지, {args.runs}회 반복\n")
+    print(f"{'projection':<34}{'bytes':>10}{'ratio':>8}{'median ms':>12}")
+    print("-" * 64)
+
+    baseline = None
+    for name, fields, shape in PROJECTIONS:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            body = render(items, fields, shape, manager)
+            timings.append((time.perf_counter() - start) * 1000)
+        size = len(body)
+        baseline = baseline or size
+        print(f"{name:<34}{size:>10,}{size / baseline:>8.2f}{statistics.median(timings):>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
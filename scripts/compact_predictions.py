@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+GPT 분석 결과 로그 압축
+
+gpt_analysis_results.jsonl (및 교체된 이전 파일)을 file_path 별 최신 결과만
+남도록 병합합니다. 분석 작성기가 실행 중이어도 안전하며, 작성기는 활성 파일을
+세그먼트로 넘기는 순간에만 잠금을 기다립니다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.processor.prediction_store import compact_prediction_log
+from backend.utils.logger import configure_logging
+
+DEFAULT_LOGS = [
+    PROJECT_ROOT / "data" / "검수대상목록" / "gpt_analysis_results.jsonl",
+    PROJECT_ROOT / "data" / "사진수집현황" / "gpt_analysis_results.jsonl",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT 분석 결과 로그 압축")
+    parser.add_argument("paths", nargs="*", type=Path, help="압축할 JSONL 파일 (기본: 검수대상목록, 사진수집현황)")
+    parser.add_argument("--keep-history", type=int, default=1, help="file_path 별로 남길 최근 결과 수")
+    args = parser.parse_args()
+    # 백엔드 모듈의 INFO 로그도 콘솔에 출력
+    configure_logging()
+
+    for path in args.paths or DEFAULT_LOGS:
+        summary = compact_prediction_log(path, max(1, args.keep_history))
+        if summary.get("skipped"):
+            print(f"⏭️  {path}: 다른 압축이 진행 중입니다")
+        elif summary["segments"] == 0:
+            print(f"⏭️  {path}: 압축할 결과가 없습니다")
+        else:
+            print(f"✅ {path}: {summary['lines_before']}줄 -> {summary['lines_after']}줄")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+이미지 수집 스캔 및 갤러리 매니페스트 재생성
+
+사진수집현황, 검수대상목록, spider 폴더에서 새로 생기거나 바뀐 이미지만
+프로세스 풀로 스캔(크기·해상도·SHA-256·손상 여부)하여 .cache/ingest_manifest.json 을
+갱신하고, frontend/public 의 photo_collection_images.json,
+review_queue_images.json 을 매니페스트에서 다시 생성합니다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.processor.ingest import IngestManifest, scan_roots, write_gallery_manifest
+from backend.utils.config import settings
+from backend.utils.logger import configure_logging
+
+ROOTS = {
+    "사진수집현황": PROJECT_ROOT / "data" / "사진수집현황",
+    "검수대상목록": PROJECT_ROOT / "data" / "검수대상목록",
+    "spider": PROJECT_ROOT / "data" / "spider",
+}
+
+GALLERY_MANIFESTS = {
+    "사진수집현황": PROJECT_ROOT / "frontend" / "public" / "photo_collection_images.json",
+    "검수대상목록": PROJECT_ROOT / "frontend" / "public" / "review_queue_images.json",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 수집 스캔 및 갤러리 매니페스트 재생성")
+    parser.add_argument("--workers", type=int, default=settings.INGEST_WORKERS, help="스캔 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--full", action="store_true", help="변경 여부와 관계없이 전체 다시 스캔")
+    parser.add_argument("--manifest", type=Path, default=settings.INGEST_MANIFEST_PATH, help="매니페스트 경로")
+    parser.add_argument("--no-gallery", action="store_true", help="프론트엔드 이미지 목록 JSON 을 갱신하지 않음")
+    args = parser.parse_args()
+    # 백엔드 모듈의 INFO 로그도 콘솔에 출력
+    configure_logging()
+
+    manifest = IngestManifest(args.manifest)
+    summary = scan_roots(ROOTS, manifest, workers=args.workers, full=args.full)
+
+    print(f"🔍 스캔 {summary['scanned']}개, 삭제 {summary['removed']}개, 전체 {summary['total']}개 "
+          f"({summary['elapsed_seconds']}초)")
+    for key in summary['corrupt']:
+        print(f"  ⚠️  손상된 이미지: {key} ({manifest.entries[key].get('error')})")
+
+    if not args.no_gallery:
+        for root_name, output_path in GALLERY_MANIFESTS.items():
+            if write_gallery_manifest(manifest, root_name, output_path):
+                print(f"✅ {output_path.name} 갱신 ({len(manifest.images(root_name))}개)")
+            else:
+                print(f"⏭️  {output_path.name} 변경 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,50 @@
 백엔드 기능 테스트 스크립트
 """
 import sys
+import asyncio
+import json
+import logging
+import queue
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
 from pathlib import Path
 
 # 프로젝트 루트를 경로에 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
+from backend.utils import logger as log_config
 from backend.utils.config import settings
-from backend.processor.data_manager import DataManager
+from backend.processor.data_manager import DataManager, VersionConflict
+from backend.processor.phash_index import BKTree, PerceptualHashIndex, hamming
+from backend.processor.jsonl_writer import JsonlWriter, rotated_files
+from backend.processor.prediction_store import PredictionStore, compact_prediction_log
+from backend.processor.data_cube import AttributeCube
+from backend.processor.store_index import StoreIndex
+from backend.processor.time_index import CaptureTimeIndex
+from backend.processor.ingest import IngestManifest, scan_roots
+from backend.processor.review_queue import ReviewQueue
+from backend.processor.change_log import ChangeLog
+from backend.processor.gt_shards import shard_key
+from backend.processor.score_sketch import ScoreSketch
+from backend.processor import jsonl_reader
+from backend.processor.jsonl_reader import chunk_ranges, read_jsonl
+from backend.api.blocking import SingleFlight
+from backend.api.warmup import Warmup
+from backend.api.upload import StreamingImageUpload
+from backend.api.query_cache import QueryCache, normalize_query
+from backend.api.projection import IMAGE_FIELDS, parse_fields, project_record, shape_rows
+from backend.api.recommendations import build_recommendations, image_detail
+from backend.analyzer.analysis_queue import AnalysisQueue, QueueFull
+from backend.analyzer.gpt_vision import AnalysisMetrics, analyze_batch, analyze_images_packed
+from backend.analyzer.batch_shards import (
+    ShardLease, completed_paths, merge_shard_outputs, parse_shard, shard_of, shard_output_path
+)
+from backend.analyzer.rate_limit import BudgetExceeded, CostBudget, TokenBucket, get_cost_budget
 
 def test_data_loading():
     """데이터 로딩 테스트"""
@@ -106,6 +143,1500 @@ def test_accessibility_score():
     
     return True
 
+def test_shared_dataset():
+    """멀티 워커 공유 데이터셋 테스트"""
+    print("\n" + "=" * 60)
+    print("6. 공유 데이터셋 테스트")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        gt_path = tmp_path / "gt.jsonl"
+        with open(gt_path, 'w', encoding='utf-8') as f:
+            for i in range(3):
+                f.write(json.dumps({"file_path": f"{i}.png", "has_step": i == 0}) + "\n")
+        
+        # 두 워커가 같은 공유 디렉토리에 연결
+        worker_a = DataManager(gt_path, shared_dir=tmp_path / "shared")
+        worker_b = DataManager(gt_path, shared_dir=tmp_path / "shared")
+        
+        cold = worker_b.is_warm("dataset")
+        data_a = worker_a.load_all_data()
+        data_b = worker_b.load_all_data()
+        print(f"✅ 워커 A {len(data_a)}개, 워커 B {len(data_b)}개 (세대 {worker_b.version})")
+        
+        # 레코드는 mmap 에서 접근할 때 디코딩, 위치 인덱스와 통계는 스냅샷에서 읽음
+        old_view = worker_b._shared.records.view
+        positions = worker_b.get_positions()
+        stats = worker_b.get_statistics()
+        shared_view = (
+            worker_b.load_all_data() is data_b and data_b.view is old_view and not data_b.modified
+            and worker_b.get_positions() is positions
+            and positions.get("2.png") == 2 and "9.png" not in positions and len(positions) == 3
+            and stats['total_images'] == 3 and stats['has_step']['true'] == 1
+            and not cold and worker_b.is_warm("dataset") and worker_b.is_warm("positions")
+        )
+        print(f"   스냅샷 뷰·위치 인덱스·통계 공유: {shared_view}")
+        
+        # 재로드 후 다른 워커도 새 세대로 전환 (이전 세대를 읽던 요청은 계속 읽을 수 있음)
+        with open(gt_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"file_path": "3.png", "has_step": False}) + "\n")
+        worker_a.load_all_data(use_cache=False)
+        stale = not worker_b.is_warm("dataset")
+        data_b = worker_b.load_all_data()
+        old_readable = not old_view._mm.closed and old_view[2]['file_path'] == "2.png"
+        print(f"✅ 재로드 후 워커 B {len(data_b)}개 (세대 {worker_b.version}), 이전 뷰 읽기 가능: {old_readable}")
+        reloaded = (
+            len(data_b) == 4
+            and data_b[3]['file_path'] == "3.png"
+            and worker_b.get_positions()["3.png"] == 3
+            and worker_b.get_statistics()['total_images'] == 4
+        )
+        
+        # 커밋은 새 세대 없이 델타로 추가되고 다른 워커는 다시 파싱하지 않고 제자리 반영
+        generation = worker_b._shared.generation
+        stats_before = worker_b.get_statistics()
+        parses = []
+        worker_b._parse_file = lambda *args: parses.append(args) or []
+        commit = worker_a.commit_labels(
+            [{"file_path": "1.png", "has_step": True}, {"file_path": "4.png", "has_step": False}],
+            expected_version=worker_a.version,
+            removed=["0.png"]
+        )
+        synced = not worker_b.is_warm("dataset")
+        data_b = worker_b.load_all_data()
+        positions_b = worker_b.get_positions()
+        stats_b = worker_b.get_statistics()
+        delta_applied = (
+            synced
+            and not parses
+            and worker_b._shared.generation == worker_a._shared.generation == generation
+            and worker_b.version == worker_a.version == commit["version"]
+            and worker_b.is_warm("dataset") and worker_b.is_warm("stats_cache")
+            and len(data_b) == 4
+            and sorted(item['file_path'] for item in data_b) == ["1.png", "2.png", "3.png", "4.png"]
+            and "0.png" not in positions_b
+            and all(data_b[positions_b[item['file_path']]]['file_path'] == item['file_path'] for item in data_b)
+            and data_b[positions_b["1.png"]]['has_step'] is True
+            and stats_b['total_images'] == stats_before['total_images']
+            and stats_b['has_step']['true'] == stats_before['has_step']['true']
+        )
+        print(f"✅ 델타 커밋 반영 (세대 {generation} 유지, 버전 {worker_b.version}, 재파싱 없음): {delta_applied}")
+        
+        # 낡은 버전으로 커밋하면 다른 워커의 커밋과 충돌
+        try:
+            worker_b.commit_labels([{"file_path": "2.png"}], expected_version=commit["version"] - 1)
+            conflict = False
+        except VersionConflict:
+            conflict = True
+        print(f"   낡은 버전 커밋 충돌: {conflict}")
+        
+        return (
+            shared_view
+            and stale
+            and old_readable
+            and len(data_a) == 3
+            and reloaded
+            and delta_applied
+            and conflict
+        )
+
+def test_bk_tree():
+    """BK-tree 해밍 반경 검색 테스트"""
+    print("\n" + "=" * 60)
+    print("7. 유사 이미지 BK-tree 테스트")
+    print("=" * 60)
+    
+    import random
+    rng = random.Random(42)
+    hashes = {f"img_{i}.webp": rng.getrandbits(64) for i in range(300)}
+    # 근접 중복 (2비트 차이)
+    hashes["img_0_copy.webp"] = hashes["img_0.webp"] ^ 0b101
+    
+    tree = BKTree()
+    for key, value in hashes.items():
+        tree.add(value, key)
+    
+    query = hashes["img_0.webp"]
+    found = tree.search(query, 10)
+    expected = sorted(
+        (hamming(query, value), key) for key, value in hashes.items()
+        if hamming(query, value) <= 10
+    )
+    print(f"✅ 반경 10 이내 {len(found)}개: {[key for _, key in found]}")
+    
+    # 분석 스레드가 이미지를 추가하는 동안 중복 그룹·유사 이미지 조회
+    import backend.processor.phash_index as phash_module
+    original_dhash = phash_module.dhash
+    phash_module.dhash = lambda path: rng.getrandbits(64)
+    switch_interval = sys.getswitchinterval()
+    errors = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = PerceptualHashIndex({"spider": Path(tmp)})
+            index.build()
+            
+            def add_images():
+                for i in range(3000):
+                    index.add_image(f"spider/new_{i}.webp", Path(tmp) / f"new_{i}.webp")
+            
+            # 스레드 전환을 자주 일으켜 경합을 드러냄
+            sys.setswitchinterval(1e-6)
+            writer = threading.Thread(target=add_images)
+            writer.start()
+            while writer.is_alive():
+                try:
+                    index.duplicate_groups(4)
+                    index.find_similar("spider/new_0.webp", 20)
+                except RuntimeError as e:
+                    errors.append(str(e))
+                    break
+            writer.join()
+            concurrent = not errors and len(index._hashes) == 3000
+    finally:
+        sys.setswitchinterval(switch_interval)
+        phash_module.dhash = original_dhash
+    print(f"   추가 중 동시 조회 오류 없음: {concurrent} {errors[:1]}")
+    
+    return found == expected and (2, "img_0_copy.webp") in found and concurrent
+
+def test_jsonl_writer():
+    """그룹 커밋 작성기 동시 기록 테스트"""
+    print("\n" + "=" * 60)
+    print("8. JSONL 그룹 커밋 작성기 테스트")
+    print("=" * 60)
+    
+    import threading
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "gpt_analysis_results.jsonl"
+        writer = JsonlWriter(output_path, fsync="never", rotate_bytes=64 * 1024)
+        
+        def produce(worker_id: int):
+            for i in range(250):
+                writer.write({"file_path": f"folder_{worker_id:02d}/{i}.webp", "detail": "x" * (i % 50)})
+        
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+        
+        # 모든 줄이 온전한 JSON이어야 함
+        files = rotated_files(output_path) + [output_path]
+        records = []
+        for path in files:
+            with open(path, 'r', encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f)
+        
+        stats = writer.stats()
+        print(f"✅ {len(records)}줄 기록, {stats['groups']}회 커밋, 파일 {len(files)}개")
+        
+        return len(records) == 2000 and len({r['file_path'] for r in records}) == 2000 and len(files) > 1
+
+def test_prediction_store():
+    """최신 결과 인덱스 및 로그 압축 테스트"""
+    print("\n" + "=" * 60)
+    print("9. 예측 저장소 및 로그 압축 테스트")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "gpt_analysis_results.jsonl"
+        writer = JsonlWriter(output_path, fsync="never")
+        for version in range(3):
+            writer.write_many(
+                {"file_path": f"folder_00/{i}.webp", "confidence": version / 10} for i in range(20)
+            ).result()
+        
+        store = PredictionStore(output_path, history=2)
+        store.load()
+        before = store.get("folder_00/3.webp")["confidence"]
+        
+        summary = compact_prediction_log(output_path)
+        print(f"✅ 압축: {summary['lines_before']}줄 -> {summary['lines_after']}줄")
+        
+        # 압축 후에도 작성기는 새 파일에 이어서 기록
+        writer.write({"file_path": "folder_00/3.webp", "confidence": 0.9}).result()
+        writer.close()
+        
+        after = store.get("folder_00/3.webp")["confidence"]
+        history = [record["confidence"] for record in store.history("folder_00/3.webp")]
+        print(f"   folder_00/3.webp: {before} -> {after}, 이력 {history}")
+        
+        return (
+            summary["lines_after"] == 20 and before == 0.2 and after == 0.9
+            and history == [0.2, 0.9] and len(store) == 20
+        )
+
+def test_data_cube():
+    """데이터 큐브 교차표와 직접 집계 비교"""
+    print("\n" + "=" * 60)
+    print("10. 속성 데이터 큐브 테스트")
+    print("=" * 60)
+    
+    import random
+    
+    rng = random.Random(7)
+    widths = ["not_passable", "narrow", "normal", "wide"]
+    chair_keys = ["has_movable_chair", "has_high_movable_chair", "has_fixed_chair", "has_floor_chair"]
+    data = [
+        {
+            "has_step": rng.random() < 0.4,
+            "width_class": rng.sample(widths, rng.randint(1, 2)),
+            "chair": {key: rng.random() < 0.5 for key in chair_keys}
+        }
+        for _ in range(500)
+    ]
+    
+    manager = DataManager(settings.GT_JSONL_PATH)
+    cube = AttributeCube(manager.calculate_accessibility_score)
+    cube.build(data)
+    
+    table = cube.crosstab(["has_step", "width_class"], chair_type="movable")
+    expected = {}
+    for item in data:
+        if not item["chair"]["has_movable_chair"]:
+            continue
+        for width in item["width_class"]:
+            key = (item["has_step"], width)
+            expected[key] = expected.get(key, 0) + 1
+    actual = {(cell["has_step"], cell["width_class"]): cell["count"] for cell in table["cells"]}
+    print(f"✅ 단차 × 통로 너비 (이동식 의자): {len(table['cells'])}칸, {table['total']}개")
+    
+    # 수정 반영 후 등급 롤업 합계 유지
+    cube.update(data[0], dict(data[0], has_step=not data[0]["has_step"]))
+    grades = cube.crosstab(["grade"])
+    
+    return actual == expected and sum(cell["count"] for cell in grades["cells"]) == len(data)
+
+def test_store_index():
+    """매장 인덱스 증분 갱신 테스트"""
+    print("\n" + "=" * 60)
+    print("11. 매장 인덱스 테스트")
+    print("=" * 60)
+    
+    manager = DataManager(settings.GT_JSONL_PATH)
+    chair = {"has_movable_chair": True, "has_high_movable_chair": False, "has_fixed_chair": False, "has_floor_chair": False}
+    data = [
+        {"file_path": "folder_00/20240406121216_photo1_96fe98eaa714.webp", "has_step": False, "width_class": ["wide"], "chair": chair},
+        {"file_path": "folder_00/gold_20240406121216_photo2_96fe98eaa714.webp", "has_step": False, "width_class": ["normal"], "chair": chair},
+        {"file_path": "folder_00/20241214072812938_photo_1a04d11682bc.webp", "has_step": True, "width_class": ["narrow"], "chair": chair},
+        {"file_path": "1.png", "has_step": False, "width_class": ["wide"], "chair": chair},
+    ]
+    
+    index = StoreIndex(manager.calculate_accessibility_score)
+    index.build(data)
+    before = index.summary("96fe98eaa714")
+    
+    # 한 이미지의 레이블이 바뀌면 매장 집계도 바뀜
+    changed = dict(data[1], has_step=True, width_class=["not_passable"])
+    index.update(1, data[1], changed)
+    after = index.summary("96fe98eaa714")
+    print(f"✅ 매장 {len(index)}개, 미매칭 {index.unmatched}개")
+    print(f"   96fe98eaa714: {before['narrowest_width']}/{before['combined_grade']} -> {after['narrowest_width']}/{after['combined_grade']}")
+    
+    return (
+        len(index) == 2 and index.unmatched == 1 and before["image_count"] == 2
+        and before["narrowest_width"] == "normal" and not before["has_step"]
+        and after["narrowest_width"] == "not_passable" and after["step_image_count"] == 1
+    )
+
+def test_time_index():
+    """촬영 시각 인덱스 기간 조회 테스트"""
+    print("\n" + "=" * 60)
+    print("12. 촬영 시각 인덱스 테스트")
+    print("=" * 60)
+    
+    import random
+    from datetime import date, datetime, timedelta
+    
+    rng = random.Random(3)
+    base = datetime(2024, 1, 1)
+    data = []
+    for i in range(300):
+        captured = base + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        data.append({
+            "file_path": f"folder_00/{captured:%Y%m%d%H%M%S}_photo{i % 9}_{i:012x}.webp",
+            "has_step": rng.random() < 0.3,
+            "width_class": ["normal"],
+            "chair": {}
+        })
+    data.append({"file_path": "1.png", "has_step": False, "width_class": ["wide"], "chair": {}})
+    
+    manager = DataManager(settings.GT_JSONL_PATH)
+    index = CaptureTimeIndex(manager.calculate_accessibility_score)
+    index.build(data)
+    
+    start, end = date(2024, 3, 1), date(2024, 5, 31)
+    lo, hi = index.bounds(start, end)
+    expected = sorted(
+        (i for i, item in enumerate(data[:-1]) if "20240301" <= item["file_path"][10:18] <= "20240531"),
+        key=lambda i: data[i]["file_path"][10:24],
+        reverse=True
+    )
+    page = index.page(lo, hi, 5, 10, descending=True)
+    months = index.rollup("month", start, end)
+    print(f"✅ 2024-03 ~ 2024-05: {hi - lo}개, 월별 {[m['count'] for m in months]}")
+    
+    return (
+        len(index) == 300 and hi - lo == len(expected) and page == expected[5:15]
+        and sum(m["count"] for m in months) == len(expected) and len(months) == 3
+    )
+
+def test_ingest_scan():
+    """이미지 수집 증분 스캔 테스트"""
+    print("\n" + "=" * 60)
+    print("13. 이미지 수집 스캔 테스트")
+    print("=" * 60)
+    
+    from PIL import Image
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "사진수집현황"
+        (root / "folder_00").mkdir(parents=True)
+        for i, size in enumerate([(64, 48), (32, 32)]):
+            Image.new("RGB", size, (i * 80, 0, 0)).save(root / "folder_00" / f"{i}.png")
+        (root / "folder_00" / "broken.webp").write_bytes(b"not an image")
+        
+        manifest = IngestManifest(Path(tmp) / "manifest.json")
+        first = scan_roots({"사진수집현황": root}, manifest, workers=2)
+        second = scan_roots({"사진수집현황": root}, IngestManifest(Path(tmp) / "manifest.json"), workers=2)
+        
+        # 바뀐 파일만 다시 스캔
+        Image.new("RGB", (16, 8)).save(root / "folder_00" / "0.png")
+        (root / "folder_00" / "1.png").unlink()
+        third = scan_roots({"사진수집현황": root}, manifest, workers=2)
+        entry = manifest.entries["사진수집현황/folder_00/0.png"]
+        
+        print(f"✅ 스캔 {first['scanned']} -> {second['scanned']} -> {third['scanned']}, 손상 {first['corrupt']}")
+        
+        return (
+            first["scanned"] == 3 and first["corrupt"] == ["사진수집현황/folder_00/broken.webp"]
+            and second["scanned"] == 0 and third["scanned"] == 1 and third["removed"] == 1
+            and (entry["width"], entry["height"]) == (16, 8)
+            and manifest.images("사진수집현황") == ["folder_00/0.png"]
+        )
+
+def test_admission_control():
+    """공정 큐, 토큰 버킷, 비용 한도 테스트"""
+    print("\n" + "=" * 60)
+    print("14. 분석 요청 제한 테스트")
+    print("=" * 60)
+    
+    import asyncio
+    
+    # 클라이언트를 번갈아 처리
+    async def run_queue():
+        queue = AnalysisQueue(concurrency=1, max_pending=10, max_pending_per_client=3)
+        order = []
+        futures = [queue.submit(order.append, f"a{i}", client="a") for i in range(3)]
+        futures += [queue.submit(order.append, f"b{i}", client="b") for i in range(2)]
+        try:
+            queue.admit(1, client="a")
+            rejected = False
+        except QueueFull:
+            rejected = True
+        await asyncio.gather(*futures)
+        await queue.shutdown()
+        return order, rejected
+    
+    order, rejected = asyncio.run(run_queue())
+    print(f"✅ 처리 순서: {order}, 클라이언트 한도 초과 거절: {rejected}")
+    
+    # 분당 60회, 버스트 1초: 같은 시각에 3건이면 0, 0, 1초 대기
+    bucket = TokenBucket(60, burst_seconds=1.0)
+    waits = [bucket.reserve(1, now=100.0) for _ in range(3)]
+    print(f"   토큰 버킷 대기: {waits}")
+    
+    budget = CostBudget(1.0)
+    budget.charge(0.9)
+    try:
+        budget.check(0.2)
+        over_budget = False
+    except BudgetExceeded as e:
+        over_budget = e.retry_after > 0
+    
+    # 동시에 입장한 요청들의 예약 합계가 한도를 넘지 않음
+    budget = CostBudget(1.0)
+    admitted = []
+    
+    def admit():
+        try:
+            admitted.append(budget.reserve(0.3))
+        except BudgetExceeded:
+            pass
+    
+    workers = [threading.Thread(target=admit) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    reserved = len(admitted) == 3 and abs(budget.reserved - 0.9) < 1e-9 and abs(budget.remaining() - 0.1) < 1e-9
+    
+    # 요청마다 예약에서 꺼내 실제 비용으로 정산, 남은 예약은 반환
+    reservation = admitted[0]
+    reservation.take(0.2)
+    budget.settle(0.2, 0.05)
+    reservation.take(0.2)  # 예약 0.1 + 한도에서 0.1 추가 예약
+    budget.settle(0.2, 0.25)
+    for other in admitted:
+        other.release()
+        other.release()
+    settled = abs(budget.spent - 0.3) < 1e-9 and budget.reserved < 1e-9
+    try:
+        admitted[1].take(0.8)
+        overdrawn = False
+    except BudgetExceeded:
+        overdrawn = admitted[1].remaining == 0.0 and budget.reserved < 1e-9
+    print(f"   비용 예약: 8건 중 {len(admitted)}건 입장, 정산 후 사용 ${budget.spent:.2f}, 초과 요청 거절: {overdrawn}")
+    
+    return (
+        order == ["a0", "b0", "a1", "b1", "a2"] and rejected
+        and waits == [0.0, 0.0, 1.0] and over_budget
+        and reserved and settled and overdrawn
+    )
+
+def test_review_queue():
+    """검수 우선순위 큐 테스트"""
+    print("\n" + "=" * 60)
+    print("15. 검수 우선순위 큐 테스트")
+    print("=" * 60)
+    
+    import random
+    
+    rng = random.Random(3)
+    records = {
+        f"folder_09/{i}.webp": {"file_path": f"folder_09/{i}.webp", "has_step": False, "confidence": rng.random()}
+        for i in range(300)
+    }
+    # 0번과 1번은 서로 유사한 이미지
+    pairs = {"folder_09/0.webp": "folder_09/1.webp", "folder_09/1.webp": "folder_09/0.webp"}
+    queue = ReviewQueue(
+        lambda key: [(pairs[key], records[pairs[key]])] if key in pairs else []
+    )
+    for key, record in records.items():
+        queue.update(key, None, record)
+    
+    top = queue.top(10)
+    expected = sorted(records, key=lambda key: records[key]["confidence"])[:10]
+    ordered = [item["file_path"] for item in top] == expected
+    paged = top == queue.top(5) + queue.top(5, skip=5)
+    print(f"✅ 상위 10개 confidence 순: {ordered}")
+    
+    # 파싱 실패 기본값은 맨 앞, 이웃과 단차가 다르면 점수 상승
+    fallback = dict(records["folder_09/5.webp"], confidence=0.5)
+    queue.update("folder_09/5.webp", records["folder_09/5.webp"], fallback)
+    records["folder_09/0.webp"] = dict(records["folder_09/0.webp"], confidence=0.99, has_step=True)
+    queue.update("folder_09/0.webp", None, records["folder_09/0.webp"])
+    reasons = {item["file_path"]: item["reasons"] for item in queue.top(300)}
+    print(f"   맨 앞: {queue.top(1)[0]['file_path']}, 이웃 불일치: {reasons['folder_09/1.webp']}")
+    
+    queue.remove("folder_09/5.webp")
+    
+    # GT 레이블이 있는 이미지는 예측 저장소를 다시 읽어도 큐에 돌아오지 않음
+    labeled = set(expected[:3])
+    labeled_queue = ReviewQueue(exclude=labeled.__contains__)
+    with tempfile.TemporaryDirectory() as tmp:
+        predictions_path = Path(tmp) / "gpt_analysis_results.jsonl"
+        predictions_path.write_text("".join(json.dumps(record) + "\n" for record in records.values()))
+        store = PredictionStore(predictions_path, indexes=[labeled_queue])
+        store.load()
+        first = [item["file_path"] for item in labeled_queue.top(7)]
+        store.load()
+        reloaded = [item["file_path"] for item in labeled_queue.top(7)]
+    # 점수를 매긴 뒤 레이블된 이미지는 조회 시 건너뜀
+    labeled.add(expected[3])
+    served = [item["file_path"] for item in labeled_queue.top(5)]
+    excluded = (
+        first == reloaded == expected[3:10]
+        and served == expected[4:9] and len(labeled_queue) == 296
+    )
+    print(f"   GT 레이블 제외: {excluded} (조회 {served[:2]}...)")
+    
+    return (
+        ordered and paged
+        and reasons["folder_09/5.webp"] == ["fallback"]
+        and "neighbor_disagreement" in reasons["folder_09/1.webp"]
+        and len(queue) == 299 and queue.top(1)[0]["file_path"] != "folder_09/5.webp"
+        and excluded
+    )
+
+def test_label_commit():
+    """레이블 커밋 제자리 갱신 테스트"""
+    print("\n" + "=" * 60)
+    print("16. 레이블 커밋 테스트")
+    print("=" * 60)
+    
+    chair = {"has_movable_chair": True, "has_high_movable_chair": False, "has_fixed_chair": False, "has_floor_chair": False}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        gt_path = Path(tmp) / "gt.jsonl"
+        with open(gt_path, 'w', encoding='utf-8') as f:
+            for i in range(200):
+                record = {
+                    "file_path": f"2024010{i % 9 + 1}120000_photo{i}_store{i % 7}.webp",
+                    "has_step": i % 3 == 0,
+                    "width_class": ["normal"] if i % 2 else ["narrow"],
+                    "chair": chair
+                }
+                f.write(json.dumps(record) + "\n")
+        
+        manager = DataManager(gt_path)
+        manager.get_statistics()
+        manager.get_cube()
+        manager.get_store_index()
+        manager.get_time_index()
+        version = manager.version
+        
+        changed = {"file_path": "20240101120000_photo0_store0.webp", "has_step": False, "width_class": ["wide"], "chair": chair}
+        added = {"file_path": "20240301090000_photo1_store99.webp", "has_step": True, "width_class": ["narrow"], "chair": chair}
+        result = manager.commit_labels([changed, added], expected_version=version)
+        print(f"✅ 커밋: 버전 {version} -> {result['version']}, 추가 {result['created']}, 수정 {result['updated']}")
+        
+        try:
+            manager.commit_labels([changed], expected_version=version)
+            conflict = False
+        except VersionConflict:
+            conflict = True
+        
+        # 파일을 처음부터 다시 읽은 결과와 비교
+        fresh = DataManager(gt_path)
+        same = (
+            manager.get_statistics() == fresh.get_statistics()
+            and manager.get_cube().crosstab(["grade", "width_class"]) == fresh.get_cube().crosstab(["grade", "width_class"])
+            and manager.get_store_index().summaries() == fresh.get_store_index().summaries()
+            and manager.get_time_index().rollup("day") == fresh.get_time_index().rollup("day")
+            and manager.find_by_path(changed["file_path"]) == changed
+        )
+        print(f"   재로딩 결과와 일치: {same}, 버전 충돌 감지: {conflict}")
+        
+        # 분석 결과에서 승격한 레이블은 그 출처의 검수 큐에서만 제외 (다른 출처의 같은 경로는 별개 이미지)
+        promoted = dict(added, file_path="folder_01/promoted.webp", source="검수대상목록")
+        manager.commit_labels([promoted])
+        scoped = (
+            manager.has_label(promoted["file_path"])
+            and manager.has_label(promoted["file_path"], "검수대상목록")
+            and not manager.has_label(promoted["file_path"], "사진수집현황")
+            and not manager.has_label(changed["file_path"], "검수대상목록")
+        )
+        print(f"   출처별 레이블 제외: {scoped}")
+        
+        # 커밋 API 이전부터 있던 중복 줄도 나중 줄이 대체 (file_path 당 한 레코드)
+        legacy_path = Path(tmp) / "legacy.jsonl"
+        first = {"file_path": "a.webp", "has_step": True, "width_class": ["narrow"], "chair": chair}
+        second = {"file_path": "b.webp", "has_step": False, "width_class": ["wide"], "chair": chair}
+        again = dict(first, has_step=False, width_class=["wide"])
+        legacy_path.write_text("".join(json.dumps(record) + "\n" for record in [first, second, again]))
+        legacy = DataManager(legacy_path)
+        deduplicated = (
+            legacy.load_all_data() == [again, second]
+            and legacy.get_statistics()["total_images"] == 2
+            and legacy.find_by_path("a.webp") == again
+        )
+        print(f"   기존 중복 줄 처리 (3줄 → {len(legacy.load_all_data())}개, 마지막 줄 유지): {deduplicated}")
+        
+        return same and conflict and scoped and result["created"] == 1 and len(fresh.load_all_data()) == 201 and deduplicated
+
+def test_change_log():
+    """변경 순번 델타 동기화 테스트"""
+    print("\n" + "=" * 60)
+    print("17. 델타 동기화 테스트")
+    print("=" * 60)
+    
+    def label(i: int, has_step: bool = False) -> dict:
+        return {"file_path": f"{i}.png", "has_step": has_step, "width_class": ["normal"], "chair": {}}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        gt_path = Path(tmp) / "gt.jsonl"
+        with open(gt_path, 'w', encoding='utf-8') as f:
+            for i in range(50):
+                f.write(json.dumps(label(i)) + "\n")
+        
+        manager = DataManager(gt_path)
+        manager.get_statistics()
+        manager.get_store_index()
+        log = ChangeLog(gt_path)
+        since = log.load()
+        
+        manager.commit_labels([label(3, True), label(50)])
+        manager.commit_labels([label(3)], removed=["7.png", "8.png"])
+        delta = log.changes(since)
+        upserts = sorted(record["file_path"] for record in delta["upserts"])
+        print(f"✅ seq {since} 이후: 추가·수정 {upserts}, 삭제 {delta['removed']}")
+        
+        # 페이지 단위로 이어받기
+        first = log.changes(since, limit=1)
+        rest = log.changes(first["seq"])
+        paged = len(first["upserts"]) + len(rest["upserts"]) == 2 and first["more"] and not rest["more"]
+        
+        # 삭제 후 메모리 순서와 재파싱 순서 일치
+        same_order = manager.load_all_data() == DataManager(gt_path).load_all_data()
+        
+        summary = manager.compact_log()
+        stale = log.changes(since)
+        full = log.changes(stale["base_seq"])
+        print(f"   압축 {summary['lines_before']} -> {summary['lines_after']}줄, 이전 순번 resync: {stale['resync']}")
+        compacted = (
+            full["upserts"] == manager.load_all_data() and full["seq"] > delta["seq"]
+            and manager.get_statistics() == DataManager(gt_path).get_statistics()
+        )
+        
+        # 압축 중 파싱하는 동안에도 커밋은 막히지 않고, 그 사이 추가된 줄은 압축 결과 뒤에 남음
+        manager.commit_labels([label(3, True)])
+        parse_log = manager._parse_log
+        during = []
+        
+        def parse_while_committing(path, end=None):
+            result = parse_log(path, end)
+            committer = threading.Thread(target=lambda: during.append(
+                manager.commit_labels([label(4, True), label(61)], removed=["9.png"])
+            ))
+            committer.start()
+            committer.join(timeout=5)
+            return result
+        
+        manager._parse_log = parse_while_committing
+        try:
+            summary = manager.compact_log()
+        finally:
+            manager._parse_log = parse_log
+        reparsed = DataManager(gt_path)
+        concurrent = (
+            len(during) == 1
+            and summary["lines_after"] == len(manager.load_all_data()) + 3
+            and reparsed.load_all_data() == manager.load_all_data()
+            and reparsed.get_statistics() == manager.get_statistics()
+        )
+        print(f"   압축 중 커밋 비차단·보존: {concurrent} ({summary['lines_before']} -> {summary['lines_after']}줄)")
+        
+        return (
+            upserts == ["3.png", "50.png"] and delta["removed"] == ["7.png", "8.png"]
+            and paged and same_order and stale["resync"]
+            and compacted and concurrent
+        )
+
+def test_projection():
+    """목록 응답 필드 선택 테스트"""
+    print("\n" + "=" * 60)
+    print("18. 응답 필드 선택 테스트")
+    print("=" * 60)
+    
+    manager = DataManager(settings.GT_JSONL_PATH)
+    item = {"file_path": "1.png", "has_step": True, "width_class": ["narrow"], "chair": {"has_movable_chair": True}}
+    fields = parse_fields("file_path, grade,score,grade", IMAGE_FIELDS)
+    row = project_record(item, fields, manager.calculate_accessibility_score)
+    score = manager.calculate_accessibility_score(item)
+    compact = shape_rows([row], fields, "compact")
+    objects = shape_rows([row], fields, "objects")
+    print(f"✅ fields={fields}: {compact}")
+    
+    try:
+        parse_fields("file_path,password", IMAGE_FIELDS)
+        rejected = False
+    except ValueError:
+        rejected = True
+    
+    return (
+        fields == ["file_path", "grade", "score"]
+        and compact == {"fields": fields, "rows": [["1.png", score["grade"], score["score"]]]}
+        and objects["items"][0] == {"file_path": "1.png", "grade": score["grade"], "score": score["score"]}
+        and rejected and "accessibility" not in item
+    )
+
+def test_image_details():
+    """이미지 상세 및 추천 템플릿 테스트"""
+    print("\n" + "=" * 60)
+    print("19. 이미지 상세 일괄 조회 테스트")
+    print("=" * 60)
+    
+    manager = DataManager(settings.GT_JSONL_PATH)
+    items = [
+        {"file_path": f"{i}.png", "has_step": i % 2 == 0, "width_class": ["narrow"], "chair": {}}
+        for i in range(4)
+    ]
+    details = [image_detail(item, manager.calculate_accessibility_score) for item in items]
+    titles = [[rec["title"] for rec in detail["recommendations"]] for detail in details]
+    print(f"✅ 추천: {titles[0]}")
+    
+    # 같은 규칙의 추천은 같은 객체를 공유하고 원본 레코드는 수정하지 않음
+    shared = details[0]["recommendations"][-1] is details[1]["recommendations"][-1]
+    untouched = all("recommendations" not in item and "accessibility" not in item for item in items)
+    print(f"   템플릿 공유: {shared}, 원본 유지: {untouched}")
+    
+    return (
+        shared and untouched and len(titles[0]) == 3 and len(titles[1]) == 2
+        and build_recommendations({"has_step": False, "width_class": ["wide"], "chair": {"has_movable_chair": True}}) == []
+    )
+
+def test_gt_shards():
+    """GT 파티션 로드·집계 병합·커밋 테스트"""
+    print("\n" + "=" * 60)
+    print("20. GT 파티션 테스트")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_dir = Path(tmp) / "shards"
+        shard_dir.mkdir()
+        gt_path = Path(tmp) / "gt.jsonl"
+        records = [
+            {
+                "file_path": f"batch_{'ab'[i % 2]}/photo{i}.webp",
+                "has_step": i % 3 == 0,
+                "width_class": [["narrow", "normal", "wide"][i % 3]],
+                "chair": {"has_movable_chair": i % 4 == 0, "has_fixed_chair": i % 5 == 0}
+            }
+            for i in range(120)
+        ]
+        with open(gt_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        for record in records:
+            with open(shard_dir / f"{shard_key(record['file_path'])}.jsonl", 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        
+        manager = DataManager(gt_path, shard_dir=shard_dir, shard_workers=2)
+        merged = manager.get_statistics() == DataManager(gt_path).get_statistics()
+        page = manager.get_images(limit=100, shards=["batch_a"])
+        pruned = page["total"] == 60 and all(item["file_path"].startswith("batch_a/") for item in page["items"])
+        print(f"✅ 샤드 {[s['name'] for s in manager.shard_summaries()]}, 병합 통계 일치: {merged}, 샤드 조회: {pruned}")
+        
+        manager.get_time_index()
+        changed = dict(records[0], has_step=False, width_class=["wide"])
+        added = {"file_path": "batch_c/new.webp", "has_step": True, "width_class": ["narrow"], "chair": {}}
+        manager.commit_labels([changed, added], removed=["batch_b/photo1.webp"])
+        
+        # 샤드 파일을 다시 읽은 결과와 비교
+        fresh = DataManager(gt_path, shard_dir=shard_dir)
+        names = ["batch_a", "batch_b", "batch_c"]
+        same = manager.get_statistics() == fresh.get_statistics() and all(
+            manager.get_statistics(shards=[name]) == fresh.get_statistics(shards=[name])
+            and sorted(item["file_path"] for item in manager.get_images(limit=100, shards=[name])["items"])
+            == sorted(item["file_path"] for item in fresh.get_images(limit=100, shards=[name])["items"])
+            for name in names
+        )
+        print(f"   커밋 후 재로딩 결과와 일치: {same}, 샤드 파일: {sorted(p.name for p in shard_dir.iterdir())}")
+        
+        try:
+            manager.get_images(shards=["missing"])
+            unknown = False
+        except ValueError:
+            unknown = True
+        
+        return merged and pruned and same and unknown and fresh.get_statistics()["total_images"] == 120
+
+def test_jsonl_reader():
+    """JSONL 청크 병렬 파싱 테스트"""
+    print("\n" + "=" * 60)
+    print("21. JSONL 병렬 파싱 테스트")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "gt.jsonl"
+        bad_lines = {57, 300, 777}
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(1, 1001):
+                if i in bad_lines:
+                    f.write('{"file_path": broken\n')
+                elif i % 250 == 0:
+                    f.write("\n")
+                else:
+                    f.write(json.dumps({"file_path": f"{i}.png", "has_step": i % 2 == 0}) + "\n")
+            f.write('{"file_path": "partial')
+        
+        errors = {}
+        def collect(mode):
+            return lambda line_num, message: errors.setdefault(mode, []).append(line_num)
+        
+        serial, serial_end, serial_lines = read_jsonl(path, on_error=collect("serial"), workers=1)
+        parallel, _, parallel_lines = read_jsonl(
+            path, on_error=collect("parallel"), workers=2, min_parallel_bytes=0, chunk_bytes=4096
+        )
+        pool = jsonl_reader._pools.get(2)
+        chunks = len(chunk_ranges(path, 0, serial_end, 4096))
+        print(f"✅ 청크 {chunks}개, 레코드 {len(parallel)}개, 오류 줄: {errors.get('parallel')}")
+        
+        same = parallel == serial and parallel_lines == serial_lines == 1001
+        exact = errors.get("serial") == errors.get("parallel") == sorted(bad_lines | {1001})
+        
+        # 기록 중인 마지막 줄은 제외하고 이어 읽기
+        head, end, lines = read_jsonl(path, complete_lines=True, workers=2, min_parallel_bytes=0, chunk_bytes=4096)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('.png"}\n')
+        tail, _, tail_lines = read_jsonl(path, end, complete_lines=True, first_line=lines + 1)
+        resumed = len(head) == len(serial) and lines == 1000 and tail == [{"file_path": "partial.png"}]
+        # 병렬 로드마다 워커를 새로 띄우지 않고 같은 풀 재사용
+        reused = pool is not None and jsonl_reader._pools.get(2) is pool
+        print(f"   순서 일치: {same}, 줄 번호 일치: {exact}, 이어 읽기: {resumed}, 풀 재사용: {reused}")
+        
+        # 단일 프로세스도 구간 전체를 한 번에 읽지 않고 블록 단위로 파싱
+        original = jsonl_reader.SERIAL_CHUNK_BYTES
+        jsonl_reader.SERIAL_CHUNK_BYTES = 4096
+        try:
+            blocks, _, block_lines = read_jsonl(path, on_error=collect("blocks"), workers=1)
+        finally:
+            jsonl_reader.SERIAL_CHUNK_BYTES = original
+        streamed = blocks == serial + [{"file_path": "partial.png"}] and block_lines == 1001 and errors["blocks"] == sorted(bad_lines)
+        # 스레드가 있는 서버에서 fork 하지 않음
+        start_method = jsonl_reader._mp_context().get_start_method()
+        print(f"   블록 단위 단일 파싱: {streamed}, 워커 시작 방식: {start_method}")
+        
+        return chunks > 1 and same and exact and resumed and reused and streamed and start_method != "fork"
+
+def test_batch_shards():
+    """일괄 분석 샤드 분할·임대·병합 테스트"""
+    print("\n" + "=" * 60)
+    print("22. 일괄 분석 샤드 테스트")
+    print("=" * 60)
+    
+    paths = [f"batch_{i % 3}/{i}.webp" for i in range(300)]
+    assignments = [shard_of(path, 4) for path in paths]
+    balanced = all(50 <= assignments.count(index) <= 100 for index in range(4))
+    stable = assignments == [shard_of(path, 4) for path in paths] and parse_shard("3/4") == (3, 4)
+    print(f"✅ 샤드별 이미지 수: {[assignments.count(index) for index in range(4)]}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        lease_dir = Path(tmp) / "leases"
+        first = ShardLease(lease_dir, 0, 2, timeout=0.2, heartbeat=60)
+        second = ShardLease(lease_dir, 0, 2, timeout=0.2, heartbeat=60)
+        exclusive = first.acquire() and not second.acquire()
+        
+        # 하트비트가 끊긴 임대는 다른 노드가 넘겨받고, 원래 노드는 임대를 잃음
+        time.sleep(0.3)
+        takeover = second.acquire() and not first.holds()
+        second.release(done=True)
+        finished = second.done and not ShardLease(lease_dir, 0, 2).acquire()
+        print(f"   배타 임대: {exclusive}, 만료 임대 인계: {takeover}, 완료 후 재처리 안 함: {finished}")
+        
+        # 샤드 결과 병합 (기존 결과 + 샤드 결과, file_path 당 한 줄)
+        output = Path(tmp) / "gpt_analysis_results.jsonl"
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"file_path": "batch_0/0.webp", "confidence": 0.1}) + "\n")
+        for index in range(2):
+            with open(shard_output_path(output, index, 2), 'w', encoding='utf-8') as f:
+                for path in paths[:20]:
+                    if shard_of(path, 2) == index:
+                        f.write(json.dumps({"file_path": path, "confidence": 0.9}) + "\n")
+        resumed = len(completed_paths(shard_output_path(output, 0, 2))) == sum(
+            1 for path in paths[:20] if shard_of(path, 2) == 0
+        )
+        merge_shard_outputs(output, 2)
+        with open(output, 'r', encoding='utf-8') as f:
+            merged = [json.loads(line) for line in f]
+        deduplicated = len(merged) == 20 and all(record["confidence"] == 0.9 for record in merged)
+        print(f"   이어서 처리할 목록: {resumed}, 병합 결과 {len(merged)}줄 (중복 제거: {deduplicated})")
+        
+        return balanced and stable and exclusive and takeover and finished and resumed and deduplicated
+
+def test_query_cache():
+    """목록 조회 결과 캐시 테스트"""
+    print("\n" + "=" * 60)
+    print("23. 목록 조회 캐시 테스트")
+    print("=" * 60)
+    
+    same_key = normalize_query({"skip": 0, "limit": 12, "has_step": None}) == normalize_query({"limit": 12, "skip": 0})
+    
+    cache = QueryCache(max_entries=3, max_bytes=100)
+    for i in range(4):
+        cache.put(1, ("page", i), b"x" * 10)
+    lru = cache.get(1, ("page", 0)) is None and cache.get(1, ("page", 3)) == b"x" * 10
+    
+    cache.put(1, ("big",), b"x" * 60)
+    cache.put(1, ("big2",), b"x" * 60)
+    bounded = cache.stats()["bytes"] <= 100 and cache.get(1, ("big",)) is None
+    print(f"✅ 키 정규화: {same_key}, LRU 제거: {lru}, 바이트 제한: {bounded}")
+    
+    # 버전이 바뀌면 이전 항목은 적중하지 않고, 이전 버전으로 계산한 본문은 저장하지 않음
+    cache.get(2, ("page", 3))
+    cache.put(1, ("stale",), b"old")
+    invalidated = len(cache) == 0 and cache.get(2, ("stale",)) is None
+    stats = cache.stats()
+    print(f"   버전 무효화: {invalidated}, 적중 {stats['hits']} / 미스 {stats['misses']} (적중률 {stats['hit_rate']})")
+    
+    return same_key and lru and bounded and invalidated and stats["invalidations"] == 1 and stats["hits"] == 1
+
+def test_single_flight():
+    """콜드 로드 단일 실행 테스트"""
+    print("\n" + "=" * 60)
+    print("24. 콜드 로드 단일 실행 테스트")
+    print("=" * 60)
+    
+    calls = []
+    
+    def slow_load(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value * 2
+    
+    async def burst():
+        flight = SingleFlight()
+        # 동시 요청 10개 → 로드 1회, 완료 후에는 다시 실행
+        results = await asyncio.gather(*(flight.run("gt", slow_load, 21) for _ in range(10)))
+        again = await flight.run("gt", slow_load, 1)
+        return flight, results, again
+    
+    flight, results, again = asyncio.run(burst())
+    coalesced = results == [42] * 10 and again == 2 and calls == [21, 1] and flight.shared == 9 and len(flight) == 0
+    print(f"✅ 동시 요청 10개 → 실행 {calls.count(21)}회 (공유 {flight.shared}), 결과 일치: {coalesced}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        gt_path = Path(tmp) / "gt.jsonl"
+        with open(gt_path, 'w', encoding='utf-8') as f:
+            for i in range(100):
+                f.write(json.dumps({"file_path": f"photo{i}.webp", "has_step": i % 2 == 0, "width_class": ["normal"], "chair": {}}) + "\n")
+        
+        manager = DataManager(gt_path)
+        parse_file = manager._parse_file
+        parses = []
+        
+        def counting_parse(*args):
+            parses.append(1)
+            time.sleep(0.05)
+            return parse_file(*args)
+        
+        manager._parse_file = counting_parse
+        # 스레드(워밍업·I/O 풀)에서 동시에 콜드 로드해도 파싱은 한 번
+        threads = [threading.Thread(target=manager.get_store_index) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        loaded_once = len(parses) == 1 and manager.is_warm("dataset") and manager.is_warm("store_index")
+        print(f"   스레드 8개 동시 로드 → 파싱 {len(parses)}회, 준비됨: {loaded_once}")
+        
+        # 파일 기록(스레드)과 메모리 반영(이벤트 루프)을 나눠도 결과 동일
+        pending = manager.write_labels([{"file_path": "photo100.webp", "has_step": True, "width_class": ["wide"], "chair": {}}])
+        unchanged = manager.version == 1 and len(manager.load_all_data()) == 100
+        result = manager.apply_labels(pending)
+        applied = unchanged and result["version"] == 2 and len(manager.load_all_data()) == 101
+        consistent = applied and manager.get_statistics()["total_images"] == len(DataManager(gt_path).load_all_data())
+        print(f"   기록 후 반영 전 버전 유지: {unchanged}, 반영 후 파일과 일치: {consistent}")
+        
+        # 읽기 잠금을 잡고 있는 동안 커밋의 제자리 갱신은 기다림
+        pending = manager.write_labels([{"file_path": "photo101.webp", "has_step": False, "width_class": ["wide"], "chair": {}}])
+        applied = []
+        with manager.reading():
+            applier = threading.Thread(target=lambda: applied.append(manager.apply_labels(pending)))
+            applier.start()
+            applier.join(timeout=0.2)
+            blocked = applier.is_alive() and len(manager.load_all_data()) == 101
+        applier.join(timeout=5)
+        guarded = blocked and len(applied) == 1 and len(manager.load_all_data()) == 102
+        print(f"   읽는 동안 제자리 갱신 대기: {guarded}")
+        
+        # 교체·압축된 분석 결과 파일은 이벤트 루프 밖에서 다시 읽고, 추가분만 루프에서 이어 읽음
+        import backend.api.main as api
+        
+        class ThreadRecorder:
+            def __init__(self):
+                self.threads = []
+            
+            def clear(self):
+                self.threads.append(("reload", threading.get_ident()))
+            
+            def update(self, key, old_record, record):
+                self.threads.append(("update", threading.get_ident()))
+        
+        predictions_path = Path(tmp) / "gpt_analysis_results.jsonl"
+        recorder = ThreadRecorder()
+        store = PredictionStore(predictions_path, indexes=[recorder])
+        writer = JsonlWriter(predictions_path)
+        writer.write_many([{"file_path": f"folder_00/{i}.webp", "confidence": 0.9} for i in range(20)]).result()
+        
+        async def load_and_refresh():
+            loop_thread = threading.get_ident()
+            await api.ensure_predictions(store)
+            writer.write({"file_path": "folder_00/20.webp", "confidence": 0.4}).result()
+            appended_stale = store.stale()
+            await api.ensure_predictions(store)
+            compact_prediction_log(predictions_path)
+            compacted_stale = store.stale()
+            await api.ensure_predictions(store)
+            return loop_thread, appended_stale, compacted_stale
+        
+        loop_thread, appended_stale, compacted_stale = asyncio.run(load_and_refresh())
+        writer.close()
+        reload_threads = [thread for kind, thread in recorder.threads if kind == "reload"]
+        index_threads = {thread for _, thread in recorder.threads}
+        off_loop = (
+            len(reload_threads) == 2 and loop_thread not in index_threads
+            and not appended_stale and compacted_stale and not store.stale() and len(store) == 21
+        )
+        print(f"   분석 결과 재로딩 {len(reload_threads)}회·추가분 이어 읽기 모두 루프 밖: {off_loop}")
+        
+        # 커밋 후 갤러리 미리 계산도 이벤트 루프 밖에서, 몰린 커밋은 작업 하나가 최신 버전만 계산
+        rendered = []
+        fake_manager = SimpleNamespace(version=1)
+        pages = len(api.PREWARM_IMAGE_QUERIES) * len(api.PREWARM_PAGE_SIZES)
+        
+        def fake_render(query, version=None):
+            rendered.append((threading.get_ident(), version))
+            if len(rendered) == 3:
+                # 미리 계산하는 도중 커밋이 들어옴
+                fake_manager.version = 2
+        
+        original = (api.render_images, api.data_manager, settings.IMAGE_CACHE_PREWARM, api.prewarmed_version)
+        api.render_images, api.data_manager = fake_render, fake_manager
+        settings.IMAGE_CACHE_PREWARM = True
+        
+        async def prewarm():
+            # 커밋 5건의 백그라운드 작업이 동시에 시작
+            await asyncio.gather(*(api.prewarm_images_after_commit() for _ in range(5)))
+            await api.prewarm_images_after_commit()
+            return threading.get_ident()
+        
+        try:
+            loop_thread = asyncio.run(prewarm())
+        finally:
+            api.render_images, api.data_manager, settings.IMAGE_CACHE_PREWARM, api.prewarmed_version = original
+        versions = [version for _, version in rendered]
+        prewarmed = (
+            versions == [1, 1, 1] + [2] * pages
+            and loop_thread not in {thread for thread, _ in rendered}
+        )
+        print(f"   커밋 후 미리 계산 {len(rendered)}건 (버전 1 중단 3건 + 최신 버전 {pages}건), 루프 밖 실행: {prewarmed}")
+    
+    return coalesced and loaded_once and consistent and guarded and off_loop and prewarmed
+
+def test_score_sketch():
+    """점수 분포 스케치 테스트"""
+    print("\n" + "=" * 60)
+    print("25. 점수 분포 스케치 테스트")
+    print("=" * 60)
+    
+    rng = random.Random(7)
+    scores = [rng.choice([100, 90, 80, 70, 60, 50, 45, 30, 0]) for _ in range(1001)]
+    
+    whole = ScoreSketch()
+    whole.update(scores)
+    exact = (
+        whole.median() == statistics.median(scores)
+        and whole.mean() == statistics.mean(scores)
+        and [whole.quantile(q / 4) for q in (1, 3)] == statistics.quantiles(scores, n=4, method='inclusive')[::2]
+    )
+    even = ScoreSketch()
+    even.update(scores[:-1])
+    exact = exact and even.median() == statistics.median(scores[:-1])
+    print(f"✅ 중간값·평균·사분위수가 전체 목록 계산과 일치: {exact}")
+    
+    # 청크별 스케치를 합쳐도 한 번에 센 것과 같음
+    merged = ScoreSketch()
+    for start in range(0, len(scores), 100):
+        chunk = ScoreSketch()
+        chunk.update(scores[start:start + 100])
+        merged.merge(chunk)
+    mergeable = merged.counts == whole.counts and merged.percentiles() == whole.percentiles()
+    print(f"   청크 11개 병합 결과 일치: {mergeable}, 메모리 {len(whole.counts)}칸")
+    
+    try:
+        whole.add(105)
+        rejected = False
+    except ValueError:
+        rejected = True
+    print(f"   범위 밖 점수 거부: {rejected}")
+    
+    return exact and mergeable and rejected
+
+def test_warmup():
+    """워밍업 재시도·레디니스 테스트"""
+    print("\n" + "=" * 60)
+    print("26. 워밍업 테스트")
+    print("=" * 60)
+    
+    from fastapi.testclient import TestClient
+    import backend.api.main as api
+    
+    failures = {"flaky": 2}
+    
+    def flaky():
+        if failures["flaky"] > 0:
+            failures["flaky"] -= 1
+            raise OSError("not mounted yet")
+    
+    def broken():
+        raise RuntimeError("no images")
+    
+    warmup = Warmup(max_attempts=3, backoff=0.01)
+    warmup.register("dataset", lambda: None)
+    warmup.register("flaky", flaky)
+    warmup.register("phash_index", broken, required=False)
+    
+    client = TestClient(api.app)
+    original = api.warmup
+    api.warmup = warmup
+    try:
+        pending = client.get("/api/ready").status_code
+        warmup.run()
+        ready = client.get("/api/ready")
+    finally:
+        api.warmup = original
+    progress = ready.json()
+    # 실패한 단계는 재시도해 준비 상태가 되고, 선택 단계 실패는 레디니스를 막지 않음
+    recovered = (
+        pending == 503 and ready.status_code == 200
+        and progress["retries"] == {"flaky": 2, "phash_index": 2}
+        and "phash_index" in progress["background_errors"] and progress["error"] is None
+    )
+    print(f"✅ 503 → 재시도 {progress['retries']} → 200, 선택 단계 오류: {progress['background_errors']}")
+    
+    limited = Warmup(max_attempts=2, backoff=0.01)
+    limited.register("dataset", broken)
+    limited.register("statistics", lambda: None)
+    limited.run()
+    failed = limited.status == "failed" and limited.progress()["completed_steps"] == 0 and "no images" in limited.error
+    print(f"   최대 시도 후 실패 보고: {failed} ({limited.error})")
+    
+    return recovered and failed
+
+def test_logging():
+    """구조화 로깅 테스트"""
+    print("\n" + "=" * 60)
+    print("27. 구조화 로깅 테스트")
+    print("=" * 60)
+    
+    root = logging.getLogger()
+    level, handlers = root.level, list(root.handlers)
+    # 모듈을 가져오기만 해서는 루트 로거를 바꾸지 않음
+    untouched = log_config._listener is None and not any(
+        isinstance(handler, log_config.NonBlockingQueueHandler) for handler in handlers
+    )
+    try:
+        log_config.configure_logging()
+        log_config.configure_logging()
+        added = [handler for handler in root.handlers if handler not in handlers]
+        configured_once = len(added) == 1 and isinstance(added[0], log_config.NonBlockingQueueHandler)
+    finally:
+        log_config.shutdown_logging()
+        root.setLevel(level)
+    restored = root.handlers == handlers and log_config._listener is None
+    print(f"✅ import 시 미구성: {untouched}, 두 번 호출해도 핸들러 1개: {configured_once}, 종료 후 복원: {restored}")
+    
+    # 샘플링: INFO 는 비율만큼, WARNING 이상은 항상 통과 (하위 로거에 상속)
+    rng_state = random.getstate()
+    random.seed(11)
+    log_config.set_sample_rate("test.sampled", 0.25)
+    try:
+        sampler = log_config.SamplingFilter()
+        child = logging.getLogger("test.sampled.child")
+        kept = sum(
+            sampler.filter(child.makeRecord(child.name, logging.INFO, __file__, 0, "msg", (), None))
+            for _ in range(4000)
+        )
+        warnings_kept = all(
+            sampler.filter(child.makeRecord(child.name, logging.WARNING, __file__, 0, "msg", (), None))
+            for _ in range(100)
+        )
+    finally:
+        del log_config._sample_rates["test.sampled"]
+        random.setstate(rng_state)
+    sampled = 800 < kept < 1200 and warnings_kept
+    print(f"   샘플링 25%: INFO {kept}/4000 통과, WARNING 전부 통과: {warnings_kept}")
+    
+    # 요청 ID: 요청 컨텍스트에서 기록하고 다른 스레드(리스너)에서 포맷해도 유지
+    handler = log_config.NonBlockingQueueHandler(queue.Queue())
+    handler.addFilter(log_config.RequestContextFilter())
+    request_logger = logging.getLogger("test.request")
+    request_logger.addHandler(handler)
+    request_logger.propagate = False
+    request_logger.setLevel(logging.INFO)
+    try:
+        token = log_config.request_id_var.set("req-42")
+        request_logger.info("in request", extra={"duration_ms": 3})
+        log_config.request_id_var.reset(token)
+        request_logger.info("outside request")
+    finally:
+        request_logger.removeHandler(handler)
+    formatted = []
+    listener = threading.Thread(
+        target=lambda: formatted.extend(
+            json.loads(log_config.JsonFormatter().format(handler.queue.get())) for _ in range(2)
+        )
+    )
+    listener.start()
+    listener.join()
+    propagated = (
+        formatted[0].get("request_id") == "req-42" and formatted[0].get("duration_ms") == 3
+        and "request_id" not in formatted[1]
+    )
+    print(f"   요청 ID 전파: {formatted[0].get('request_id')}, 요청 밖 기록에는 없음: {'request_id' not in formatted[1]}")
+    
+    return untouched and configured_once and restored and sampled and propagated
+
+class FakeVisionClient:
+    """GPT 응답을 순서대로 돌려주는 가짜 OpenAI 클라이언트 (예외 객체면 발생)"""
+    
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    def _create(self, messages, **kwargs):
+        images = sum(1 for part in messages[0]["content"] if part["type"] == "image_url")
+        self.requests.append(images)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        content = reply if isinstance(reply, str) else json.dumps(reply)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=100 * images, completion_tokens=50, total_tokens=100 * images + 50)
+        )
+
+
+def test_packed_analysis():
+    """묶음 분석 검증·단건 재시도 테스트"""
+    print("\n" + "=" * 60)
+    print("28. 묶음 분석 테스트")
+    print("=" * 60)
+    
+    chair = {"has_movable_chair": True, "has_high_movable_chair": False, "has_fixed_chair": False, "has_floor_chair": False}
+    
+    def label(index, **overrides):
+        return {"index": index, "has_step": False, "width_class": ["wide"], "chair": chair, "confidence": 0.9, **overrides}
+    
+    single = {"has_step": True, "width_class": ["narrow"], "chair": chair, "confidence": 0.8}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        images = []
+        for i in range(4):
+            path = Path(tmp) / f"img{i}.webp"
+            path.write_bytes(b"RIFF0000WEBP" + bytes([i]))
+            images.append((path, "batch_1"))
+        
+        # 1번 정상, 1번 중복, 2번 누락, 3번 형식 오류, 4번 bool·범위 밖 번호만 있음
+        client = FakeVisionClient([[
+            label(1),
+            label(1, has_step=True),
+            label(3, width_class=["huge"]),
+            label(True),
+            label(0),
+            label(5),
+            "not an object"
+        ]])
+        slots = analyze_images_packed(client, images)
+        validated = (
+            slots[0] is not None and slots[0]["has_step"] is False and slots[0]["file_path"] == "batch_1/img0.webp"
+            and slots[1:] == [None, None, None]
+        )
+        print(f"✅ 슬롯 검증: {['ok' if slot else None for slot in slots]}")
+        
+        malformed = analyze_images_packed(FakeVisionClient(["```json\n[{broken\n```"]), images[:2]) == [None, None]
+        
+        # 묶음에서 빠진 슬롯은 단건 요청으로 다시 분석 (단건 JSON 오류는 기본값)
+        metrics = AnalysisMetrics()
+        client = FakeVisionClient([[label(1), label(2, chair={"has_movable_chair": "yes"})], single, "oops"])
+        outcomes = analyze_batch(client, images[:3], pack_size=3, metrics=metrics)
+        summary = metrics.summary()
+        fallback = (
+            client.requests == [3, 1, 1]
+            and [result["has_step"] for _, _, result, _ in outcomes] == [False, True, False]
+            and outcomes[2][2]["confidence"] == 0.5
+            and summary["images"] == 3 and summary["fallbacks"] == 2 and summary["api_calls"] == 3
+        )
+        print(f"   묶음 1회 + 단건 재시도 {summary['fallbacks']}회, 요청별 이미지 수 {client.requests}, JSON 오류 응답 처리: {malformed}")
+        
+        # 묶음 요청 자체가 실패하면 모두 단건으로, 단건 오류는 결과 대신 오류로 반환
+        client = FakeVisionClient([RuntimeError("502"), single, RuntimeError("timeout")])
+        outcomes = analyze_batch(client, images[:2], pack_size=2)
+        packed_failure = (
+            client.requests == [2, 1, 1]
+            and outcomes[0][2] is not None and outcomes[1][2] is None and outcomes[1][3] == "timeout"
+        )
+        print(f"   묶음 요청 실패 → 단건 재시도: {packed_failure}")
+    
+    # 워커 스레드가 공유해도 집계가 맞음
+    metrics = AnalysisMetrics()
+    response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1))
+    workers = [
+        threading.Thread(target=lambda: [(metrics.record(response, 1), metrics.count(fallbacks=1)) for _ in range(2000)])
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    summary = metrics.summary()
+    thread_safe = summary["images"] == summary["fallbacks"] == summary["api_calls"] == summary["prompt_tokens"] == 8000
+    print(f"   스레드 4개 × 2000회 집계: {summary['api_calls']} (정확: {thread_safe})")
+    
+    return validated and malformed and fallback and packed_failure and thread_safe
+
+def multipart_body(parts, boundary="testboundary"):
+    """(필드 이름, 파일명, Content-Type, 내용) 목록으로 multipart 본문 생성"""
+    body = b""
+    for name, filename, content_type, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n".encode()
+        if content_type:
+            body += f"Content-Type: {content_type}\r\n".encode()
+        body += b"\r\n" + data + b"\r\n"
+    return f"multipart/form-data; boundary={boundary}", body + f"--{boundary}--\r\n".encode()
+
+
+def test_streaming_upload():
+    """스트리밍 업로드 검사·저장 테스트"""
+    print("\n" + "=" * 60)
+    print("29. 스트리밍 업로드 테스트")
+    print("=" * 60)
+    
+    png = b"\x89PNG\r\n\x1a\n" + bytes(range(92))
+    jpeg = b"\xff\xd8\xff\xe0" + b"J" * 60
+    
+    def upload(batch_dir, parts, chunk_size, max_file_bytes=100):
+        saved = []
+        content_type, body = multipart_body(parts)
+        streaming = StreamingImageUpload(content_type, batch_dir, max_file_bytes, saved.append)
+        for i in range(0, len(body), chunk_size):
+            streaming.feed(body[i:i + chunk_size])
+        streaming.finish()
+        return {info["filename"]: info for info in streaming.files}, saved
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_dir = Path(tmp) / "batch_upload"
+        files, saved = upload(batch_dir, [
+            ("note", None, None, b"form field"),
+            ("files", "anim.gif", "image/gif", b"GIF89a" + b"x" * 10),
+            ("files", "text.png", "text/plain", png),
+            ("files", "fake.png", "image/png", b"this is not an image at all"),
+            ("files", "tiny.webp", "image/webp", b"RIFF"),
+            ("files", "big.png", "image/png", png + b"!"),
+            ("files", "edge.png", "image/png", png),
+            ("files", "../../photo.jpg", "image/jpeg", jpeg)
+        ], chunk_size=7)
+        
+        # 확장자·Content-Type 은 본문 전에, 매직 바이트·크기는 청크 경계와 무관하게 거절
+        rejected = {name for name, info in files.items() if info["status"] == "rejected"}
+        validated = rejected == {"anim.gif", "text.png", "fake.png", "tiny.webp", "big.png"} and "note" not in files
+        print(f"✅ 거절: {sorted(rejected)}")
+        
+        # 1~7바이트 청크로 받아도 파일 내용·해시가 그대로 저장됨
+        stored = (
+            [info["filename"] for info in saved] == ["edge.png", "photo.jpg"]
+            and (batch_dir / "edge.png").read_bytes() == png
+            and (batch_dir / "photo.jpg").read_bytes() == jpeg
+            and files["photo.jpg"]["size"] == len(jpeg)
+            and files["edge.png"]["file_path"] == "batch_upload/edge.png"
+            and not list(batch_dir.glob(".upload-*"))
+        )
+        _, one_byte = upload(Path(tmp) / "batch_bytes", [("files", "edge.png", "image/png", png)], chunk_size=1)
+        stored = stored and len(one_byte) == 1 and (Path(tmp) / "batch_bytes" / "edge.png").read_bytes() == png
+        print(f"   작은 청크 저장: {stored} (임시 파일 남음: {bool(list(batch_dir.glob('.upload-*')))})")
+        
+        # 같은 이름: 같은 내용은 중복으로 보고(분석 안 함), 다른 내용은 해시 접미사로 저장
+        other_png = png[:-1] + b"\xff"
+        files, saved = upload(batch_dir, [
+            ("files", "edge.png", "image/png", png),
+            ("files", "edge.png", "image/png", other_png)
+        ], chunk_size=13)
+        renamed = [name for name in files if name.startswith("edge_")]
+        collision = (
+            files["edge.png"]["status"] == "duplicate"
+            and len(renamed) == 1 and files[renamed[0]]["status"] == "saved"
+            and [info["filename"] for info in saved] == renamed
+            and (batch_dir / "edge.png").read_bytes() == png and (batch_dir / renamed[0]).read_bytes() == other_png
+        )
+        print(f"   이름 충돌: 중복 {files['edge.png']['status']}, 다른 내용 → {renamed}")
+        
+        # 연결이 끊겨 중단되면 기록 중인 임시 파일은 지우고 이미 저장된 파일은 유지
+        abort_dir = Path(tmp) / "batch_abort"
+        content_type, body = multipart_body([
+            ("files", "first.png", "image/png", png),
+            ("files", "second.png", "image/png", other_png)
+        ])
+        streaming = StreamingImageUpload(content_type, abort_dir, 100)
+        streaming.feed(body[:len(body) - 40])
+        partial = bool(list(abort_dir.glob(".upload-*")))
+        streaming.abort()
+        streaming.feed(body[len(body) - 40:])
+        aborted = (
+            partial and not streaming.finished
+            and not list(abort_dir.glob(".upload-*"))
+            and sorted(path.name for path in abort_dir.iterdir()) == ["first.png"]
+        )
+        print(f"   중단 시 임시 파일 정리: {aborted}")
+    
+    # 업로드 분석 작업은 작업 안에서 결과를 저장·등록 (요청이 실패해도 보존)
+    import backend.api.main as api
+    
+    saved_results = []
+    recorded = []
+    originals = (api.analyze_image_with_gpt, api.save_analysis_results, api.record_analysis_result, settings.PHASH_REUSE_LABELS)
+    api.analyze_image_with_gpt = lambda client, path, batch_name, **kwargs: {"file_path": f"{batch_name}/{path.name}", "confidence": 0.9}
+    api.save_analysis_results = lambda results: (saved_results.extend(results), _done_future())[1]
+    api.record_analysis_result = lambda result, pack_size: recorded.append(result["file_path"])
+    settings.PHASH_REUSE_LABELS = False
+    try:
+        info = {"file_path": "batch_upload/edge.png", "path": Path("/tmp/batch_upload/edge.png")}
+        result = api.analyze_uploaded_image(None, info)
+    finally:
+        api.analyze_image_with_gpt, api.save_analysis_results, api.record_analysis_result, settings.PHASH_REUSE_LABELS = originals
+    in_job = saved_results == [result] and recorded == ["batch_upload/edge.png"]
+    print(f"   작업 내 저장·등록: {in_job}")
+    
+    return validated and stored and collision and aborted and in_job
+
+
+def _done_future():
+    future = Future()
+    future.set_result(None)
+    return future
+
+def parse_sse(text):
+    """SSE 응답 본문을 (이벤트, 데이터) 목록으로 변환"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_analysis_stream():
+    """스트리밍 분석 SSE 이벤트 테스트"""
+    print("\n" + "=" * 60)
+    print("30. 스트리밍 분석 이벤트 테스트")
+    print("=" * 60)
+    
+    from fastapi.testclient import TestClient
+    import backend.api.main as api
+    
+    pending = [(Path(f"/tmp/batch_sse/img{i}.webp"), "batch_sse") for i in range(3)]
+    reused = [{"file_path": "batch_sse/reused.webp", "reused_from": "사진수집현황/batch_sse/img0.webp"}]
+    missing = [{"file_path": "batch_sse/missing.webp", "error": "파일을 찾을 수 없습니다"}]
+    
+    def analyze_chunk(client, chunk, pack_size, metrics, reservation):
+        # 두 번째 묶음은 작업 자체가 실패 (예: 결과 저장 실패)
+        if chunk[0][0].name == "img1.webp":
+            raise OSError("disk full")
+        return [(path, batch, {"file_path": f"{batch}/{path.name}"}, None) for path, batch in chunk]
+    
+    originals = (api.create_client, api.prepare_analysis, api.analyze_chunk, api.save_analysis_results)
+    api.create_client = lambda: None
+    api.prepare_analysis = lambda image_paths: (list(pending), [dict(r) for r in reused], [dict(e) for e in missing])
+    api.analyze_chunk = analyze_chunk
+    api.save_analysis_results = lambda results: _done_future()
+    try:
+        response = TestClient(api.app).post("/api/analyze/images/stream", json={"image_paths": ["x"] * 5, "pack_size": 1})
+    finally:
+        api.create_client, api.prepare_analysis, api.analyze_chunk, api.save_analysis_results = originals
+    
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    failed = sorted(data["file_path"] for name, data in events if name == "error")
+    done = events[-1][1]
+    # 실패한 작업의 이미지는 error 이벤트로 보고되고 done 은 항상 마지막에 전송
+    streamed = (
+        response.status_code == 200
+        and names[0] == "start" and names[-1] == "done" and names.count("done") == 1
+        and names.count("result") == 3
+        and failed == ["batch_sse/img1.webp", "batch_sse/missing.webp"]
+        and done["success"] == 3 and done["errors"] == 2 and done["completed"] == done["total"] == 5
+        and get_cost_budget().reserved < 1e-9
+    )
+    print(f"✅ 이벤트: {names}")
+    print(f"   오류 이벤트: {failed}, done: 성공 {done['success']} / 실패 {done['errors']}")
+    
+    return streamed
+
 def main():
     """메인 테스트 함수"""
     print("\n🧪 백엔드 기능 테스트 시작\n")
@@ -115,7 +1646,32 @@ def main():
         ("통계 계산", test_statistics),
         ("페이지네이션", test_pagination),
         ("필터링", test_filtering),
-        ("접근성 점수", test_accessibility_score)
+        ("접근성 점수", test_accessibility_score),
+        ("공유 데이터셋", test_shared_dataset),
+        ("유사 이미지 BK-tree", test_bk_tree),
+        ("JSONL 작성기", test_jsonl_writer),
+        ("예측 저장소", test_prediction_store),
+        ("데이터 큐브", test_data_cube),
+        ("매장 인덱스", test_store_index),
+        ("촬영 시각 인덱스", test_time_index),
+        ("이미지 수집 스캔", test_ingest_scan),
+        ("분석 요청 제한", test_admission_control),
+        ("검수 우선순위 큐", test_review_queue),
+        ("레이블 커밋", test_label_commit),
+        ("델타 동기화", test_change_log),
+        ("응답 필드 선택", test_projection),
+        ("이미지 상세 일괄 조회", test_image_details),
+        ("GT 파티션", test_gt_shards),
+        ("JSONL 병렬 파싱", test_jsonl_reader),
+        ("일괄 분석 샤드", test_batch_shards),
+        ("목록 조회 캐시", test_query_cache),
+        ("콜드 로드 단일 실행", test_single_flight),
+        ("점수 분포 스케치", test_score_sketch),
+        ("워밍업", test_warmup),
+        ("구조화 로깅", test_logging),
+        ("묶음 분석", test_packed_analysis),
+        ("스트리밍 업로드", test_streaming_upload),
+        ("스트리밍 분석 이벤트", test_analysis_stream)
     ]
     
     results = []